@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Query
-from typing import Optional
+from fastapi import APIRouter, Body, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Optional
+import time
+from app.config.settings import appData
 from app.models.bootstrapModel import (
+    BatchItemResult,
+    BatchResponse,
     BootstrapModel,
     BootstrapResponse,
     BootstrapStep,
     BootstrapState,
 )
+from app.models.jobModel import JobRecord, JobSubmitted
 from app.core.controllers import bootstrapController
+from app.core.controllers.jobsController import jobManager
 import pudb
 from textwrap import dedent
 
@@ -25,14 +32,26 @@ STEP_DESCRIPTIONS = """
     """
 
 
-@router.post("/boostrap/")
+@router.post(
+    "/boostrap/",
+    responses={202: {"model": JobSubmitted, "description": "Accepted as a job"}},
+)
 async def boostrap_post(
     values: BootstrapModel,
+    response: Response,
     step: str = Query(
         "all",
         description=f"Bootstrap step to execute. Options:\n\n<pre>{STEP_DESCRIPTIONS}</pre>",
     ),
     token: Optional[str] = None,
+    job: bool = Query(
+        False,
+        description="If true, enqueue the bootstrap and return a job id immediately.",
+    ),
+    profile: bool = Query(
+        False,
+        description="If true, profile the bootstrap (implies `job`).",
+    ),
 ) -> BootstrapState:
     state = BootstrapState()
     # pudb.set_trace()
@@ -48,9 +67,21 @@ async def boostrap_post(
         )
         return state
 
-    # Proceed with the valid bootstrap step
-    state = await bootstrapController.bootstrap_exec(values, bootstrap_step, token)
-    return state
+    if job or profile:
+        submitted: JobSubmitted = jobManager.job_submit(
+            values, bootstrap_step, token, profile
+        )
+        submitted.location = f"/api/v1/jobs/{submitted.job_id}"
+        return JSONResponse(
+            status_code=202,
+            content=submitted.model_dump(mode="json"),
+            headers={"Location": submitted.location},
+        )
+
+    # Proceed with the valid bootstrap step; it is recorded like a job
+    record: JobRecord = await jobManager.job_runInline(values, bootstrap_step, token)
+    response.headers["Content-Location"] = f"/api/v1/jobs/{record.job_id}"
+    return record.state
 
 
 # Dynamically set the docstring after function definition
@@ -64,7 +95,79 @@ Receive a set of bootstrap values and process them.
     {STEP_DESCRIPTIONS}
 - `token` (*`Optional[str]`*): An optional GitHub token. If provided, this token will override the default token
     from the server configuration and will be used for all GitHub API operations during this request.
+- `job` (*`bool`*): If true, the bootstrap is queued and `202 Accepted` is returned at once with a `job_id`.
+    Poll `GET /api/v1/jobs/{{job_id}}` for the live state.
+- `profile` (*`bool`*): If true, the bootstrap runs as a job under a sampling profiler. The profile is
+    downloaded as folded stacks (for flamegraph.pl or speedscope) from `GET /api/v1/jobs/{{job_id}}/profile`.
 
 **Returns**
-- `BootstrapState`: The state of all steps after execution.
+- `BootstrapState`: The state of all steps after execution, or `JobSubmitted` (HTTP 202) in job mode.
+    Either way the run is kept as a job; the `Content-Location` header of a synchronous
+    response names its record.
 """
+
+
+@router.post(
+    "/boostrap/batch/",
+    response_model=BatchResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "With `stream=true`: one `BatchItemResult` per line "
+            "as each item finishes, then the `BatchResponse` summary (without items)",
+        }
+    },
+)
+async def boostrap_batch_post(
+    values_list: list[BootstrapModel] = Body(...),
+    concurrency: int = Query(
+        appData.batchConcurrency,
+        ge=1,
+        description="Maximum number of bootstraps running at once.",
+    ),
+    token: Optional[str] = None,
+    stream: bool = Query(
+        False, description="If true, stream each item's result as it finishes."
+    ),
+) -> BatchResponse:
+    """
+    **Description**
+    Run the complete bootstrap for every plugin in the list. All items share
+    the pooled GitHub client of the token and its caches; the user and the
+    organizations are resolved once for the whole batch.
+
+    **Parameters**
+    - `values_list` (*`list[BootstrapModel]`*): One set of bootstrap values per plugin.
+    - `concurrency` (*`int`*): How many bootstraps may run at once.
+    - `token` (*`Optional[str]`*): An optional GitHub token used for every item.
+    - `stream` (*`bool`*): If true, the response is NDJSON: one `BatchItemResult`
+        per line in order of completion, followed by the summary.
+
+    **Returns**
+    - `BatchResponse`: Per-item `BootstrapState`s in request order, the batch's
+        `wall_seconds`, and each item's `elapsed_seconds`.
+    """
+    if len(values_list) > appData.batchMax:
+        raise HTTPException(
+            status_code=422,
+            detail=f"A batch may hold at most {appData.batchMax} items",
+        )
+    if not stream:
+        return await bootstrapController.bootstrap_batch(
+            values_list, concurrency, token
+        )
+
+    async def lines() -> AsyncIterator[str]:
+        start: float = time.perf_counter()
+        items: list[BatchItemResult] = []
+        async for item in bootstrapController.bootstrap_batchStream(
+            values_list, concurrency, token
+        ):
+            items.append(item)
+            yield item.model_dump_json() + "\n"
+        summary: BatchResponse = bootstrapController.batch_summarize(
+            items, concurrency, time.perf_counter() - start
+        )
+        yield summary.model_dump_json(exclude={"items"}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
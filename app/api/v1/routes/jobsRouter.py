@@ -0,0 +1,295 @@
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from typing import AsyncIterator, Optional
+
+from app.models.jobModel import JobRecord, JobStatus, JobSubmitted, RateLimitState
+from app.core.controllers.jobsController import jobManager
+from app.db.mongo_client import JobStoreUnavailable
+from app.utils.jobController import log_read
+from app.utils.profiler import profile_path
+from app.utils.events import EventChannel, eventChannel_get, sse_format
+from app.utils.rateLimit import rateLimiter
+
+router = APIRouter()
+router.tags = ["Job services"]
+
+
+@router.get(
+    "/jobs",
+    response_model=list[JobRecord],
+    summary="""
+    GET the history of bootstrap jobs.
+    """,
+)
+async def jobs_get(
+    organization: Optional[str] = None,
+    plugin_title: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+    limit: int = Query(50, ge=1, le=1000),
+) -> list[JobRecord]:
+    """
+    Description
+    -----------
+
+    Return stored job records, newest first, optionally filtered. Jobs are
+    persisted in the job store (MongoDB with `JOBSTORE=mongo`) with their
+    complete state, so this includes jobs from before a restart.
+
+    Args:
+    -----
+    * `organization` (str): Only jobs for this organization.
+    * `plugin_title` (str): Only jobs for this plugin.
+    * `status` (JobStatus): Only jobs in this status.
+    * `limit` (int): Maximum number of jobs to return.
+
+    Returns:
+    --------
+    * `list[JobRecord]`: the matching jobs.
+    """
+    try:
+        return await jobManager.jobs_find(organization, plugin_title, status, limit)
+    except JobStoreUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Job store unavailable: {e}")
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobRecord,
+    responses={304: {"description": "Job state unchanged since the given ETag"}},
+    summary="""
+    GET the live state of a bootstrap job.
+    """,
+)
+async def job_get(
+    job_id: str, if_none_match: Optional[str] = Header(default=None)
+) -> Response:
+    """
+    Description
+    -----------
+
+    Return the job record, including the live `BootstrapState`, of a
+    bootstrap. Finished jobs are answered from the job store.
+
+    Every response carries an `ETag`. Clients that poll should send it back
+    in `If-None-Match`; while the job is unchanged the server answers
+    `304 Not Modified` without serializing the state.
+
+    Args:
+    -----
+    * `job_id` (str): The job id returned by the bootstrap POST.
+
+    Returns:
+    --------
+    * `JobRecord`: the job status and state.
+    """
+    try:
+        record: JobRecord | None = await jobManager.job_find(job_id)
+    except JobStoreUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Job store unavailable: {e}")
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"No job with id '{job_id}'")
+    etag: str = record.etag()
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=record.model_dump(mode="json"), headers={"ETag": etag})
+
+
+@router.post(
+    "/jobs/{job_id}/resume",
+    status_code=202,
+    response_model=JobSubmitted,
+    responses={409: {"description": "The job is not a failed complete bootstrap"}},
+    summary="""
+    Resume a failed bootstrap job where it failed.
+    """,
+)
+async def job_resume(
+    job_id: str, response: Response, token: Optional[str] = None
+) -> JobSubmitted:
+    """
+    Description
+    -----------
+
+    Queue a failed `step=all` job again. Every step that succeeded recorded
+    a checkpoint; those that still hold (the repository exists, the clone
+    is intact, the script is edited or committed) are not run again, so a
+    failure in `gitCommit` costs only the commit on resume. The job keeps
+    its id and workspace; poll it as before.
+
+    Args:
+    -----
+    * `job_id` (str): The job to resume.
+    * `token` (str): Optional GitHub token; tokens are never stored, so pass
+      it again if the job used one.
+
+    Returns:
+    --------
+    * `JobSubmitted`: the queued job (HTTP 202).
+    """
+    try:
+        submitted: JobSubmitted | None = await jobManager.job_resume(job_id, token)
+    except JobStoreUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Job store unavailable: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if submitted is None:
+        raise HTTPException(status_code=404, detail=f"No job with id '{job_id}'")
+    submitted.location = f"/api/v1/jobs/{job_id}"
+    response.headers["Location"] = submitted.location
+    return submitted
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+    summary="""
+    Stream the live progress of a bootstrap job as server-sent events.
+    """,
+)
+async def job_events(
+    job_id: str, last_event_id: Optional[str] = Header(default=None)
+) -> StreamingResponse:
+    """
+    Description
+    -----------
+
+    Push the progress of a job as it happens, instead of polling
+    `GET /jobs/{job_id}`. Event types:
+
+    * `job`: the job started running; `{"job_status": "running"}`.
+    * `state`: `BootstrapState` changed. Only the changed fields are sent:
+      the step that was just updated and any of `status`, `message`,
+      `starttime`, `endtime` whose value changed.
+    * `output`: one line of subprocess output,
+      `{"step": "shellExec", "stream": "stdout", "line": "..."}`.
+    * `done`: the job finished; `{"job_status": "succeeded" | "failed"}`.
+      The stream ends after this event.
+
+    Events are numbered. A client that reconnects with `Last-Event-ID`
+    receives the events it missed (from the most recent `EVENTHISTORYMAX`).
+
+    Args:
+    -----
+    * `job_id` (str): The job id returned by the bootstrap POST.
+
+    Returns:
+    --------
+    * `text/event-stream`: the events.
+    """
+    channel: EventChannel | None = eventChannel_get(job_id)
+    if channel is None:
+        raise HTTPException(status_code=404, detail=f"No job with id '{job_id}'")
+    last_id: int = int(last_event_id) if (last_event_id or "").isdigit() else 0
+
+    async def events() -> AsyncIterator[str]:
+        async for message in channel.subscribe(last_id):
+            yield sse_format(message)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/jobs/{job_id}/profile",
+    response_class=FileResponse,
+    responses={200: {"content": {"text/plain": {}}}},
+    summary="""
+    GET the profile of a bootstrap job as folded stacks.
+    """,
+)
+async def job_profile(job_id: str) -> FileResponse:
+    """
+    Description
+    -----------
+
+    Return the profile of a job submitted with `profile=true`, once it has
+    finished. Each line is a folded stack and its sample count, the input
+    of `flamegraph.pl` and of https://www.speedscope.app. Stacks starting
+    with `[thread]` were sampled on executor threads (PyGithub, GitPython);
+    `[await]` stacks show where the job was suspended, e.g. waiting on a
+    subprocess.
+
+    Args:
+    -----
+    * `job_id` (str): The job id.
+
+    Returns:
+    --------
+    * `text/plain`: the folded stacks.
+    """
+    try:
+        record: JobRecord | None = await jobManager.job_find(job_id)
+    except JobStoreUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Job store unavailable: {e}")
+    if record is None or not record.profiled:
+        raise HTTPException(status_code=404, detail=f"No profiled job '{job_id}'")
+    path = profile_path(job_id)
+    if not path.is_file():
+        raise HTTPException(
+            status_code=404, detail=f"Profile of job '{job_id}' is not ready yet"
+        )
+    return FileResponse(path, media_type="text/plain", filename=path.name)
+
+
+@router.get(
+    "/logs/{log_id}",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/plain": {}}}},
+    summary="""
+    GET the complete output of a captured subprocess.
+    """,
+)
+def log_get(
+    log_id: str,
+    stream: str = Query("stdout", description="`stdout` or `stderr`"),
+) -> StreamingResponse:
+    """
+    Description
+    -----------
+
+    Step results only hold the first and last lines of a chatty subprocess
+    such as `bash bootstrap.sh`; their `result.log_id` names the complete
+    output, which is kept compressed on the server and returned here.
+
+    Args:
+    -----
+    * `log_id` (str): The `log_id` of a `JobResult`.
+    * `stream` (str): Which stream to return.
+
+    Returns:
+    --------
+    * `text/plain`: the full output.
+    """
+    chunks = log_read(log_id, stream)
+    if chunks is None:
+        raise HTTPException(
+            status_code=404, detail=f"No {stream} output for log '{log_id}'"
+        )
+    return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
+
+
+@router.get(
+    "/ratelimit",
+    response_model=list[RateLimitState],
+    summary="""
+    GET the GitHub request budget of every token in use.
+    """,
+)
+def ratelimit_get() -> list[RateLimitState]:
+    """
+    Description
+    -----------
+
+    Return what the service knows of each token's GitHub rate limit, from
+    the headers of the most recent responses. Queued jobs are only started
+    while their token has at least `GITHUBRATELIMITADMITMIN` calls left.
+
+    Returns:
+    --------
+    * `list[RateLimitState]`: one entry per token, identified by a digest prefix.
+    """
+    return rateLimiter.states()
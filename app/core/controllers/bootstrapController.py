@@ -1,8 +1,18 @@
 import asyncio
 
 from app.utils.file import bootstrapScript_edit
-from app.utils.jobController import JobResult, Jobber
-from app.utils.github import GithubRepoUtil
+from app.utils.jobController import JobResult, Jobber, OutputCapture, OutputSink
+from app.utils.github import CloneStrategy, CommitBackend, GithubRepoUtil
+from app.utils.forge import Forge
+from app.utils.executor import blocking_run
+from app.utils.workspace import Workspace
+from app.utils.context import BootstrapContext
+from app.utils.templateMirror import TemplateMirror, templateMirror_get
+from app.utils import metrics
+from app.utils.profiler import JobProfiler, profileTarget
+from app.utils.rateLimit import github_run
+from app.utils.spawns import SpawnCount, spawnStep, spawnTarget
+from app.utils.checkpoint import PIPELINE, checkpoint_record, resume_plan
 from app.models.bootstrapModel import (
     BootstrapModel,
     BootstrapState,
@@ -15,8 +25,11 @@ from app.models.bootstrapModel import (
     GitCommitResponse,
     GithubRepoCreate,
     GithubRepoCheck as GithubCheckModel,
+    RepoPollStats,
+    BatchItemResult,
+    BatchResponse,
 )
-from typing import Tuple, Callable, Awaitable, TypeVar
+from typing import Tuple, Callable, Awaitable, AsyncIterator, Iterator, TypeVar
 import sys
 import os
 import re
@@ -31,6 +44,8 @@ from app.config.settings import appData
 from github import Github
 from pathlib import Path
 import time
+import random
+import uuid
 from datetime import datetime
 
 logger_format = (
@@ -63,81 +78,133 @@ def winToNix_path(cmd: str) -> str:
 
 
 async def bootstrap_repoExists(
-    values: BootstrapModel, github_client: Github
+    values: BootstrapModel, ctx: BootstrapContext
 ) -> GithubRepoExists:
     """
-    Check if a repository exists using the provided GitHub client.
+    Check if a repository exists on the request's forge.
 
     Args:
         values (BootstrapModel): The bootstrap values provided.
-        github_client (Github): The GitHub client instance.
+        ctx (BootstrapContext): The request context (token, client, workspace).
 
     Returns:
         GithubRepoExists: Result of the repository existence check.
     """
     # pudb.set_trace()
-    result: GithubRepoExists = await GithubRepoUtil.repo_checkExists(
-        github_client=github_client,  # Pass the dynamic GitHub client
-        repo_name=values.plugin_title,
-        org_name=values.organization,
+    result: GithubRepoExists = await ctx.forge.repo_checkExists(
+        repo_name=values.plugin_title, org_name=ctx.org_name
     )
     result.end_stamp()
     return result
 
 
+def poll_delays(
+    first: float, backoff: float, maximum: float, jitter: float
+) -> Iterator[float]:
+    """
+    Generate the waits between availability probes: a fast first retry
+    followed by exponential backoff, each wait randomized by +/- `jitter`.
+
+    Args:
+        first (float): The first wait, in seconds.
+        backoff (float): Multiplier applied to each subsequent wait.
+        maximum (float): Upper bound on a single wait.
+        jitter (float): Relative randomization of each wait (0.2 = +/-20%).
+
+    Yields:
+        float: The next wait, in seconds.
+    """
+    delay: float = first
+    while True:
+        yield delay * random.uniform(1 - jitter, 1 + jitter)
+        delay = min(maximum, delay * backoff)
+
+
 async def poll_repo_availability(
-    github_client: Github, repo_name: str, org_name: str, timeout: int = 30
-) -> bool:
+    forge: Forge,
+    repo_name: str,
+    org_name: str,
+    timeout: Optional[float] = None,
+) -> RepoPollStats:
     """
-    Polls GitHub to check if a repository is available.
+    Polls the forge until a newly created repository is available.
+
+    The first probe is made immediately; retries follow the backoff schedule
+    configured in `appData` (`repoPoll*`) until the deadline. On GitHub each
+    probe is a single `GET /repos/{org}/{name}` request.
 
     Args:
-        github_client (Github): Authenticated GitHub client.
+        forge (Forge): The forge the repository was created on.
         repo_name (str): Name of the repository to check.
         org_name (str): Name of the organization owning the repository.
-        timeout (int): Maximum time to wait for the repository (in seconds).
+        timeout (Optional[float]): Deadline in seconds; defaults to `appData.repoPollDeadline`.
 
     Returns:
-        bool: True if the repository is available, False if timeout occurs.
+        RepoPollStats: Whether the repository became available, the number of
+                       probes made and the total time waited.
     """
-    elapsed_time: int = 0
-    interval: int = 5  # Poll every 5 seconds
+    deadline: float = timeout if timeout is not None else appData.repoPollDeadline
+    stats: RepoPollStats = RepoPollStats()
+    delays: Iterator[float] = poll_delays(
+        appData.repoPollFirstDelay,
+        appData.repoPollBackoff,
+        appData.repoPollMaxDelay,
+        appData.repoPollJitter,
+    )
+    etag: Optional[str] = None
+    start: float = time.monotonic()
 
-    while elapsed_time < timeout:
+    while True:
+        stats.probes += 1
         try:
-            org = github_client.get_organization(org_name)
-            repo = org.get_repo(repo_name)
-            if repo:  # If the repository exists and is accessible
-                return True
+            status, etag = await github_run(
+                forge.repo_probe, repo_name, org_name, etag
+            )
+            if status in (200, 304):
+                stats.available = True
+                break
+            logger.info(f"Waiting for repository {repo_name} to be available: {status}")
         except Exception as e:
             logger.info(f"Waiting for repository {repo_name} to be available: {str(e)}")
-            await asyncio.sleep(interval)  # Use asyncio.sleep for async compatibility
-            elapsed_time += interval
 
-    # Timeout occurred
-    logger.error(f"Repository {repo_name} not available after {timeout} seconds.")
-    return False
+        remaining: float = deadline - (time.monotonic() - start)
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(next(delays), remaining))
+
+    stats.waited_seconds = time.monotonic() - start
+    if stats.available:
+        logger.info(
+            f"Repository {repo_name} available after {stats.probes} probe(s), "
+            f"{stats.waited_seconds:.2f}s"
+        )
+    else:
+        logger.error(
+            f"Repository {repo_name} not available after {deadline} seconds "
+            f"({stats.probes} probes)."
+        )
+    return stats
 
 
 async def bootstrap_repoCreateInitial(
-    values: BootstrapModel, github_client: Github
+    values: BootstrapModel, ctx: BootstrapContext
 ) -> GithubRepoCreate:
     """
-    Create initial repository from a template using the provided GitHub client and
+    Create initial repository from a template on the request's forge and
     ensure the repository is available before proceeding.
 
     Args:
         values (BootstrapModel): The bootstrap values provided.
-        github_client (Github): The GitHub client instance.
+        ctx (BootstrapContext): The request context (token, client, workspace).
 
     Returns:
         GithubRepoCreate: Result of the repository creation process.
     """
-    result: GithubRepoCreate = await GithubRepoUtil.repo_createFromTemplate(
-        github_client=github_client,  # Pass the dynamic GitHub client
+    result: GithubRepoCreate = await ctx.forge.repo_createFromTemplate(
         repo_name=values.plugin_title,
         description=values.description,
-        org_name=values.organization,
+        template_repo=appData.appTemplateRepo,
+        org_name=ctx.org_name,
     )
 
     if not result.status:
@@ -145,61 +212,96 @@ async def bootstrap_repoCreateInitial(
         return result
 
     # Poll for repository availability
-    repo_available: bool = await poll_repo_availability(
-        github_client=github_client,
+    poll: RepoPollStats = await poll_repo_availability(
+        forge=ctx.forge,
         repo_name=values.plugin_title,
-        org_name=values.organization,
+        org_name=ctx.org_name,
     )
+    result.poll = poll
 
-    if not repo_available:
+    if not poll.available:
         return GithubRepoCreate(
             status=False,
             message=f"Repository {values.plugin_title} was created but is not available.",
             repo_name=values.plugin_title,
             repo_created=False,
+            poll=poll,
         )
 
     return result
 
 
 async def bootstrap_gitClone(
-    values: BootstrapModel, github_client: Github
+    values: BootstrapModel, ctx: BootstrapContext
 ) -> GitCloneResponse:
     """
-    Clone the newly created repository using the provided GitHub client.
+    Clone the newly created repository from the request's forge.
+
+    If a local mirror of the template is available the clone borrows its
+    objects, so that only what is new in the generated repo is transferred.
+
+    When rendering ahead, the template is checked out instead, before the
+    repository exists; `gitCommit` moves the result onto the repository.
 
     Args:
         values (BootstrapModel): The bootstrap values provided.
-        github_client (Github): The GitHub client instance.
+        ctx (BootstrapContext): The request context (token, client, workspace).
 
     Returns:
         GitCloneResponse: Result of the repository cloning process.
     """
+    if ctx.render_ahead:
+        # The repository may not exist yet: start from the template itself
+        template: TemplateMirror = templateMirror_get(ctx.org_name)
+        return await GithubRepoUtil.repo_cloneTemplate(
+            template_url=(
+                str(template.path)
+                if appData.templateMirrorEnable and template.available()
+                else template.url
+            ),
+            repo_name=values.plugin_title,
+            repo_url=ctx.forge.clone_url(values.plugin_title, ctx.org_name),
+            base_dir=ctx.workspace.create(),
+        )
+
+    reference: Optional[Path] = None
+    if appData.templateMirrorEnable:
+        mirror: TemplateMirror = templateMirror_get(ctx.org_name)
+        if mirror.available():
+            reference = mirror.path
+        else:
+            # Build it in the background for the next clone
+            mirror.refresh_schedule()
+
     result = await GithubRepoUtil.repo_clone(
-        github_client=github_client,  # Pass the provided GitHub client
+        clone_url=ctx.forge.clone_url(values.plugin_title, ctx.org_name),
         repo_name=values.plugin_title,
-        org_name=values.organization,
+        base_dir=ctx.workspace.create(),
+        reference=reference,
+        strategy=CloneStrategy(appData.cloneStrategy),
     )
 
     return result
 
 
 async def bootstrap_shellEdit(
-    values: BootstrapModel, github_client: Github
+    values: BootstrapModel, ctx: BootstrapContext
 ) -> ShellEditStep:
     """
     Edit shell script with bootstrap values.
 
     Args:
         values (BootstrapModel): The bootstrap values provided.
-        github_client (Github): The GitHub client instance.
+        ctx (BootstrapContext): The request context (token, client, workspace).
 
     Returns:
         ShellEditStep: Result of the shell editing process.
     """
     # pudb.set_trace()
-    script_path: Path = appData.appRepoLocalPath / values.plugin_title / "bootstrap.sh"
-    changes_made: list[str] = bootstrapScript_edit(script_path, values)
+    script_path: Path = ctx.workspace.repo_path(values.plugin_title) / "bootstrap.sh"
+    changes_made: list[str] = await blocking_run(
+        bootstrapScript_edit, script_path, values
+    )
 
     return ShellEditStep(
         status=True,
@@ -209,39 +311,28 @@ async def bootstrap_shellEdit(
     )
 
 
-def git_configure(
-    values: BootstrapModel, jobber: Jobber, github_client: Github
+async def git_configure(
+    values: BootstrapModel, ctx: BootstrapContext
 ) -> ShellExecStep:
     """
-    Configures Git with the given settings dynamically based on the authenticated user.
+    Resolves the Git commit identity of this job from the authenticated user.
+
+    The identity is applied per job through GIT_AUTHOR_*/GIT_COMMITTER_*
+    environment variables (see `BootstrapContext.gitIdentity_env`); no
+    `git config --global` is run and `~/.gitconfig` is never touched.
 
     Args:
         values (BootstrapModel): Bootstrap model containing Git configuration values.
-        jobber (Jobber): The job runner instance.
-        github_client (Github): The GitHub client instance.
+        ctx (BootstrapContext): The request context; its user is resolved here.
 
     Returns:
         ShellExecStep: Result of the configuration process.
     """
     try:
-        # Fetch authenticated user details from GitHub client
-        user = github_client.get_user()
-        git_settings = {
-            "user.name": user.login,
-            "user.email": user.email
-            or values.email,  # Fallback to values.email if API returns None
-        }
-
-        for key, value in git_settings.items():
-            cmd: str = f"git config --global {key} '{value}'"
-            result: JobResult = jobber.job_run(cmd)
-            if result.returncode != 0:
-                return ShellExecStep(
-                    status=False,
-                    message=f"Failed to set Git {key}: {result.stderr}",
-                    result=result,
-                )
-
+        # Fallback to values.email if API returns None
+        identity: dict[str, str] = await github_run(
+            ctx.gitIdentity_env, values.email
+        )
         return ShellExecStep(
             status=True,
             message="Successfully configured Git",
@@ -250,7 +341,10 @@ def git_configure(
                 cwd="",
                 returncode=0,
                 stderr="",
-                stdout="Git configured successfully.",
+                stdout=(
+                    f"Git identity: {identity['GIT_AUTHOR_NAME']} "
+                    f"<{identity['GIT_AUTHOR_EMAIL']}>"
+                ),
             ),
         )
     except Exception as e:
@@ -267,79 +361,47 @@ def git_configure(
         )
 
 
-def script_addCommit(
-    repo_path: Path, script_name: str, jobber: Jobber
-) -> ShellExecStep:
-    """
-    Adds and commits the generated script to the Git repository.
-
-    Args:
-        repo_path (Path): Path to the repository.
-        script_name (str): Name of the script to add and commit.
-        jobber (Jobber): The job runner instance.
-
-    Returns:
-        ShellExecStep: Result of the commit operation.
-    """
-    commands: list[tuple[str, str]] = [
-        (f"git add {script_name}", "Failed to add file"),
-        ('git commit -m "Add app"', "Failed to commit file"),
-    ]
-
-    result: JobResult = JobResult(
-        cmd="", cwd=str(repo_path), returncode=0, stderr="", stdout=""
-    )
-
-    original_cwd: Path = Path.cwd()
-    try:
-        os.chdir(repo_path)
-        for cmd, error_message in commands:
-            cmd: str
-            error_message: str
-            result = jobber.job_run(cmd)
-            if result.returncode != 0:
-                return ShellExecStep(
-                    status=False,
-                    message=f"{error_message}: {result.stderr}",
-                    result=result,
-                )
-    finally:
-        os.chdir(original_cwd)
-
-    return ShellExecStep(
-        status=True,
-        message="Successfully added and committed the script",
-        result=result,
-    )
-
-
 async def bootstrap_shellExec(
-    values: BootstrapModel, github_client: Github
+    values: BootstrapModel, ctx: BootstrapContext
 ) -> ShellExecStep:
     """
-    Executes shell commands to configure Git, run bootstrap.sh, and add/commit the generated script.
+    Resolves the Git identity and runs bootstrap.sh. What bootstrap.sh
+    leaves uncommitted (the generated script, its own removal, ...) is
+    committed once, together, by `bootstrap_gitCommit`.
 
     Args:
         values (BootstrapModel): The bootstrap values provided.
-        github_client (Github): The GitHub client instance.
+        ctx (BootstrapContext): The request context (token, client, workspace).
 
     Returns:
         ShellExecStep: Result of the bootstrap.sh execution.
     """
     try:
         # Create a Jobber instance using the GitHub client token
-        jobber: Jobber = Jobber({"github_client": github_client})
+        jobber: Jobber = Jobber({"github_client": ctx.github_client})
 
         # Configure Git settings
-        configure_result: ShellExecStep = git_configure(values, jobber, github_client)
+        configure_result: ShellExecStep = await git_configure(values, ctx)
         if not configure_result.status:
             return configure_result
 
-        # Execute bootstrap.sh
-        bootstrap_script_path: Path = (
-            Path.home() / "repositories" / values.plugin_title / "bootstrap.sh"
+        # Execute bootstrap.sh from within its own checkout, with the job's
+        # git identity in its environment (bootstrap.sh itself commits)
+        repo_path: Path = ctx.workspace.repo_path(values.plugin_title)
+        env: dict[str, str] = ctx.workspace.env(values.plugin_title)
+        env.update(ctx.gitIdentity_env(values.email))
+        sink: Optional[OutputSink] = ctx.output_sink("shellExec")
+        sinks: list[OutputSink] = [sink] if sink else []
+        bootstrap_script_path: Path = repo_path / "bootstrap.sh"
+        script_result: JobResult = await jobber.job_runAsync(
+            f"bash {bootstrap_script_path}",
+            repo_path,
+            env,
+            sinks,
+            appData.shellExecTimeout,
+            # pip and venv are chatty: keep only a head and tail in the response
+            OutputCapture() if appData.outputCapture else None,
         )
-        script_result: JobResult = jobber.job_run(f"bash {bootstrap_script_path}")
 
         if script_result.returncode != 0:
             return ShellExecStep(
@@ -348,15 +410,6 @@ async def bootstrap_shellExec(
                 result=script_result,
             )
 
-        # Add and commit the generated script
-        repo_path: Path = Path.home() / "repositories" / values.plugin_title
-        add_commit_result: ShellExecStep = script_addCommit(
-            repo_path, f"{values.scriptname}.py", jobber
-        )
-
-        if not add_commit_result.status:
-            return add_commit_result
-
         return ShellExecStep(
             status=True,
             message="Successfully executed bootstrap.sh",
@@ -369,7 +422,7 @@ async def bootstrap_shellExec(
             message=f"Exception occurred: {str(e)}",
             result=JobResult(
                 cmd="",
-                cwd=os.getcwd(),
+                cwd=str(ctx.workspace.root),
                 returncode=-1,
                 stderr=str(e),
                 stdout="",
@@ -378,14 +431,15 @@ async def bootstrap_shellExec(
 
 
 async def bootstrap_gitCommit(
-    values: BootstrapModel, github_client: Github
+    values: BootstrapModel, ctx: BootstrapContext
 ) -> GitCommitResponse:
     """
-    Commit changes in the cloned repository and push them to the remote.
+    Commit changes in the cloned repository and push them to the remote,
+    or, with the `api` commit backend, commit them through the GitHub API.
 
     Args:
         values (BootstrapModel): The bootstrap values provided.
-        github_client (Github): The GitHub client instance.
+        ctx (BootstrapContext): The request context (token, client, workspace).
 
     Returns:
         GitCommitResponse: Result of the commit and push operation.
@@ -393,19 +447,29 @@ async def bootstrap_gitCommit(
     # pudb.set_trace()
     try:
         repo_name: str = values.plugin_title
-        org_name: str = values.organization
-        base_dir: Path = Path.home() / "repositories" / repo_name
+        base_dir: Path = ctx.workspace.repo_path(repo_name)
 
-        githubtoken: str | None = appData.githubToken_get()
-        token: str = githubtoken if githubtoken else ""
+        if CommitBackend(appData.commitBackend) == CommitBackend.API:
+            if ctx.github_client is None:
+                return GitCommitResponse(
+                    status=False,
+                    message="The api commit backend needs the github forge",
+                    backend="api",
+                )
+            return await GithubRepoUtil.repo_commitApi(
+                github_client=ctx.github_client,
+                repo_name=repo_name,
+                org_name=ctx.org_name,
+                base_dir=base_dir,
+                identity=await github_run(ctx.gitIdentity_env, values.email),
+            )
 
-        # Perform the commit and push operation
+        # Perform the commit and push, with the request's own credentials
         result: GitCommitResponse = await GithubRepoUtil.repo_commit(
-            github_client=github_client,
-            token=token,
+            push_url=ctx.forge.push_url,
             repo_name=repo_name,
-            org_name=org_name,
             base_dir=base_dir,
+            identity=await github_run(ctx.gitIdentity_env, values.email),
         )
         return result
     except Exception as e:
@@ -415,77 +479,444 @@ async def bootstrap_gitCommit(
 
 
 async def bootstrap_exec(
-    values: BootstrapModel, step: BootstrapStep, token: Optional[str] = None
+    values: BootstrapModel,
+    step: BootstrapStep,
+    token: Optional[str] = None,
+    state: Optional[BootstrapState] = None,
+    job_id: Optional[str] = None,
+    profile: bool = False,
+    resume: bool = False,
 ) -> BootstrapState:
     """
     Execute the bootstrap process for the specified step(s) or all.
 
+    A complete (`all`) run uses a private workspace for its checkout that is
+    cleaned up afterwards according to the retention policy. Single steps
+    use the shared workspace so that they can build on earlier calls.
+
+    With `appData.renderAhead`, a complete run renders the plugin from the
+    template while the repository is created and pushes it once it exists.
+
+    The processes the run starts are counted per step into `state.spawns`.
+
+    Each step of a complete run that succeeds records a checkpoint in the
+    state. Resuming a complete run skips the steps whose checkpoints still
+    hold (see `app.utils.checkpoint`) and runs only the rest.
+
     Args:
         values (BootstrapModel): The bootstrap values provided.
         step (BootstrapStep): The step to execute.
         token (Optional[str]): Optional GitHub token to override the default.
+        state (Optional[BootstrapState]): An existing state object to update in
+                                          place, e.g. one that is being polled
+                                          by a job. If None a new one is created.
+        job_id (Optional[str]): Job id, used to name the private workspace.
+        profile (bool): Profile this run (jobs only); the folded stacks are
+                        stored under the job id.
+        resume (bool): Continue the complete run recorded in `state`, in the
+                       workspace of `job_id`.
 
     Returns:
         BootstrapState: The state of all steps after execution.
     """
     # pudb.set_trace()
-    state: BootstrapState = BootstrapState()
+    state = state if state is not None else BootstrapState()
     state.start_stamp()
-    # Define the correct dependency order
-    ordered_steps: list[BootstrapStep] = [
-        BootstrapStep.REPO_EXISTS,
-        BootstrapStep.REPO_CREATE,
-        BootstrapStep.REPO_CLONE,
-        BootstrapStep.SCRIPT_EDIT,
-        BootstrapStep.SCRIPT_EXEC,
-        BootstrapStep.GIT_COMMIT,
-    ]
+    # The steps in dependency order
+    steps: list[BootstrapStep] = [step] if step != BootstrapStep.ALL else PIPELINE
 
-    steps: list[BootstrapStep] = (
-        [step]
-        if step != BootstrapStep.ALL
-        else [s for s in ordered_steps if s != BootstrapStep.ALL]
+    single_step: bool = len(steps) == 1  # Determine if this is a single-step execution
+    workspace: Workspace = (
+        Workspace.for_job(job_id) if step == BootstrapStep.ALL else Workspace.shared()
     )
 
-    appData.githubToken = ""
-    github_client: Optional[Github] = state.initialize_github_client(token)
-    if github_client is None:
+    # All per-request GitHub state lives in the context, never in appData
+    ctx: Optional[BootstrapContext] = BootstrapContext.from_request(
+        values, token, workspace, job_id
+    )
+    if ctx is None:
         state.handle_error(
             "GitHub client could not be initialized. Check the token or configuration."
         )
+        await blocking_run(workspace.cleanup, state.status)
         return state
+    # The API commit backend never needs a clone of the repository
+    ctx.render_ahead = step == BootstrapStep.ALL and (
+        appData.renderAhead
+        or CommitBackend(appData.commitBackend) == CommitBackend.API
+    )
 
-    single_step: bool = len(steps) == 1  # Determine if this is a single-step execution
+    profiler: Optional[JobProfiler] = (
+        JobProfiler(job_id) if job_id and (profile or appData.profileAll) else None
+    )
+    if profiler is not None:
+        profileTarget.set(profiler)
+        profiler.start()
+    spawns: SpawnCount = SpawnCount()
+    spawns_token = spawnTarget.set(spawns)
+    metrics.bootstrapInflight.inc()
+    try:
+        if resume and step == BootstrapStep.ALL:
+            steps = await steps_resume(values, ctx, state)
+        await steps_run(values, ctx, state, steps, single_step)
+    finally:
+        metrics.bootstrapInflight.dec()
+        if profiler is not None:
+            profiler.stop()
+            profileTarget.set(None)
+            await blocking_run(profiler.save)
+        await blocking_run(workspace.cleanup, state.status)
+        spawnTarget.reset(spawns_token)
+        state.spawns = spawns.as_dict()
+        state.end_stamp()
+        metrics.bootstrapTotal.labels(
+            step.field, "success" if state.status else "failure"
+        ).inc()
+    return state
+
+
+async def steps_resume(
+    values: BootstrapModel, ctx: BootstrapContext, state: BootstrapState
+) -> list[BootstrapStep]:
+    """
+    Prepare a resumed complete run: keep the steps whose checkpoints hold
+    and clear the rest.
+
+    Args:
+        values (BootstrapModel): The bootstrap values provided.
+        ctx (BootstrapContext): The request context.
+        state (BootstrapState): The state of the previous attempt.
+
+    Returns:
+        list[BootstrapStep]: The steps that remain to be run.
+    """
+    state.resumed += 1
+    resume_after: int = await github_run(resume_plan, state, values, ctx)
+    remaining: list[BootstrapStep] = PIPELINE[resume_after + 1 :]
+    for kept in PIPELINE[: resume_after + 1]:
+        metrics.stepTotal.labels(kept.field, "resumed").inc()
+    LOG(
+        f"Resuming {values.plugin_title}: keeping "
+        f"{[s.field for s in PIPELINE[: resume_after + 1]]}, "
+        f"running {[s.field for s in remaining]}"
+    )
+    state.steps_clear([s.field for s in remaining])
+    return remaining
+
+
+async def prepare_userResolve(values: BootstrapModel, ctx: BootstrapContext) -> None:
+    # Also validates the token: GET /user fails for a bad one
+    await github_run(ctx.user_resolve)
+
+
+async def prepare_templateWarm(values: BootstrapModel, ctx: BootstrapContext) -> None:
+    await blocking_run(ctx.forge.template_ensure, appData.appTemplateRepo, ctx.org_name)
+    if appData.templateMirrorEnable:
+        mirror: TemplateMirror = templateMirror_get(ctx.org_name)
+        if not mirror.available():
+            await blocking_run(mirror.refresh)
+
+
+# Work that steps need but that does not depend on any step, started with
+# the run so that it overlaps repoExists/repoCreateInitial. Preparations
+# are best effort: a step does its own lookups if one failed.
+PREPARATIONS: dict[
+    str, Callable[[BootstrapModel, BootstrapContext], Awaitable[None]]
+] = {
+    "userResolve": prepare_userResolve,
+    "templateWarm": prepare_templateWarm,
+}
 
-    for current in steps:
-        method_name: Optional[str] = state.state_execute(
-            current, single_step=single_step
+# Rendering ahead, the checkout does not wait for the repository; the push does
+RENDER_AHEAD_DEPS: dict[str, frozenset[str]] = {
+    "gitClone": frozenset({"repoExists"}),
+    "gitCommit": frozenset({"shellExec", "repoCreateInitial"}),
+}
+
+
+def step_deps(current: BootstrapStep, ctx: BootstrapContext) -> frozenset[str]:
+    if ctx.render_ahead:
+        return RENDER_AHEAD_DEPS.get(current.field, current.deps)
+    return current.deps
+
+
+# The preparations each step waits for before it starts
+STEP_PREPARES: dict[str, tuple[str, ...]] = {
+    "gitClone": ("templateWarm",),
+    "shellExec": ("userResolve",),
+    "gitCommit": ("userResolve",),
+}
+
+
+async def prepare_run(name: str, values: BootstrapModel, ctx: BootstrapContext) -> None:
+    spawnStep.set(name)  # each preparation runs in its own task
+    try:
+        await PREPARATIONS[name](values, ctx)
+    except Exception as e:
+        LOG(f"Preparation '{name}' failed, steps will do without: {str(e)}")
+
+
+async def step_run(
+    values: BootstrapModel,
+    ctx: BootstrapContext,
+    state: BootstrapState,
+    current: BootstrapStep,
+    single_step: bool,
+) -> bool:
+    """
+    Execute one step, recording it into `state` and the metrics.
+
+    Args:
+        values (BootstrapModel): The bootstrap values provided.
+        ctx (BootstrapContext): The request context.
+        state (BootstrapState): The state to update.
+        current (BootstrapStep): The step to execute.
+        single_step (bool): If True, prerequisites are not checked.
+
+    Returns:
+        bool: False if the step raised and the run must stop.
+    """
+    method_name: Optional[str] = state.state_execute(
+        current, single_step=single_step, deps=step_deps(current, ctx)
+    )
+    if method_name is None:
+        metrics.stepTotal.labels(current.field, "skipped").inc()
+        return True  # Step was skipped
+
+    result: BootstrapStepBase = BootstrapStepBase()
+    step_token = spawnStep.set(current.field)
+    try:
+        step_func: Callable[
+            [BootstrapModel, BootstrapContext], Awaitable[BootstrapStepBase]
+        ] = globals()[method_name]
+
+        # Capture the starttime before executing the step
+        LOG(f"start time = {(starttime := result.start_stamp())}")
+        start_ns: int = result.start_ns
+        result = await step_func(values, ctx)
+        LOG(f"elapsed time = {result.stampFromStart(starttime, start_ns)}")
+        LOG(result)
+        metrics.step_observe(
+            current.field,
+            result.elapsed_ns,
+            "success" if result.status else "failure",
         )
-        if method_name is None:
-            continue  # Step was skipped
+        state.update(current.field, result)
+        if result.status and not single_step:
+            try:
+                state.checkpoints[current.field] = await blocking_run(
+                    checkpoint_record, current.field, values, ctx, result
+                )
+            except Exception as e:
+                # Without a checkpoint a resumed job runs the step again
+                logger.warning(
+                    f"Could not record the checkpoint of '{current.field}': {e}"
+                )
+    except KeyError:
+        state.handle_error(
+            f"Step '{current.field}' does not have a matching function '{method_name}'."
+        )
+        return False
+    except Exception as e:
+        result.end_stamp()
+        metrics.step_observe(current.field, result.elapsed_ns, "failure")
+        state.handle_error(
+            f"An error occurred while processing step '{current.field}': {str(e)}"
+        )
+        return False
+    finally:
+        spawnStep.reset(step_token)
+    return True
 
-        try:
-            step_func: Callable[
-                [BootstrapModel, Github], Awaitable[BootstrapStepBase]
-            ] = globals()[method_name]
-            result: BootstrapStepBase = BootstrapStepBase()
-
-            # Capture the starttime before executing the step
-            # starttime: str = result.start_stamp()
-            LOG(f"start time = {(starttime := result.start_stamp())}")
-            result = await step_func(values, github_client)
-            LOG(f"elapsed time = {result.stampFromStart(starttime)}")
-            LOG(result)
-            state.update(current.field, result)
-        except KeyError:
-            state.handle_error(
-                f"Step '{current.field}' does not have a matching function '{method_name}'."
+
+async def steps_run(
+    values: BootstrapModel,
+    ctx: BootstrapContext,
+    state: BootstrapState,
+    steps: list[BootstrapStep],
+    single_step: bool,
+) -> None:
+    """
+    Execute steps as a dependency graph: every step starts as soon as the
+    steps it depends on (`step_deps`) among `steps` and its
+    preparations (`STEP_PREPARES`) are done, and is skipped if one of
+    those steps failed. A step that raises stops the run; steps not yet
+    started are left out. A single step runs on its own, without
+    preparations.
+
+    Args:
+        values (BootstrapModel): The bootstrap values provided.
+        ctx (BootstrapContext): The request context.
+        state (BootstrapState): The state to update.
+        steps (list[BootstrapStep]): The steps to execute.
+        single_step (bool): If True, prerequisites are not checked.
+    """
+    if single_step:
+        await step_run(values, ctx, state, steps[0], single_step)
+        return
+
+    profiler: Optional[JobProfiler] = profileTarget.get()
+    tasks: dict[str, asyncio.Task] = {}
+    halted: bool = False
+
+    def task_start(name: str, coro: Awaitable[object]) -> asyncio.Task:
+        task: asyncio.Task = asyncio.ensure_future(coro)
+        if profiler is not None:
+            profiler.task_add(task)
+        tasks[name] = task
+        return task
+
+    async def node_run(current: BootstrapStep) -> None:
+        nonlocal halted
+        waits: list[asyncio.Task] = [
+            tasks[name]
+            for name in (
+                *step_deps(current, ctx),
+                *STEP_PREPARES.get(current.field, ()),
             )
-            break
-        except Exception as e:
-            state.handle_error(
-                f"An error occurred while processing step '{current.field}': {str(e)}"
+            if name in tasks
+        ]
+        if waits:
+            await asyncio.wait(waits)
+        if halted:
+            return
+        if not await step_run(values, ctx, state, current, single_step):
+            halted = True
+
+    wanted: set[str] = {
+        name for current in steps for name in STEP_PREPARES.get(current.field, ())
+    }
+    for name in PREPARATIONS:
+        if name in wanted:
+            task_start(name, prepare_run(name, values, ctx))
+    # Dependencies come first in `steps`, so each node finds theirs started
+    nodes: list[asyncio.Task] = [
+        task_start(current.field, node_run(current)) for current in steps
+    ]
+    try:
+        await asyncio.gather(*nodes)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+
+async def batch_warm(values_list: list[BootstrapModel], token: Optional[str]) -> None:
+    """
+    Resolve, once, what every item of a batch would otherwise look up
+    concurrently: the token's user and each organization. The results land
+    in the pooled session's memo, which all items share.
+
+    Args:
+        values_list (list[BootstrapModel]): The batch items.
+        token (Optional[str]): Optional per-request GitHub token.
+    """
+    ctx: Optional[BootstrapContext] = (
+        BootstrapContext.from_request(values_list[0], token, Workspace.shared())
+        if values_list
+        else None
+    )
+    if ctx is None:
+        return
+    try:
+        await github_run(ctx.user_resolve)
+        for org_name in {
+            (values.organization or appData.appOrganization) for values in values_list
+        }:
+            if ctx.github_client is not None:
+                await github_run(ctx.github_client.organization_get, org_name)
+    except Exception as e:
+        LOG(f"Batch warm-up failed, items will resolve on their own: {str(e)}")
+
+
+async def bootstrap_batchStream(
+    values_list: list[BootstrapModel],
+    concurrency: int,
+    token: Optional[str] = None,
+) -> AsyncIterator[BatchItemResult]:
+    """
+    Run complete bootstraps for many plugins, at most `concurrency` at a
+    time, yielding each result as soon as its item finishes.
+
+    Args:
+        values_list (list[BootstrapModel]): The bootstrap values, one per plugin.
+        concurrency (int): Maximum number of bootstraps running at once.
+        token (Optional[str]): Optional GitHub token to override the default.
+
+    Yields:
+        BatchItemResult: Per-item results, in order of completion.
+    """
+    batch_id: str = uuid.uuid4().hex[:12]
+    gate: asyncio.Semaphore = asyncio.Semaphore(max(1, concurrency))
+    await batch_warm(values_list, token)
+
+    async def item_run(index: int, values: BootstrapModel) -> BatchItemResult:
+        async with gate:
+            start: float = time.perf_counter()
+            state: BootstrapState = await bootstrap_exec(
+                values, BootstrapStep.ALL, token, job_id=f"batch-{batch_id}-{index}"
             )
-            break
-    state.end_stamp()
-    return state
+            return BatchItemResult(
+                index=index,
+                plugin_title=values.plugin_title,
+                elapsed_seconds=round(time.perf_counter() - start, 3),
+                state=state,
+            )
+
+    tasks: list[asyncio.Task] = [
+        asyncio.create_task(item_run(index, values))
+        for index, values in enumerate(values_list)
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def batch_summarize(
+    items: list[BatchItemResult], concurrency: int, wall_seconds: float
+) -> BatchResponse:
+    """
+    Summarize a finished batch.
+
+    Args:
+        items (list[BatchItemResult]): The item results.
+        concurrency (int): The concurrency the batch ran with.
+        wall_seconds (float): Wall time of the whole batch.
+
+    Returns:
+        BatchResponse: The results in request order, with timings.
+    """
+    succeeded: int = sum(1 for item in items if item.state.status)
+    return BatchResponse(
+        status=succeeded == len(items),
+        message=f"{succeeded}/{len(items)} bootstraps succeeded",
+        concurrency=concurrency,
+        wall_seconds=round(wall_seconds, 3),
+        items=sorted(items, key=lambda item: item.index),
+    )
+
+
+async def bootstrap_batch(
+    values_list: list[BootstrapModel],
+    concurrency: int,
+    token: Optional[str] = None,
+) -> BatchResponse:
+    """
+    Run complete bootstraps for many plugins and return all results at once.
+
+    Args:
+        values_list (list[BootstrapModel]): The bootstrap values, one per plugin.
+        concurrency (int): Maximum number of bootstraps running at once.
+        token (Optional[str]): Optional GitHub token to override the default.
+
+    Returns:
+        BatchResponse: Per-item states in request order, with timings.
+    """
+    start: float = time.perf_counter()
+    items: list[BatchItemResult] = [
+        item async for item in bootstrap_batchStream(values_list, concurrency, token)
+    ]
+    return batch_summarize(items, concurrency, time.perf_counter() - start)
@@ -0,0 +1,315 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from loguru import logger
+
+from app.config.settings import appData
+from app.core.controllers import bootstrapController
+from app.db.mongo_client import jobStore
+from app.models.bootstrapModel import BootstrapModel, BootstrapStep
+from app.models.jobModel import JobRecord, JobStatus, JobSubmitted
+from app.utils.events import EventChannel, eventChannel_create, eventChannels
+from app.utils.metrics import jobsQueued
+from app.utils.rateLimit import rateLimiter
+
+
+# Same format as BootstrapStepBase.TIMESTAMP_FORMAT
+TIMESTAMP_FORMAT: str = "%Y-%m-%d_%H:%M:%S"
+
+
+def timestamp_now() -> str:
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+class JobManager:
+    """
+    An in-process queue of bootstrap jobs drained by a pool of asyncio
+    worker tasks. Job records are kept in memory (most recent
+    `appData.jobHistoryMax` of them) and are updated live as each step
+    of the bootstrap completes. Every change is also persisted to the
+    job store, which answers for records no longer held in memory.
+    """
+
+    def __init__(self, workers: int, history_max: int) -> None:
+        """
+        Constructor for the JobManager class.
+
+        Args:
+            workers (int): Number of concurrent worker tasks.
+            history_max (int): Maximum number of job records to retain.
+        """
+        self.workers: int = max(1, workers)
+        self.history_max: int = history_max
+        self.jobs: OrderedDict[str, JobRecord] = OrderedDict()
+        self.queue: asyncio.Queue | None = None
+        self.tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Create the queue and start the worker tasks"""
+        self.queue = asyncio.Queue()
+        jobsQueued.set_function(lambda: self.queue.qsize() if self.queue else 0)
+        self.tasks = [
+            asyncio.create_task(self.worker_run(i), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel all worker tasks"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def revision_bump(self, record: JobRecord) -> None:
+        record.revision += 1
+        jobStore.record_save(record)
+
+    def status_publish(self, record: JobRecord, event: str) -> None:
+        channel: EventChannel | None = eventChannels.get(record.job_id)
+        if channel is not None:
+            channel.publish(event, {"job_status": record.status.value})
+
+    def history_trim(self) -> None:
+        """Evict the oldest finished jobs beyond `history_max`"""
+        excess: int = len(self.jobs) - self.history_max
+        if excess <= 0:
+            return
+        for job_id in [
+            job_id
+            for job_id, record in self.jobs.items()
+            if record.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+        ][:excess]:
+            del self.jobs[job_id]
+            eventChannels.pop(job_id, None)
+
+    def job_submit(
+        self,
+        values: BootstrapModel,
+        step: BootstrapStep,
+        token: Optional[str] = None,
+        profile: bool = False,
+    ) -> JobSubmitted:
+        """
+        Enqueue a bootstrap and return immediately.
+
+        Args:
+            values (BootstrapModel): The bootstrap values provided.
+            step (BootstrapStep): The step to execute.
+            token (Optional[str]): Optional GitHub token to override the default.
+            profile (bool): Record a profile of the job.
+
+        Returns:
+            JobSubmitted: The id of the new job.
+        """
+        if self.queue is None:
+            raise RuntimeError("JobManager has not been started")
+        record: JobRecord = self.record_create(values, step)
+        record.profiled = profile or appData.profileAll
+        self.record_track(record)
+        self.jobs[record.job_id] = record
+        self.history_trim()
+        jobStore.record_save(record)
+        # The token travels with the queue item only and is never stored
+        self.queue.put_nowait(
+            (record.job_id, values, step, token, record.profiled, False)
+        )
+        return JobSubmitted(job_id=record.job_id, status=record.status)
+
+    def record_track(self, record: JobRecord) -> None:
+        """Publish and persist every change of a queued job's state"""
+        channel: EventChannel = eventChannel_create(record.job_id)
+        record.state.observers_clear()
+        record.state.observer_add(lambda field: self.revision_bump(record))
+        record.state.observer_add(
+            lambda field: channel.state_publish(record.state, field)
+        )
+
+    async def job_resume(
+        self, job_id: str, token: Optional[str] = None
+    ) -> JobSubmitted | None:
+        """
+        Queue a failed complete bootstrap again. It continues where it
+        failed: steps whose checkpoints still hold are not run again.
+
+        Args:
+            job_id (str): The job to resume.
+            token (Optional[str]): Optional GitHub token to override the default.
+
+        Returns:
+            JobSubmitted | None: The queued job, None if there is no such job.
+
+        Raises:
+            ValueError: If the job cannot be resumed.
+        """
+        if self.queue is None:
+            raise RuntimeError("JobManager has not been started")
+        record: JobRecord | None = await self.job_find(job_id)
+        if record is None:
+            return None
+        if record.status != JobStatus.FAILED:
+            raise ValueError(f"Job '{job_id}' is {record.status.value}, not failed")
+        if record.step != BootstrapStep.ALL.field or record.values is None:
+            raise ValueError(f"Job '{job_id}' is not a complete bootstrap")
+        record.status = JobStatus.QUEUED
+        record.started = ""
+        record.finished = ""
+        self.record_track(record)
+        self.jobs[job_id] = record
+        self.jobs.move_to_end(job_id)
+        self.revision_bump(record)
+        self.queue.put_nowait(
+            (job_id, record.values, BootstrapStep.ALL, token, record.profiled, True)
+        )
+        return JobSubmitted(job_id=job_id, status=record.status)
+
+    def record_create(self, values: BootstrapModel, step: BootstrapStep) -> JobRecord:
+        return JobRecord(
+            job_id=uuid.uuid4().hex,
+            step=step.field,
+            organization=values.organization,
+            plugin_title=values.plugin_title,
+            created=datetime.now(timezone.utc),
+            values=values,
+        )
+
+    def job_get(self, job_id: str) -> JobRecord | None:
+        return self.jobs.get(job_id)
+
+    async def job_find(self, job_id: str) -> JobRecord | None:
+        """
+        Return a job record from memory or, once evicted or after a
+        restart, from the job store.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            JobRecord | None: The record, or None if the job is unknown.
+        """
+        return self.jobs.get(job_id) or await jobStore.record_get(job_id)
+
+    async def jobs_find(
+        self,
+        organization: Optional[str] = None,
+        plugin_title: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        limit: int = 50,
+    ) -> list[JobRecord]:
+        """
+        Return the history of jobs from the job store, newest first.
+
+        Args:
+            organization (Optional[str]): Only jobs for this organization.
+            plugin_title (Optional[str]): Only jobs for this plugin.
+            status (Optional[JobStatus]): Only jobs in this status.
+            limit (int): Maximum number of records.
+
+        Returns:
+            list[JobRecord]: The matching records.
+        """
+        return await jobStore.records_find(organization, plugin_title, status, limit)
+
+    async def job_runInline(
+        self,
+        values: BootstrapModel,
+        step: BootstrapStep,
+        token: Optional[str] = None,
+    ) -> JobRecord:
+        """
+        Run a bootstrap in the caller's request, outside the queue, while
+        keeping a job record of it like for a queued job.
+
+        Args:
+            values (BootstrapModel): The bootstrap values provided.
+            step (BootstrapStep): The step to execute.
+            token (Optional[str]): Optional GitHub token to override the default.
+
+        Returns:
+            JobRecord: The finished job.
+        """
+        record: JobRecord = self.record_create(values, step)
+        record.state.observer_add(lambda field: self.revision_bump(record))
+        record.status = JobStatus.RUNNING
+        record.started = timestamp_now()
+        self.jobs[record.job_id] = record
+        self.history_trim()
+        jobStore.record_save(record)
+        try:
+            await bootstrapController.bootstrap_exec(
+                values, step, token, state=record.state, job_id=record.job_id
+            )
+        finally:
+            record.status = (
+                JobStatus.SUCCEEDED if record.state.status else JobStatus.FAILED
+            )
+            record.finished = timestamp_now()
+            self.revision_bump(record)
+        return record
+
+    async def admission_wait(self, job_id: str, token: Optional[str]) -> None:
+        """
+        Hold a queued job until its token has enough GitHub budget left for
+        a whole bootstrap, so it does not stall half way through.
+
+        Args:
+            job_id (str): The job id, for logging.
+            token (Optional[str]): The job's GitHub token.
+        """
+        token = token or appData.githubToken_get()
+        delay: float = rateLimiter.admission_delay(token)
+        if delay > 0:
+            logger.info(f"Job {job_id} waits {delay:.0f}s for GitHub rate limit")
+        while delay > 0:
+            await asyncio.sleep(min(delay, 5.0))
+            delay = rateLimiter.admission_delay(token)
+
+    async def worker_run(self, worker: int) -> None:
+        """
+        Drain the queue, executing one bootstrap at a time.
+
+        Args:
+            worker (int): Index of this worker, for logging.
+        """
+        assert self.queue is not None
+        while True:
+            job_id, values, step, token, profile, resume = await self.queue.get()
+            record: JobRecord | None = self.jobs.get(job_id)
+            try:
+                if record is None:
+                    continue
+                await self.admission_wait(job_id, token)
+                record.status = JobStatus.RUNNING
+                record.started = timestamp_now()
+                self.revision_bump(record)
+                self.status_publish(record, "job")
+                logger.info(f"worker {worker} running job {job_id}")
+                await bootstrapController.bootstrap_exec(
+                    values,
+                    step,
+                    token,
+                    state=record.state,
+                    job_id=job_id,
+                    profile=profile,
+                    resume=resume,
+                )
+                record.status = (
+                    JobStatus.SUCCEEDED if record.state.status else JobStatus.FAILED
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} raised: {str(e)}")
+                record.state.handle_error(f"Job failed with exception: {str(e)}")
+                record.status = JobStatus.FAILED
+            finally:
+                if record is not None:
+                    record.finished = timestamp_now()
+                    self.revision_bump(record)
+                    self.status_publish(record, "done")
+                self.queue.task_done()
+
+
+jobManager: JobManager = JobManager(appData.jobWorkers, appData.jobHistoryMax)
@@ -5,8 +5,19 @@ from app.models.bootstrapModel import BootstrapModel
 from app.api.v1.routes.usersRouter import router as user_router  # Example route
 from app.api.v1.routes.credentialRouter import router as credential_router
 from app.api.v1.routes.bootstrapRouter import router as bootstrap_router
+from app.api.v1.routes.jobsRouter import router as jobs_router
+from app.core.controllers.jobsController import jobManager
+from app.db.mongo_client import jobStore
+from app.utils.executor import blockingExecutor
+from app.utils.githubPool import githubPool
+from app.utils.templateMirror import templateMirror_refreshLoop
+from app.utils.workspace import workspaces_pruneLoop
+from app.config.settings import appData
+from prometheus_client import make_asgi_app
+import asyncio
+from contextlib import asynccontextmanager
 from os import path
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 import toml
 
 # Metadata for OpenAPI documentation
@@ -18,6 +29,13 @@ tags_metadata: List[Dict[str, str]] = [
             with user-specified configurations.
         """,
     },
+    {
+        "name": "Job services",
+        "description": """
+            Provide API endpoints for polling bootstrap jobs that were
+            submitted asynchronously.
+        """,
+    },
     {
         "name": "Credentialling services",
         "description": """
@@ -46,12 +64,37 @@ str_version: str = pyproject_data["project"]["version"]
 
 print(f"Starting server '{str_name}:{str_version}' -- {str_about}")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Startup/shutdown hooks for shared server resources"""
+    await jobStore.start()
+    await jobManager.start()
+    mirror_task: asyncio.Task | None = (
+        asyncio.create_task(templateMirror_refreshLoop(appData.templateMirrorRefresh))
+        if appData.templateMirrorEnable
+        else None
+    )
+    prune_task: asyncio.Task = asyncio.create_task(
+        workspaces_pruneLoop(appData.workspacePruneInterval)
+    )
+    yield
+    prune_task.cancel()
+    if mirror_task is not None:
+        mirror_task.cancel()
+    await jobManager.stop()
+    await jobStore.stop()
+    githubPool.invalidate()
+    blockingExecutor.shutdown(wait=False)
+
+
 # Create FastAPI app instance
 app: FastAPI = FastAPI(
     title="Bootstrap API Service",
     version=str_version,
     description=str_about,
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -65,5 +108,9 @@ app.add_middleware(
 
 # Include routers
 app.include_router(bootstrap_router, prefix="/api/vi")
+app.include_router(jobs_router, prefix="/api/v1")
 app.include_router(user_router, prefix="/api/v1")
 app.include_router(credential_router, prefix="/api/v1")
+
+# Prometheus metrics (step latencies, outcomes, in-flight work, GitHub calls)
+app.mount("/metrics", make_asgi_app())
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, EmailStr, AnyUrl, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, EmailStr, AnyUrl, ConfigDict, PrivateAttr
+from typing import Callable, Optional
 import pudb
 from pudb.remote import set_trace
 from pathlib import Path
@@ -8,21 +8,28 @@ from app.config.settings import appData
 from github import Github
 from git import Repo
 from app.utils.jobController import JobResult
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
 
 
 class BootstrapStep(Enum):
-    ALL = ("all", None)
-    REPO_EXISTS = ("repoExists", None)
-    REPO_CREATE = ("repoCreateInitial", "repoExists")
-    REPO_CLONE = ("gitClone", "repoCreateInitial")
-    SCRIPT_EDIT = ("shellEdit", "gitClone")
-    SCRIPT_EXEC = ("shellExec", "shellEdit")
-    GIT_COMMIT = ("gitCommit", "shellExec")  # New state for committing changes
-
-    def __init__(self, field: str, prev_field: str | None) -> None:
+    """
+    The bootstrap steps, each with the steps whose results it needs. In a
+    complete run a step starts as soon as all of those have succeeded and
+    is skipped if any of them failed.
+    """
+
+    ALL = ("all", ())
+    REPO_EXISTS = ("repoExists", ())
+    REPO_CREATE = ("repoCreateInitial", ("repoExists",))
+    REPO_CLONE = ("gitClone", ("repoCreateInitial",))
+    SCRIPT_EDIT = ("shellEdit", ("gitClone",))
+    SCRIPT_EXEC = ("shellExec", ("shellEdit",))
+    GIT_COMMIT = ("gitCommit", ("shellExec",))  # New state for committing changes
+
+    def __init__(self, field: str, deps: tuple[str, ...]) -> None:
         self.field: str = field
-        self.prev_field: str | None = prev_field
+        self.deps: frozenset[str] = frozenset(deps)
 
 
 class BootstrapResponse(BaseModel):
@@ -42,16 +49,23 @@ class BootstrapStepBase(BaseModel):
     message: str = Field(default="", description="Message associated with the step")
     starttime: str = Field(default="", description="Timestamp when the step started")
     endtime: str = Field(default="", description="Timestamp when the step ended")
+    start_ns: int = Field(
+        default=0, description="Monotonic clock (ns) when the step started"
+    )
+    end_ns: int = Field(default=0, description="Monotonic clock (ns) when the step ended")
+    elapsed_ns: int = Field(default=0, description="Duration of the step in ns")
 
     def start_stamp(self, timestamp: str | None = None) -> str:
         """
         Sets the starttime field to the current timestamp or to the provided timestamp.
+        The monotonic start_ns is always taken now.
 
         Args:
             timestamp (str | None): Optional timestamp string. If provided, sets starttime to this value.
                                     If None, sets starttime to the current timestamp.
         """
         self.starttime = timestamp or datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        self.start_ns = time.monotonic_ns()
         return self.starttime
 
     def end_stamp(self, timestamp: str | None = None) -> str:
@@ -63,15 +77,22 @@ class BootstrapStepBase(BaseModel):
                                     If None, sets endtime to the current timestamp.
         """
         self.endtime = timestamp or datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        self.end_ns = time.monotonic_ns()
+        if self.start_ns:
+            self.elapsed_ns = self.end_ns - self.start_ns
         return self.endtime
 
     def elapsed_time(self) -> str:
         """
-        Calculate the elapsed time between starttime and endtime.
+        Calculate the elapsed time between starttime and endtime. The
+        monotonic clock is used when available, so that sub-second steps
+        and wall-clock jumps are timed correctly.
 
         Returns:
-            str: Elapsed time in HH:MM:SS format, or a message if timestamps are invalid.
+            str: Elapsed time in HH:MM:SS[.ffffff] format, or a message if timestamps are invalid.
         """
+        if self.elapsed_ns:
+            return str(timedelta(microseconds=self.elapsed_ns // 1000))
         try:
             start = datetime.strptime(self.starttime, self.TIMESTAMP_FORMAT)
             end = datetime.strptime(self.endtime, self.TIMESTAMP_FORMAT)
@@ -80,18 +101,20 @@ class BootstrapStepBase(BaseModel):
         except ValueError:
             return "Invalid timestamps"
 
-    def stampFromStart(self, timestart: str) -> str:
+    def stampFromStart(self, timestart: str, start_ns: int = 0) -> str:
         """
         Updates the starttime and endtime fields, and calculates the elapsed time.
 
         Args:
             timestart (str): The start timestamp in the format defined by TIMESTAMP_FORMAT.
+            start_ns (int): The monotonic start, from the `start_ns` of the same stamp.
 
         Returns:
             str: The elapsed time between the provided starttime and the current endtime,
                  formatted as HH:MM:SS, or an error message if the timestamps are invalid.
         """
         self.starttime = timestart
+        self.start_ns = start_ns
         self.end_stamp()
         return self.elapsed_time()
 
@@ -126,10 +149,19 @@ class GithubRepoCheck(BootstrapStepBase):
     repo_exists: bool = False
 
 
+class RepoPollStats(BaseModel):
+    """Outcome of waiting for a new repository to become available"""
+
+    available: bool = False
+    probes: int = 0
+    waited_seconds: float = 0.0
+
+
 class GithubRepoCreate(BootstrapStepBase):
     repo_name: str
     repo_created: bool = False  # Tracks if repo was actually created
     repo_url: Optional[str] = None  # Store the URL of created repo
+    poll: Optional[RepoPollStats] = None  # How long availability took
 
 
 class GitRepoDetails(BootstrapStepBase):
@@ -149,6 +181,18 @@ class GitCloneResponse(BootstrapStepBase):
     """
 
     details: Optional[GitRepoDetails] = None
+    clone_seconds: float = Field(default=0.0, description="Wall time of the clone")
+    transfer_bytes: int = Field(
+        default=0, description="Size of the object data received by the clone"
+    )
+    reference: str = Field(
+        default="", description="Local mirror the clone borrowed objects from"
+    )
+    strategy: str = Field(default="full", description="Clone strategy used")
+    template_commit: str = Field(
+        default="",
+        description="Template commit rendered ahead of the repository, if any",
+    )
 
 
 class ShellEditStep(BootstrapStepBase):
@@ -162,6 +206,26 @@ class ShellExecStep(BootstrapStepBase):
 
 class GitCommitResponse(BootstrapStepBase):
     details: Optional[GitRepoDetails] = None
+    commit_sha: str = Field(default="", description="The commit now on the remote")
+    backend: str = Field(default="git", description="How the commit was made")
+
+
+class StepCheckpoint(BaseModel):
+    """
+    What a successful step left behind, recorded so that a resumed job can
+    verify it still holds and skip the step
+    """
+
+    step: str
+    at: str = Field(default="", description="Timestamp when the step completed")
+    repo_url: str = Field(default="", description="The created repository")
+    path: str = Field(default="", description="The local checkout")
+    commit: str = Field(default="", description="HEAD of the checkout after the step")
+    digest: str = Field(
+        default="",
+        description="SHA-256 of the edited bootstrap.sh, or of the changes "
+        "bootstrap.sh left uncommitted",
+    )
 
 
 class BootstrapState(BootstrapStepBase):
@@ -173,6 +237,38 @@ class BootstrapState(BootstrapStepBase):
     shellEdit: ShellEditStep | None = None
     shellExec: ShellExecStep | None = None
     gitCommit: GitCommitResponse | None = None
+    checkpoints: dict[str, StepCheckpoint] = Field(
+        default_factory=dict, description="Checkpoints of the steps that succeeded"
+    )
+    resumed: int = Field(default=0, description="Number of times the job was resumed")
+    spawns: dict[str, int] = Field(
+        default_factory=dict, description="Processes started by the run, by step"
+    )
+
+    _observers: list[Callable[[str], None]] = PrivateAttr(default_factory=list)
+
+    def observer_add(self, callback: Callable[[str], None]) -> None:
+        """
+        Register a callback that is called with the name of the changed field
+        every time the state is updated.
+
+        Args:
+            callback (Callable[[str], None]): The observer callback.
+        """
+        self._observers.append(callback)
+
+    def observers_clear(self) -> None:
+        self._observers.clear()
+
+    def observers_notify(self, field: str) -> None:
+        """
+        Notify all registered observers that a field has changed.
+
+        Args:
+            field (str): The name of the changed field.
+        """
+        for callback in self._observers:
+            callback(field)
 
     def statusOverall_update(self, status: Optional[bool] = None) -> None:
         """
@@ -237,54 +333,55 @@ class BootstrapState(BootstrapStepBase):
         """
         self.statusOverall_update(False)
         self.messageOverall_update(message)
-
-    @staticmethod
-    def initialize_github_client(token: Optional[str]) -> Github | None:
-        """
-        Initialize the GitHub client.
-
-        Args:
-            token (Optional[str]): Optional GitHub token for authentication.
-
-        Returns:
-            Github | None: The initialized GitHub client or None if unavailable.
-        """
-        if token:
-            appData.githubToken = token
-        return (
-            Github(appData.githubToken)
-            if appData.githubToken
-            else appData.githubClient_get()
-        )
+        self.observers_notify("message")
 
     def state_execute(
-        self, step: BootstrapStep, single_step: bool = False
+        self,
+        step: BootstrapStep,
+        single_step: bool = False,
+        deps: Optional[frozenset[str]] = None,
     ) -> str | None:
         """
         Determine if the step can be executed and return the method name.
 
         Args:
             step (BootstrapStep): The step to execute.
-            single_step (bool): If True, bypass checks for the status of the previous step.
+            single_step (bool): If True, bypass checks for the status of the steps it depends on.
+            deps (Optional[frozenset[str]]): The steps it depends on, if not `step.deps`.
 
         Returns:
             str | None: The dynamic method name ('bootstrap_<step.field>') if executable, otherwise None.
         """
-        if not single_step and step.prev_field:
-            # Check the status of the previous step
-            if not (
-                getattr(self, step.prev_field) and getattr(self, step.prev_field).status
-            ):
-                step_model: BootstrapStepBase | None = getattr(self, step.field, None)
-                if step_model:
-                    step_model.skip_with_message(
-                        f"{step.prev_field.replace('_', ' ')} failed"
+        if not single_step:
+            # Check the status of the steps it depends on
+            for dep in sorted(step.deps if deps is None else deps):
+                if not (getattr(self, dep) and getattr(self, dep).status):
+                    step_model: BootstrapStepBase | None = getattr(
+                        self, step.field, None
                     )
-                return None  # Skip this step
+                    if step_model:
+                        step_model.skip_with_message(f"{dep.replace('_', ' ')} failed")
+                    return None  # Skip this step
 
         # Return the dynamic method name
         return f"bootstrap_{step.field}"
 
+    def steps_clear(self, fields: list[str]) -> None:
+        """
+        Forget the results and checkpoints of steps that are about to run
+        again, e.g. when a job is resumed.
+
+        Args:
+            fields (list[str]): The step fields to clear.
+        """
+        for field in fields:
+            setattr(self, field, None)
+            self.checkpoints.pop(field, None)
+        self.statusOverall_update()
+        self.messageOverall_update()
+        for field in fields:
+            self.observers_notify(field)
+
     def update(self, field: str, result: BootstrapStepBase) -> None:
         """
         Update a field in the state and recalculate overall status and message.
@@ -296,3 +393,23 @@ class BootstrapState(BootstrapStepBase):
         setattr(self, field, result)
         self.statusOverall_update()
         self.messageOverall_update()
+        self.observers_notify(field)
+
+
+class BatchItemResult(BaseModel):
+    """The outcome of one bootstrap in a batch"""
+
+    index: int = Field(description="Position of the item in the request")
+    plugin_title: str
+    elapsed_seconds: float = 0.0
+    state: BootstrapState
+
+
+class BatchResponse(BaseModel):
+    """The outcome of a batch of bootstraps"""
+
+    status: bool = Field(default=False, description="True if every item succeeded")
+    message: str = ""
+    concurrency: int = 1
+    wall_seconds: float = Field(default=0.0, description="Wall time of the batch")
+    items: list[BatchItemResult] = []
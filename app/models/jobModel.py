@@ -0,0 +1,69 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from enum import Enum
+from app.models.bootstrapModel import BootstrapModel, BootstrapState
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobSubmitted(BaseModel):
+    """Returned (with HTTP 202) when a bootstrap is accepted as a job"""
+
+    job_id: str
+    status: JobStatus = JobStatus.QUEUED
+    location: str = Field(default="", description="URL to poll for job state")
+
+
+class JobRecord(BaseModel):
+    """The live record of a bootstrap job"""
+
+    job_id: str
+    step: str = "all"
+    organization: str = ""
+    plugin_title: str = ""
+    status: JobStatus = JobStatus.QUEUED
+    created: datetime | None = Field(default=None, description="When it was submitted")
+    started: str = ""
+    finished: str = ""
+    profiled: bool = Field(
+        default=False, description="A profile is recorded for this job"
+    )
+    revision: int = Field(
+        default=0, description="Incremented on every change to this record"
+    )
+    values: BootstrapModel | None = Field(
+        default=None, description="The bootstrap values, kept to resume the job"
+    )
+    state: BootstrapState = Field(default_factory=BootstrapState)
+
+    def etag(self) -> str:
+        """
+        Return an ETag that changes whenever the record changes.
+
+        Returns:
+            str: A weak ETag derived from the job id and revision.
+        """
+        return f'W/"{self.job_id}-{self.revision}"'
+
+
+class RateLimitState(BaseModel):
+    """The GitHub request budget of one token, as last reported by GitHub"""
+
+    token: str = Field(description="Prefix of the token's SHA-256 digest")
+    limit: int | None = None
+    remaining: int | None = None
+    reset: float | None = Field(
+        default=None, description="Epoch seconds at which the budget resets"
+    )
+    blocked_for: float = Field(
+        default=0.0, description="Seconds until the next request may be sent"
+    )
+    inflight: int = 0
+    waiting: int = 0
+    throttled: int = Field(default=0, description="Requests that had to wait")
+    limited: int = Field(default=0, description="Rate limit responses received")
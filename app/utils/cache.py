@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    A small thread-safe LRU cache whose entries also expire after a time to
+    live. The TTL can be overridden per entry. Values that hold resources
+    can be released with `on_evict`, which is called (outside the lock) for
+    every value that is evicted, expires, is replaced or is invalidated.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        on_evict: Optional[Callable[[V], None]] = None,
+    ) -> None:
+        """
+        Constructor for the TTLCache class.
+
+        Args:
+            maxsize (int): Maximum number of entries; the least recently used
+                           entry is evicted beyond this.
+            ttl (float): Default time to live of an entry, in seconds.
+            on_evict (Optional[Callable[[V], None]]): Releases a dropped value.
+        """
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self.on_evict: Optional[Callable[[V], None]] = on_evict
+        self.hits: int = 0
+        self.misses: int = 0
+        self._data: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._lock: threading.RLock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def evicted(self, values: list[V]) -> None:
+        if self.on_evict is not None:
+            for value in values:
+                self.on_evict(value)
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """
+        Return the live entry for `key`, or `default`.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Optional[V]): Returned on a miss.
+
+        Returns:
+            Optional[V]: The cached value or `default`.
+        """
+        with self._lock:
+            entry: tuple[float, V] | None = self._data.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+        self.evicted([entry[1]] if entry is not None else [])
+        return default
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> V:
+        """
+        Store `value` under `key`.
+
+        Args:
+            key (Hashable): The cache key.
+            value (V): The value.
+            ttl (Optional[float]): Time to live, overriding the default.
+
+        Returns:
+            V: The value.
+        """
+        dropped: list[V] = []
+        with self._lock:
+            expires: float = time.monotonic() + (self.ttl if ttl is None else ttl)
+            replaced: tuple[float, V] | None = self._data.get(key)
+            if replaced is not None and replaced[1] is not value:
+                dropped.append(replaced[1])
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                dropped.append(self._data.popitem(last=False)[1][1])
+        self.evicted(dropped)
+        return value
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], V]) -> V:
+        """
+        Return the entry for `key`, creating it with `factory` on a miss. The
+        factory runs outside the cache lock (it may be a network call), so
+        threads that miss at the same time may each call it.
+
+        Args:
+            key (Hashable): The cache key.
+            factory (Callable[[], V]): Creates the value.
+
+        Returns:
+            V: The cached or newly created value.
+        """
+        sentinel: Any = object()
+        value: Any = self.get(key, sentinel)
+        if value is sentinel:
+            value = self.set(key, factory())
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop one entry, or all entries if `key` is None.
+
+        Args:
+            key (Optional[Hashable]): The key to drop.
+        """
+        with self._lock:
+            if key is None:
+                dropped: list[V] = [value for _, value in self._data.values()]
+                self._data.clear()
+            else:
+                entry: tuple[float, V] | None = self._data.pop(key, None)
+                dropped = [entry[1]] if entry is not None else []
+        self.evicted(dropped)
@@ -0,0 +1,250 @@
+import hashlib
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import git
+from loguru import logger
+
+from app.models.bootstrapModel import (
+    BootstrapModel,
+    BootstrapState,
+    BootstrapStep,
+    BootstrapStepBase,
+    GithubRepoCreate,
+    StepCheckpoint,
+)
+from app.utils.context import BootstrapContext
+from app.utils.rateLimit import RateLimitDeferred
+from app.utils.snapshot import head_commit, repo_open, snapshot_digest
+from app.utils.spawns import CountedRepo
+
+# The steps of a complete bootstrap, in pipeline order
+PIPELINE: list[BootstrapStep] = [
+    step for step in BootstrapStep if step != BootstrapStep.ALL
+]
+
+# Same format as BootstrapStepBase.TIMESTAMP_FORMAT
+TIMESTAMP_FORMAT: str = "%Y-%m-%d_%H:%M:%S"
+
+# Steps whose checkpoint is the state of the local checkout
+LOCAL_STEPS: tuple[str, ...] = ("gitClone", "shellEdit", "shellExec")
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def head_get(repo_path: Path) -> str:
+    return head_commit(repo_open(repo_path)).hexsha
+
+
+def checkpoint_record(
+    field: str,
+    values: BootstrapModel,
+    ctx: BootstrapContext,
+    result: BootstrapStepBase,
+) -> StepCheckpoint:
+    """
+    Record what a successful step left behind. This is blocking.
+
+    Args:
+        field (str): The step field, e.g. "gitClone".
+        values (BootstrapModel): The bootstrap values.
+        ctx (BootstrapContext): The request context.
+        result (BootstrapStepBase): The step's result.
+
+    Returns:
+        StepCheckpoint: The checkpoint.
+    """
+    checkpoint: StepCheckpoint = StepCheckpoint(
+        step=field, at=datetime.now().strftime(TIMESTAMP_FORMAT)
+    )
+    repo_path: Path = ctx.workspace.repo_path(values.plugin_title)
+    if isinstance(result, GithubRepoCreate):
+        checkpoint.repo_url = result.repo_url or ""
+    elif field in LOCAL_STEPS:
+        checkpoint.path = str(repo_path)
+        checkpoint.commit = head_get(repo_path)
+        if field == "shellEdit":
+            checkpoint.digest = file_digest(repo_path / "bootstrap.sh")
+        elif field == "shellExec":
+            # What bootstrap.sh generated is committed only by gitCommit
+            checkpoint.digest = snapshot_digest(repo_path)
+    return checkpoint
+
+
+def repoCreateInitial_verify(
+    checkpoint: StepCheckpoint, values: BootstrapModel, ctx: BootstrapContext
+) -> bool:
+    status, _ = ctx.forge.repo_probe(values.plugin_title, ctx.org_name)
+    return status in (200, 304)
+
+
+def gitClone_verify(
+    checkpoint: StepCheckpoint, values: BootstrapModel, ctx: BootstrapContext
+) -> bool:
+    repo: git.Repo = CountedRepo(checkpoint.path)
+    repo.commit(checkpoint.commit)  # raises if the clone lost it
+    return True
+
+
+def shellEdit_verify(
+    checkpoint: StepCheckpoint, values: BootstrapModel, ctx: BootstrapContext
+) -> bool:
+    repo: git.Repo = CountedRepo(checkpoint.path)
+    script: Path = Path(checkpoint.path) / "bootstrap.sh"
+    # Edited, but not yet run: nothing else may have changed
+    return (
+        repo.head.commit.hexsha == checkpoint.commit
+        and script.is_file()
+        and file_digest(script) == checkpoint.digest
+        and [item.a_path for item in repo.index.diff(None)] == ["bootstrap.sh"]
+        and not repo.index.diff("HEAD")
+    )
+
+
+def shellExec_verify(
+    checkpoint: StepCheckpoint, values: BootstrapModel, ctx: BootstrapContext
+) -> bool:
+    return (
+        head_get(Path(checkpoint.path)) == checkpoint.commit
+        and snapshot_digest(Path(checkpoint.path)) == checkpoint.digest
+    )
+
+
+VERIFIERS: dict[
+    str, Callable[[StepCheckpoint, BootstrapModel, BootstrapContext], bool]
+] = {
+    # repoExists only guards creation; once past it, it stays passed
+    "repoExists": lambda checkpoint, values, ctx: True,
+    "repoCreateInitial": repoCreateInitial_verify,
+    "gitClone": gitClone_verify,
+    "shellEdit": shellEdit_verify,
+    "shellExec": shellExec_verify,
+    # A pushed commit means the job succeeded; there is nothing to resume
+    "gitCommit": lambda checkpoint, values, ctx: True,
+}
+
+
+def checkpoint_verify(
+    checkpoint: StepCheckpoint, values: BootstrapModel, ctx: BootstrapContext
+) -> bool:
+    """
+    Check that what a step left behind is still in place. This is blocking.
+
+    Args:
+        checkpoint (StepCheckpoint): The step's checkpoint.
+        values (BootstrapModel): The bootstrap values.
+        ctx (BootstrapContext): The request context.
+
+    Returns:
+        bool: True if the step need not run again.
+    """
+    try:
+        return VERIFIERS[checkpoint.step](checkpoint, values, ctx)
+    except RateLimitDeferred:
+        raise  # not known yet; resume_plan is run again after the wait
+    except Exception as e:
+        logger.info(f"Checkpoint of {checkpoint.step} does not hold: {str(e)}")
+        return False
+
+
+def resume_plan(
+    state: BootstrapState, values: BootstrapModel, ctx: BootstrapContext
+) -> int:
+    """
+    Find how far a job can be resumed. The latest checkpoint that still
+    holds wins: a committed `shellExec` vouches for the clone and the edit
+    it was built on, even though `bootstrap.sh` is gone by then. Steps up
+    to and including the returned index can be skipped; the checkout is
+    made ready for the first step that runs again. This is blocking.
+
+    Args:
+        state (BootstrapState): The state of the previous attempt.
+        values (BootstrapModel): The bootstrap values.
+        ctx (BootstrapContext): The request context.
+
+    Returns:
+        int: Index into PIPELINE of the last step to skip, -1 to run all.
+    """
+    created: Optional[GithubRepoCreate] = state.repoCreateInitial
+    if (
+        "repoCreateInitial" not in state.checkpoints
+        and created is not None
+        and created.poll is not None  # only set once the repository was created
+        and repoCreateInitial_verify(
+            StepCheckpoint(step="repoCreateInitial"), values, ctx
+        )
+    ):
+        # Created by the last attempt, which gave up waiting for it
+        created.status = True
+        created.repo_created = True
+        created.message = f"Repository {values.plugin_title} became available"
+        state.checkpoints["repoCreateInitial"] = checkpoint_record(
+            "repoCreateInitial", values, ctx, created
+        )
+
+    executed: Optional[StepCheckpoint] = state.checkpoints.get("shellExec")
+    if executed is not None:
+        commit_unwind(Path(executed.path), executed.commit)
+
+    done: list[StepCheckpoint] = []
+    for step in PIPELINE:
+        if step.field not in state.checkpoints:
+            break
+        done.append(state.checkpoints[step.field])
+
+    resume_after: int = -1
+    for index in range(len(done) - 1, -1, -1):
+        if checkpoint_verify(done[index], values, ctx):
+            resume_after = index
+            break
+    if resume_after > 1 and not checkpoint_verify(done[1], values, ctx):
+        # Local work is of no use if the repository it belongs to is gone
+        resume_after = 0
+
+    repo_path: Path = ctx.workspace.repo_path(values.plugin_title)
+    last: Optional[str] = PIPELINE[resume_after].field if resume_after >= 0 else None
+    if last == "gitClone":
+        # A failed shellEdit/shellExec may have left changes: start from the clone
+        checkout_restore(repo_path, done[resume_after].commit)
+    elif last not in LOCAL_STEPS and repo_path.exists():
+        # A clone is needed again and the old checkout is not usable
+        shutil.rmtree(repo_path)
+    return resume_after
+
+
+def commit_unwind(repo_path: Path, commit: str) -> None:
+    """
+    Undo the local commit of a `gitCommit` whose push failed, keeping its
+    changes in the working tree, so that the checkout is again as
+    `shellExec` left it.
+
+    Args:
+        repo_path (Path): The checkout.
+        commit (str): HEAD as `shellExec` left it.
+    """
+    try:
+        repo: git.Repo = CountedRepo(repo_path)
+        if repo.head.commit.hexsha != commit and repo.is_ancestor(
+            commit, repo.head.commit
+        ):
+            repo.git.reset("--mixed", commit)
+    except Exception as e:
+        logger.info(f"Could not unwind {repo_path} to {commit}: {str(e)}")
+
+
+def checkout_restore(repo_path: Path, commit: str) -> None:
+    """
+    Put a checkout back to the commit it was cloned at, dropping every
+    local change and untracked file.
+
+    Args:
+        repo_path (Path): The checkout.
+        commit (str): The commit to restore.
+    """
+    repo: git.Repo = CountedRepo(repo_path)
+    repo.git.reset("--hard", commit)
+    repo.git.clean("-fdx")
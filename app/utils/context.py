@@ -0,0 +1,144 @@
+import threading
+from typing import Callable, Optional
+
+from app.config.settings import appData
+from app.models.bootstrapModel import BootstrapModel
+from app.utils.events import eventChannel_get
+from app.utils.forge import Forge, GithubForge, forge_create
+from app.utils.githubPool import GithubSession
+from app.utils.workspace import Workspace
+
+
+class BootstrapContext:
+    """
+    Everything one bootstrap request needs to talk to its forge (GitHub,
+    or local bare repositories) and to the local filesystem: the forge,
+    the token and the client built from it (GitHub only), the resolved
+    user, the target organization and the workspace.
+
+    A context is created per request and passed to every step. Nothing in
+    it is ever written back to the global `appData`, so concurrent requests
+    with different tokens cannot see each other's credentials.
+    """
+
+    def __init__(
+        self,
+        forge: Forge,
+        org_name: str,
+        workspace: Workspace,
+        job_id: Optional[str] = None,
+    ) -> None:
+        """
+        Constructor for the BootstrapContext class.
+
+        Args:
+            forge (Forge): Where the request's repositories live.
+            org_name (str): The organization to operate in.
+            workspace (Workspace): The workspace holding local checkouts.
+            job_id (Optional[str]): The job id, if any.
+        """
+        self.forge: Forge = forge
+        github: bool = isinstance(forge, GithubForge)
+        # GitHub-only features (e.g. the API commit backend) need these
+        self.token: str = forge.token if github else ""
+        self.github_client: Optional[GithubSession] = (
+            forge.github_client if github else None
+        )
+        self.org_name: str = org_name
+        self.workspace: Workspace = workspace
+        self.job_id: Optional[str] = job_id
+        # Render the plugin from the template while its repository is created
+        self.render_ahead: bool = False
+        self.user_login: str = ""
+        self.user_email: Optional[str] = None
+        self._user_lock: threading.Lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        # Never leak the token into logs
+        return (
+            f"BootstrapContext(forge={self.forge.backend.value!r}, "
+            f"org_name={self.org_name!r}, "
+            f"workspace={str(self.workspace.root)!r}, job_id={self.job_id!r})"
+        )
+
+    @classmethod
+    def from_request(
+        cls,
+        values: BootstrapModel,
+        token: Optional[str],
+        workspace: Workspace,
+        job_id: Optional[str] = None,
+    ) -> Optional["BootstrapContext"]:
+        """
+        Build the context for a request, on the forge selected by
+        `appData.forgeBackend`. A per-request token takes precedence over
+        the server's default token.
+
+        Args:
+            values (BootstrapModel): The bootstrap values provided.
+            token (Optional[str]): Optional per-request GitHub token.
+            workspace (Workspace): The workspace for local checkouts.
+            job_id (Optional[str]): The job id, if any.
+
+        Returns:
+            Optional[BootstrapContext]: The context, or None if GitHub is the
+                                        forge and no token is available.
+        """
+        forge: Optional[Forge] = forge_create(token)
+        if forge is None:
+            return None
+        return cls(
+            forge=forge,
+            org_name=values.organization or appData.appOrganization,
+            workspace=workspace,
+            job_id=job_id,
+        )
+
+    def user_resolve(self) -> str:
+        """
+        Resolve (once) the login and public email of the forge user. On
+        GitHub this makes a blocking API call unless the pooled session has
+        the user memoized.
+
+        Returns:
+            str: The user login.
+        """
+        with self._user_lock:
+            if not self.user_login:
+                self.user_login, self.user_email = self.forge.user_get()
+        return self.user_login
+
+    def gitIdentity_env(self, fallback_email: str) -> dict[str, str]:
+        """
+        Return the git commit identity of this request as environment
+        variables, for use by git subprocesses and GitPython. Nothing is
+        written to any git config file.
+
+        Args:
+            fallback_email (str): Email to use if the user's is not public.
+
+        Returns:
+            dict[str, str]: The GIT_AUTHOR_* and GIT_COMMITTER_* variables.
+        """
+        name: str = self.user_resolve()
+        email: str = self.user_email or fallback_email
+        return {
+            "GIT_AUTHOR_NAME": name,
+            "GIT_AUTHOR_EMAIL": email,
+            "GIT_COMMITTER_NAME": name,
+            "GIT_COMMITTER_EMAIL": email,
+        }
+
+    def output_sink(self, step: str) -> Optional[Callable[[str, str], None]]:
+        """
+        Return a sink that streams a step's subprocess output to the job's
+        event subscribers, or None if this request is not a job.
+
+        Args:
+            step (str): The step name.
+
+        Returns:
+            Optional[Callable[[str, str], None]]: The sink, if any.
+        """
+        channel = eventChannel_get(self.job_id)
+        return channel.output_sink(step) if channel else None
@@ -0,0 +1,170 @@
+import asyncio
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Optional
+
+from app.config.settings import appData
+from app.models.bootstrapModel import BootstrapState
+
+# Top-level fields of BootstrapState that are sent whenever they change
+STATE_SCALARS: tuple[str, ...] = ("status", "message", "starttime", "endtime")
+
+
+class EventChannel:
+    """
+    The live event stream of one job. Events are numbered, the most recent
+    `appData.eventHistoryMax` are kept so that late or reconnecting
+    subscribers can catch up, and each subscriber reads from its own queue.
+
+    `publish` may be called from any thread (e.g. an executor thread that
+    reads subprocess output); delivery always happens on the event loop.
+    """
+
+    def __init__(self, job_id: str, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Constructor for the EventChannel class.
+
+        Args:
+            job_id (str): The job whose events this channel carries.
+            loop (asyncio.AbstractEventLoop): The loop subscribers run on.
+        """
+        self.job_id: str = job_id
+        self.loop: asyncio.AbstractEventLoop = loop
+        self.seq: int = 0
+        self.closed: bool = False
+        self.history: deque[dict[str, Any]] = deque(maxlen=appData.eventHistoryMax)
+        self.subscribers: list[asyncio.Queue] = []
+        self.sent: dict[str, Any] = {}
+
+    def publish(self, event: str, data: dict[str, Any]) -> None:
+        """
+        Queue an event for delivery to every subscriber.
+
+        Args:
+            event (str): The event type: "state", "output" or "done".
+            data (dict[str, Any]): The JSON-serializable payload.
+        """
+        self.loop.call_soon_threadsafe(self.deliver, event, data)
+
+    def deliver(self, event: str, data: dict[str, Any]) -> None:
+        if self.closed:
+            return
+        self.seq += 1
+        message: dict[str, Any] = {"id": self.seq, "event": event, "data": data}
+        self.history.append(message)
+        for queue in self.subscribers:
+            queue.put_nowait(message)
+        if event == "done":
+            self.closed = True
+
+    def state_publish(self, state: BootstrapState, field: str) -> None:
+        """
+        Publish the part of a state that changed: the updated step (if any)
+        and those overall fields whose value differs from what was last sent.
+
+        Args:
+            state (BootstrapState): The job state.
+            field (str): The field reported by `BootstrapState.observers_notify`.
+        """
+        data: dict[str, Any] = {}
+        if field in BootstrapState.model_fields and field not in STATE_SCALARS:
+            step: Any = getattr(state, field)
+            data[field] = step.model_dump(mode="json") if step is not None else None
+        for name in STATE_SCALARS:
+            value: Any = getattr(state, name)
+            if self.sent.get(name) != value:
+                self.sent[name] = value
+                data[name] = value
+        if data:
+            self.publish("state", data)
+
+    def output_sink(self, step: str) -> Callable[[str, str], None]:
+        """
+        Return a callback that publishes subprocess output lines of a step.
+
+        Args:
+            step (str): The step the subprocess belongs to.
+
+        Returns:
+            Callable[[str, str], None]: Called with the stream name and a line.
+        """
+
+        def sink(stream: str, line: str) -> None:
+            self.publish("output", {"step": step, "stream": stream, "line": line})
+
+        return sink
+
+    async def subscribe(self, last_id: int = 0) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield the job's events, starting after event `last_id`, until the job
+        is done. None is yielded every `appData.eventKeepalive` seconds
+        without events, so that callers can keep their connection alive.
+
+        Args:
+            last_id (int): Id of the last event the subscriber already has.
+
+        Yields:
+            Optional[dict]: Events ({"id", "event", "data"}) or None.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in self.history:
+            if message["id"] > last_id:
+                queue.put_nowait(message)
+        self.subscribers.append(queue)
+        try:
+            while True:
+                if self.closed and queue.empty():
+                    return
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=appData.eventKeepalive
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield message
+                if message["event"] == "done":
+                    return
+        finally:
+            self.subscribers.remove(queue)
+
+
+def sse_format(message: Optional[dict]) -> str:
+    """
+    Render an event (or a keep-alive for None) as a server-sent event.
+
+    Args:
+        message (Optional[dict]): The event.
+
+    Returns:
+        str: The text/event-stream chunk.
+    """
+    if message is None:
+        return ": keep-alive\n\n"
+    return (
+        f"id: {message['id']}\n"
+        f"event: {message['event']}\n"
+        f"data: {json.dumps(message['data'], separators=(',', ':'))}\n\n"
+    )
+
+
+eventChannels: dict[str, EventChannel] = {}
+
+
+def eventChannel_create(job_id: str) -> EventChannel:
+    """
+    Create the event channel of a job. Must be called on the event loop.
+
+    Args:
+        job_id (str): The job id.
+
+    Returns:
+        EventChannel: The new channel.
+    """
+    channel: EventChannel = EventChannel(job_id, asyncio.get_running_loop())
+    eventChannels[job_id] = channel
+    return channel
+
+
+def eventChannel_get(job_id: Optional[str]) -> Optional[EventChannel]:
+    return eventChannels.get(job_id) if job_id else None
@@ -0,0 +1,116 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config.settings import appData
+from app.utils.profiler import JobProfiler, profileTarget
+
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """
+    A bounded thread pool onto which blocking work (PyGithub calls,
+    GitPython operations, subprocesses) is offloaded so that the event
+    loop remains free to serve other requests.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        """
+        Constructor for the BlockingExecutor class.
+
+        Args:
+            max_workers (int): Maximum number of concurrent worker threads.
+        """
+        self.max_workers: int = max(1, int(max_workers))
+        self.inflight: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+
+    def pool_get(self) -> ThreadPoolExecutor:
+        """
+        Return the underlying thread pool, creating it on first use.
+
+        Returns:
+            ThreadPoolExecutor: The thread pool.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="pf_build"
+                )
+            return self._pool
+
+    def size_set(self, max_workers: int) -> None:
+        """
+        Resize the executor. Work already submitted completes on the old pool.
+
+        Args:
+            max_workers (int): New maximum number of worker threads.
+        """
+        with self._lock:
+            old_pool: ThreadPoolExecutor | None = self._pool
+            self.max_workers = max(1, int(max_workers))
+            self._pool = None
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable on the executor and await its result.
+
+        The caller's context variables are propagated into the worker thread.
+
+        Args:
+            func (Callable): The blocking callable.
+            *args: Positional arguments for the callable.
+            **kwargs: Keyword arguments for the callable.
+
+        Returns:
+            T: The return value of the callable.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        ctx: contextvars.Context = contextvars.copy_context()
+        call: Callable[[], T] = functools.partial(ctx.run, func, *args, **kwargs)
+        profiler: JobProfiler | None = profileTarget.get()
+        if profiler is not None:
+            call = profiler.thread_wrap(call)
+        self.inflight += 1
+        try:
+            return await loop.run_in_executor(self.pool_get(), call)
+        finally:
+            self.inflight -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the underlying thread pool.
+
+        Args:
+            wait (bool): If True, block until all pending work is done.
+        """
+        with self._lock:
+            pool: ThreadPoolExecutor | None = self._pool
+            self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+blockingExecutor: BlockingExecutor = BlockingExecutor(appData.executorWorkers)
+
+
+async def blocking_run(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Convenience wrapper to run a blocking callable on the shared executor.
+
+    Args:
+        func (Callable): The blocking callable.
+        *args: Positional arguments for the callable.
+        **kwargs: Keyword arguments for the callable.
+
+    Returns:
+        T: The return value of the callable.
+    """
+    return await blockingExecutor.run(func, *args, **kwargs)
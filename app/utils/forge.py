@@ -0,0 +1,429 @@
+import getpass
+import re
+import shutil
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from enum import Enum
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, Tuple
+
+import git
+from git.index.typ import BaseIndexEntry, IndexEntry
+from gitdb import IStream
+from loguru import logger
+
+from app.config.settings import appData
+from app.models.bootstrapModel import GithubRepoCreate, GithubRepoExists
+from app.utils.executor import blocking_run
+from app.utils.github import GithubRepoUtil
+from app.utils.githubPool import GithubSession, githubPool
+from app.utils.snapshot import (
+    LooseObjectStore,
+    branch_set,
+    head_commit,
+    repo_open,
+    worktree_mode,
+    worktree_read,
+)
+from app.utils.spawns import CountedRepo
+
+
+# Organization and repository names a local forge accepts, as on GitHub
+FORGE_NAME: re.Pattern = re.compile(r"[A-Za-z0-9._-]+")
+
+
+class ForgeBackend(str, Enum):
+    GITHUB = "github"  # repositories on GitHub (or the API at githubApiURL)
+    LOCAL = "local"  # bare repositories in a directory, no network or token
+
+
+class Forge(ABC):
+    """
+    Where plugin repositories live: whether one exists, creating one from
+    the template, where to clone it from and push it to, and who the
+    commits are by. A forge is created per request by `forge_create`.
+
+    `repo_probe`, `clone_url`, `user_get`, `push_url` and `template_ensure`
+    are blocking (run them on the executor).
+    """
+
+    backend: ForgeBackend
+
+    @abstractmethod
+    async def repo_checkExists(self, repo_name: str, org_name: str) -> GithubRepoExists:
+        ...
+
+    @abstractmethod
+    async def repo_createFromTemplate(
+        self, repo_name: str, description: str, template_repo: str, org_name: str
+    ) -> GithubRepoCreate:
+        ...
+
+    @abstractmethod
+    def repo_probe(
+        self, repo_name: str, org_name: str, etag: Optional[str] = None
+    ) -> Tuple[int, Optional[str]]:
+        """Return the HTTP-like status of a repository (200, 304 or 404) and an ETag"""
+
+    @abstractmethod
+    def clone_url(self, repo_name: str, org_name: str) -> str:
+        ...
+
+    @abstractmethod
+    def user_get(self) -> Tuple[str, Optional[str]]:
+        """Return the login and, if known, the email of the forge user"""
+
+    @abstractmethod
+    def push_url(self, url: str) -> str:
+        """Return the URL to push a checkout of `url` to, with any credentials"""
+
+    def template_ensure(self, template_repo: str, org_name: str) -> Optional[Path]:
+        """Make sure the template can be cloned; on GitHub it always can"""
+        return None
+
+
+def github_cloneURL(repo_name: str, org_name: str) -> str:
+    return f"{appData.githubCloneURL}/{org_name}/{repo_name}.git"
+
+
+class GithubForge(Forge):
+    """Repositories on GitHub, through the pooled PyGithub session of a token"""
+
+    backend: ForgeBackend = ForgeBackend.GITHUB
+
+    def __init__(self, github_client: GithubSession, token: str) -> None:
+        """
+        Constructor for the GithubForge class.
+
+        Args:
+            github_client (GithubSession): The pooled client for `token`.
+            token (str): The GitHub token, used to push.
+        """
+        self.github_client: GithubSession = github_client
+        self.token: str = token
+
+    async def repo_checkExists(self, repo_name: str, org_name: str) -> GithubRepoExists:
+        return await GithubRepoUtil.repo_checkExists(
+            self.github_client, repo_name, org_name
+        )
+
+    async def repo_createFromTemplate(
+        self, repo_name: str, description: str, template_repo: str, org_name: str
+    ) -> GithubRepoCreate:
+        return await GithubRepoUtil.repo_createFromTemplate(
+            self.github_client,
+            repo_name=repo_name,
+            description=description,
+            template_repo=template_repo,
+            org_name=org_name,
+        )
+
+    def repo_probe(
+        self, repo_name: str, org_name: str, etag: Optional[str] = None
+    ) -> Tuple[int, Optional[str]]:
+        return GithubRepoUtil.repo_probe(self.github_client, repo_name, org_name, etag)
+
+    def clone_url(self, repo_name: str, org_name: str) -> str:
+        return github_cloneURL(repo_name, org_name)
+
+    def user_get(self) -> Tuple[str, Optional[str]]:
+        user = self.github_client.user_get()
+        return user.login, user.email
+
+    def push_url(self, url: str) -> str:
+        login, _ = self.user_get()
+        return GithubRepoUtil.remoteURL_authenticate(url, login, self.token)
+
+
+def entry_find(parent: Path, name: str) -> Path:
+    """Return the entry of `parent` named `name` in any case, or as given"""
+    path: Path = parent / name
+    if path.exists() or not parent.is_dir():
+        return path
+    folded: str = name.lower()
+    for entry in parent.iterdir():
+        if entry.name.lower() == folded:
+            return entry
+    return path
+
+
+def forge_path(root: Path, org_name: str, repo_name: str) -> Path:
+    """
+    Return `<root>/<org>/<repo>.git` for names from a request. Names are
+    case-insensitive, as on GitHub: an existing directory is found whatever
+    its case, a new one is named as given.
+
+    Args:
+        root (Path): The directory holding the repositories.
+        org_name (str): The organization name.
+        repo_name (str): The repository name.
+
+    Returns:
+        Path: The resolved repository path.
+
+    Raises:
+        ValueError: If a name is not a valid GitHub name, or the path
+                    would not be under `root`.
+    """
+    for name in (org_name, repo_name):
+        if not FORGE_NAME.fullmatch(name) or name in (".", ".."):
+            raise ValueError(f"Invalid repository or organization name: {name!r}")
+    resolved: Path = root.resolve()
+    org: Path = entry_find(resolved, org_name)
+    path: Path = entry_find(org, f"{repo_name}.git").resolve()
+    if path.parent.parent != resolved:
+        raise ValueError(f"{org_name}/{repo_name} is outside {root}")
+    return path
+
+
+class LocalForge(Forge):
+    """
+    Bare repositories under a directory, `<root>/<org>/<repo>.git`, for
+    offline, CI and load-test runs. Repositories are created from the
+    template like GitHub does: a single commit holding the template's
+    tree. The template is `<root>/<org>/<template>.git`; if it does not
+    exist and `appData.forgeLocalTemplateDir` is set, the files of that
+    directory become the template on first use.
+    """
+
+    backend: ForgeBackend = ForgeBackend.LOCAL
+
+    # Several jobs may find the template still to be imported
+    _templateLock: threading.Lock = threading.Lock()
+
+    def __init__(self, root: Path, template_dir: Optional[Path] = None) -> None:
+        """
+        Constructor for the LocalForge class.
+
+        Args:
+            root (Path): Directory holding the repositories.
+            template_dir (Optional[Path]): Files to create missing templates from.
+        """
+        self.root: Path = root
+        self.template_dir: Optional[Path] = template_dir
+
+    def repo_path(self, repo_name: str, org_name: str) -> Path:
+        """The bare repository of `org_name/repo_name`; see `forge_path`"""
+        return forge_path(self.root, org_name, repo_name)
+
+    def repo_available(self, repo_name: str, org_name: str) -> bool:
+        return (self.repo_path(repo_name, org_name) / "objects").is_dir()
+
+    async def repo_checkExists(self, repo_name: str, org_name: str) -> GithubRepoExists:
+        try:
+            available: bool = self.repo_available(repo_name, org_name)
+        except ValueError as e:
+            return GithubRepoExists(
+                status=False, exists=False, message=str(e), repo_name=repo_name
+            )
+        if available:
+            return GithubRepoExists(
+                status=False,
+                exists=True,
+                message=f"Repository {repo_name} already exists",
+                repo_name=repo_name,
+            )
+        return GithubRepoExists(
+            status=True,
+            exists=False,
+            message=f"Repository {repo_name} is available",
+            repo_name=repo_name,
+        )
+
+    async def repo_createFromTemplate(
+        self, repo_name: str, description: str, template_repo: str, org_name: str
+    ) -> GithubRepoCreate:
+        try:
+            await blocking_run(
+                self.repo_generate, repo_name, description, template_repo, org_name
+            )
+            return GithubRepoCreate(
+                status=True,
+                repo_name=repo_name,
+                message=f"Repository {repo_name} created successfully from template",
+            )
+        except Exception as e:
+            logger.error(f"Local forge error: {str(e)}")
+            return GithubRepoCreate(
+                status=False,
+                repo_name=repo_name,
+                message=f"Error creating repository: {str(e)}",
+            )
+
+    def repo_generate(
+        self, repo_name: str, description: str, template_repo: str, org_name: str
+    ) -> Path:
+        """
+        Create a bare repository whose only commit holds the template's tree.
+        The repository is built next to its final location and renamed into
+        place, so that it never exists half made. This is blocking.
+
+        Args:
+            repo_name (str): Name of the new repository.
+            description (str): Its description.
+            template_repo (str): Name of the template repository.
+            org_name (str): Organization name.
+
+        Returns:
+            Path: The new repository.
+
+        Raises:
+            FileExistsError: If the repository exists.
+            FileNotFoundError: If there is no template to create it from.
+        """
+        target: Path = self.repo_path(repo_name, org_name)
+        if target.exists():
+            raise FileExistsError(f"Repository {org_name}/{repo_name} already exists")
+        template: git.Repo = repo_open(self.template_ensure(template_repo, org_name))
+        tree: git.Tree = head_commit(template).tree
+
+        staging: Path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+        try:
+            repo: git.Repo = CountedRepo.init(
+                staging,
+                mkdir=True,
+                bare=True,
+                odbt=LooseObjectStore,
+                initial_branch="main",
+            )
+            for item in (tree, *tree.traverse()):
+                if item.type == "submodule":
+                    continue
+                stream = template.odb.stream(item.binsha)
+                repo.odb.store(IStream(stream.type, stream.size, stream))
+            (staging / "description").write_text(description + "\n")
+            commit: git.Commit = git.Commit.create_from_tree(
+                repo,
+                tree,
+                "Initial commit",
+                author=self.actor_get(),
+                committer=self.actor_get(),
+            )
+            branch_set(repo, "main", commit)
+            staging.rename(target)  # fails if the repository appeared meanwhile
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return target
+
+    def template_ensure(self, template_repo: str, org_name: str) -> Path:
+        """
+        Return the template repository, importing `template_dir` into it
+        first if it does not exist. This is blocking.
+
+        Args:
+            template_repo (str): Name of the template repository.
+            org_name (str): Organization name.
+
+        Returns:
+            Path: The template repository.
+        """
+        path: Path = self.repo_path(template_repo, org_name)
+        with LocalForge._templateLock:
+            if not self.repo_available(template_repo, org_name):
+                if self.template_dir is None or not self.template_dir.is_dir():
+                    raise FileNotFoundError(
+                        f"No template {org_name}/{template_repo} in {self.root} "
+                        f"and no FORGELOCALTEMPLATEDIR to create it from"
+                    )
+                self.template_import(path)
+        return path
+
+    def template_import(self, path: Path) -> None:
+        """Create a bare repository at `path` holding the files of `template_dir`"""
+        staging: Path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}")
+        try:
+            repo: git.Repo = CountedRepo.init(
+                staging,
+                mkdir=True,
+                bare=True,
+                odbt=LooseObjectStore,
+                initial_branch="main",
+            )
+            index: git.IndexFile = git.IndexFile(repo, str(staging / "index"))
+            index.entries = {}
+            for file in sorted(self.template_dir.rglob("*")):
+                relative: Path = file.relative_to(self.template_dir)
+                if ".git" in relative.parts:
+                    continue
+                if not (file.is_symlink() or file.is_file()):
+                    continue  # directories are implied by their files
+                mode: int = worktree_mode(file.lstat())
+                data: bytes = worktree_read(file, mode)
+                blob = repo.odb.store(IStream(git.Blob.type, len(data), BytesIO(data)))
+                entry: BaseIndexEntry = BaseIndexEntry(
+                    (mode, blob.binsha, 0, relative.as_posix())
+                )
+                index.entries[(entry.path, 0)] = IndexEntry.from_base(entry)
+            commit: git.Commit = git.Commit.create_from_tree(
+                repo,
+                index.write_tree(),
+                f"Import {self.template_dir.name}",
+                author=self.actor_get(),
+                committer=self.actor_get(),
+            )
+            branch_set(repo, "main", commit)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            staging.rename(path)
+            logger.info(f"Imported template {self.template_dir} into {path}")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def repo_probe(
+        self, repo_name: str, org_name: str, etag: Optional[str] = None
+    ) -> Tuple[int, Optional[str]]:
+        return (200 if self.repo_available(repo_name, org_name) else 404), etag
+
+    def clone_url(self, repo_name: str, org_name: str) -> str:
+        return self.repo_path(repo_name, org_name).as_uri()
+
+    def user_get(self) -> Tuple[str, Optional[str]]:
+        return appData.forgeLocalUser or getpass.getuser(), None
+
+    def actor_get(self) -> git.Actor:
+        login, _ = self.user_get()
+        return git.Actor(login, f"{login}@localhost")
+
+    def push_url(self, url: str) -> str:
+        return url
+
+
+def localForge_get() -> LocalForge:
+    return LocalForge(appData.forgeLocalRoot, appData.forgeLocalTemplateDir)
+
+
+def forge_create(token: Optional[str]) -> Optional[Forge]:
+    """
+    Create the forge selected by `appData.forgeBackend` for a request.
+
+    Args:
+        token (Optional[str]): The request's GitHub token, if any.
+
+    Returns:
+        Optional[Forge]: The forge, or None if GitHub is selected and no
+                         token is available.
+    """
+    if ForgeBackend(appData.forgeBackend) == ForgeBackend.LOCAL:
+        return localForge_get()
+    resolved: Optional[str] = token or appData.githubToken_get()
+    if not resolved:
+        return None
+    return GithubForge(githubPool.session_get(resolved), resolved)
+
+
+def forge_cloneURL(repo_name: str, org_name: str) -> str:
+    """
+    Return where the configured forge serves a repository from. This needs
+    no token, e.g. for the template mirror.
+
+    Args:
+        repo_name (str): The repository name.
+        org_name (str): The organization name.
+
+    Returns:
+        str: The clone URL.
+    """
+    if ForgeBackend(appData.forgeBackend) == ForgeBackend.LOCAL:
+        return localForge_get().clone_url(repo_name, org_name)
+    return github_cloneURL(repo_name, org_name)
@@ -0,0 +1,142 @@
+import hashlib
+from typing import Any, Optional
+
+from github import Auth, Github
+from github.AuthenticatedUser import AuthenticatedUser
+from github.Organization import Organization
+
+from app.config.settings import appData
+from app.utils.cache import TTLCache
+
+
+def token_hash(token: str) -> str:
+    """
+    Return a digest of a token, so that raw tokens are never used as keys.
+
+    Args:
+        token (str): The GitHub token.
+
+    Returns:
+        str: The SHA-256 hex digest of the token.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class GithubSession(Github):
+    """
+    A long-lived GitHub client for one token. It keeps its keep-alive HTTP
+    connection pool between requests and memoizes the authenticated user and
+    organization objects, so repeated bootstraps with the same token do not
+    repeat those REST round trips.
+    """
+
+    def __init__(self, token: str, **kwargs: Any) -> None:
+        """
+        Constructor for the GithubSession class.
+
+        Args:
+            token (str): The GitHub token.
+            **kwargs: Passed on to `Github` (timeout, pool_size, ...).
+        """
+        super().__init__(auth=Auth.Token(token), **kwargs)
+        self.token_hash: str = token_hash(token)
+        self.memo: TTLCache[Any] = TTLCache(maxsize=64, ttl=appData.githubMemoTTL)
+
+    def user_get(self) -> AuthenticatedUser:
+        """
+        Return the (fully fetched) authenticated user, memoized.
+
+        Returns:
+            AuthenticatedUser: The user the token belongs to.
+        """
+
+        def user_fetch() -> AuthenticatedUser:
+            user: AuthenticatedUser = self.get_user()
+            user.login  # completes the lazy object with a single GET /user
+            return user
+
+        return self.memo.get_or_set("user", user_fetch)
+
+    def organization_get(self, org_name: str) -> Organization:
+        """
+        Return an organization, memoized.
+
+        Args:
+            org_name (str): The organization login.
+
+        Returns:
+            Organization: The organization.
+        """
+        return self.memo.get_or_set(
+            ("org", org_name.lower()), lambda: self.get_organization(org_name)
+        )
+
+    def invalidate(self, key: Optional[Any] = None) -> None:
+        """
+        Drop memoized objects: one (e.g. `"user"` or `("org", name)`) or all.
+
+        Args:
+            key (Optional[Any]): The memo key to drop, or None for all.
+        """
+        self.memo.invalidate(key)
+
+
+def session_close(session: GithubSession) -> None:
+    """Release a session dropped from the pool: its memo and its connections"""
+    session.invalidate()
+    session.close()
+
+
+class GithubPool:
+    """
+    An LRU/TTL pool of `GithubSession`s keyed by a hash of their token.
+    Sessions that leave the pool are closed; one still in use by a running
+    bootstrap reconnects if it sends another request.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Constructor for the GithubPool class.
+
+        Args:
+            maxsize (int): Maximum number of pooled sessions.
+            ttl (float): Seconds after which an idle or busy session is replaced.
+        """
+        self.sessions: TTLCache[GithubSession] = TTLCache(
+            maxsize=maxsize, ttl=ttl, on_evict=session_close
+        )
+
+    def session_get(self, token: str) -> GithubSession:
+        """
+        Return the pooled session for a token, creating it if needed.
+
+        Args:
+            token (str): The GitHub token.
+
+        Returns:
+            GithubSession: The session.
+        """
+        return self.sessions.get_or_set(
+            token_hash(token),
+            lambda: GithubSession(
+                token,
+                base_url=appData.githubApiURL,
+                timeout=appData.githubTimeout,
+                pool_size=appData.githubPoolSize,
+                seconds_between_requests=appData.githubSecondsBetweenRequests,
+                seconds_between_writes=appData.githubSecondsBetweenWrites,
+            ),
+        )
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+        Drop the session for a token, or all sessions if `token` is None,
+        e.g. once GitHub rejects the token as revoked or expired.
+
+        Args:
+            token (Optional[str]): The GitHub token.
+        """
+        self.sessions.invalidate(token_hash(token) if token else None)
+
+
+githubPool: GithubPool = GithubPool(appData.githubPoolMax, appData.githubPoolTTL)
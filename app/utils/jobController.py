@@ -1,13 +1,28 @@
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Any
+from typing import IO, Callable, Iterator, Optional, Any
+from collections import deque
 from pydantic import BaseModel
+import asyncio
+import gzip
+import re
+import signal
 import subprocess
 import os
 import json
 import shlex
 import uuid
 from app.config import settings
+from app.utils.executor import blocking_run
+from app.utils.spawns import spawn_count
+
+
+# Receives ("stdout" | "stderr", line) for every line a job writes
+OutputSink = Callable[[str, str], None]
+
+# Ends a line of job output. A lone "\r" (a progress bar redrawing itself)
+# counts too, unless it is the last byte read: it may be half of a "\r\n".
+LINE_BREAK: re.Pattern = re.compile(rb"\r\n|\r(?!$)|\n")
 
 
 class JobResult(BaseModel):
@@ -18,6 +33,8 @@ class JobResult(BaseModel):
     returncode: int
     script: Optional[str] = None
     uid: Optional[str] = None
+    log_id: Optional[str] = None
+    truncated: bool = False
 
 
 class Jobber:
@@ -36,15 +53,17 @@ class Jobber:
         self.execCmd: Path = Path("somefile.cmd")
         self.histlogPath: Path = Path("/tmp")
 
+    @staticmethod
+    def logHistoryPath_get(day: datetime) -> Path:
+        """Returns the log directory of a given day."""
+        year_dir: str = str(day.year)
+        date_dir: str = day.strftime("%Y-%m-%d")
+        return settings.appData.appConfigDir / "pfmdb-history" / year_dir / date_dir
+
     @staticmethod
     def logHistoryPath_create() -> Path:
         """Creates the log directory structure and returns the path."""
-        today: datetime = datetime.today()
-        year_dir: str = str(today.year)
-        date_dir: str = today.strftime("%Y-%m-%d")
-        log_path: Path = (
-            settings.appData.appConfigDir / "pfmdb-history" / year_dir / date_dir
-        )
+        log_path: Path = Jobber.logHistoryPath_get(datetime.today())
         try:
             log_path.mkdir(parents=True, exist_ok=True)
         except Exception as e:
@@ -80,19 +99,28 @@ class Jobber:
                 str_cli += f"--{k} {self.v2JSONcli(v)} "
         return str_cli
 
-    def job_run(self, str_cmd: str) -> JobResult:
+    def job_run(
+        self,
+        str_cmd: str,
+        cwd: Optional[Path] = None,
+        env: Optional[dict[str, str]] = None,
+    ) -> JobResult:
         """
         Executes a CLI process and returns stderr, stdout, and return code.
 
         Args:
             str_cmd (str): Command to execute.
+            cwd (Optional[Path]): Directory to run the command in. The process
+                                  working directory is never changed.
+            env (Optional[dict[str, str]]): Environment for the command. If None
+                                            the server environment is inherited.
 
         Returns:
             JobResult: Execution details, including stdout, stderr, and return code.
         """
         result = JobResult(
             cmd=str_cmd,
-            cwd=os.getcwd(),
+            cwd=str(cwd) if cwd else os.getcwd(),
             returncode=0,
         )
         try:
@@ -100,6 +128,8 @@ class Jobber:
                 shlex.split(str_cmd),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
+                cwd=cwd,
+                env=env,
             )
 
             stdout, stderr = process.communicate()
@@ -118,6 +148,151 @@ class Jobber:
 
         return result
 
+    async def job_runAsync(
+        self,
+        str_cmd: str,
+        cwd: Optional[Path] = None,
+        env: Optional[dict[str, str]] = None,
+        sinks: Optional[list[OutputSink]] = None,
+        timeout: Optional[float] = None,
+        capture: Optional["OutputCapture"] = None,
+    ) -> JobResult:
+        """
+        Executes a CLI process on the event loop, without tying up a thread,
+        and returns stderr, stdout, and return code.
+
+        Output is read line by line as the process writes it and passed to
+        every sink. The process runs in its own process group; if it outlives
+        `timeout`, or the calling task is cancelled, the whole group (e.g.
+        `pip` started by a script) is terminated, then killed.
+
+        Args:
+            str_cmd (str): Command to execute.
+            cwd (Optional[Path]): Directory to run the command in.
+            env (Optional[dict[str, str]]): Environment for the command. If None
+                                            the server environment is inherited.
+            sinks (Optional[list[OutputSink]]): Receivers of the output lines.
+            timeout (Optional[float]): Seconds after which the job is killed.
+            capture (Optional[OutputCapture]): If given, only a bounded head and
+                                            tail of the output is kept in the
+                                            result; the rest is spilled to disk.
+
+        Returns:
+            JobResult: Execution details, including stdout, stderr, and return code.
+        """
+        result = JobResult(
+            cmd=str_cmd,
+            cwd=str(cwd) if cwd else os.getcwd(),
+            returncode=0,
+        )
+        sinks = list(sinks or [])
+        if int(self.args["verbosity"]):
+            sinks.append(lambda stream, line: print(line))
+        spawn_count()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *shlex.split(str_cmd),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=env,
+                start_new_session=True,
+            )
+        except Exception as e:
+            result.stderr = f"An error occurred: {e}"
+            result.returncode = -1
+            return result
+
+        captured: dict[str, list[str]] = {"stdout": [], "stderr": []}
+        if capture is not None:
+            sinks.append(capture)
+
+        line_max: int = (
+            capture.line_max if capture else settings.appData.outputCaptureLineMax
+        )
+
+        async def pump(name: str, stream: asyncio.StreamReader) -> None:
+            # Read chunks rather than lines so that no line is too long: a
+            # line without a break is passed on in pieces of `line_max` bytes
+            kept: Optional[list[str]] = captured[name] if capture is None else None
+            pending: bytes = b""
+            while chunk := await stream.read(65536):
+                *lines, pending = LINE_BREAK.split(pending + chunk)
+                for raw in lines:
+                    self.line_emit(kept, sinks, name, raw)
+                while len(pending) >= line_max:
+                    self.line_emit(kept, sinks, name, pending[:line_max])
+                    pending = pending[line_max:]
+                if capture is not None and capture.buffers[name]:
+                    await blocking_run(capture.spill_flush, name)
+            pending = pending.rstrip(b"\r")
+            if pending:
+                self.line_emit(kept, sinks, name, pending, newline=False)
+
+        pumps: asyncio.Future = asyncio.gather(
+            pump("stdout", process.stdout), pump("stderr", process.stderr)
+        )
+        try:
+            await asyncio.wait_for(asyncio.shield(pumps), timeout)
+            result.returncode = await process.wait()
+        except asyncio.TimeoutError:
+            await self.processGroup_kill(process)
+            await pumps
+            result.returncode = process.returncode
+            captured["stderr"].append(f"Killed after exceeding {timeout}s timeout\n")
+        except asyncio.CancelledError:
+            await self.processGroup_kill(process)
+            pumps.cancel()
+            raise
+        finally:
+            if capture is not None:
+                await blocking_run(capture.close)
+        if capture is not None:
+            result.log_id = capture.log_id
+            result.truncated = capture.truncated()
+            for name in captured:
+                captured[name].insert(0, capture.text(name))
+        result.stdout = "".join(captured["stdout"])
+        result.stderr = "".join(captured["stderr"])
+        return result
+
+    @staticmethod
+    def line_emit(
+        captured: Optional[list[str]],
+        sinks: list[OutputSink],
+        name: str,
+        raw: bytes,
+        newline: bool = True,
+    ) -> None:
+        line: str = raw.decode("utf-8", errors="replace")
+        if captured is not None:
+            captured.append(line + "\n" if newline else line)
+        for sink in sinks:
+            sink(name, line)
+
+    @staticmethod
+    async def processGroup_kill(process: asyncio.subprocess.Process) -> None:
+        """
+        Terminate a job's process group, and kill it if it does not exit
+        within `appData.jobKillGrace` seconds.
+
+        Args:
+            process (asyncio.subprocess.Process): The job's lead process.
+        """
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                break
+            try:
+                await asyncio.wait_for(
+                    process.wait(), settings.appData.jobKillGrace
+                )
+                break
+            except asyncio.TimeoutError:
+                continue
+        await process.wait()
+
     def job_runFromScript(self, str_cmd: str) -> JobResult:
         """
         Runs a job as a script (background process).
@@ -191,3 +366,160 @@ class Jobber:
         except Exception as e:
             print(f"Error writing job logs: {e}")
             return {"status": False}
+
+
+LOG_ID_PATTERN: re.Pattern = re.compile(r"^(\d{8})-[0-9a-f]{32}$")
+STREAMS: tuple[str, ...] = ("stdout", "stderr")
+
+
+class StreamCapture:
+    """The bounded in-memory view of one output stream"""
+
+    def __init__(self, head: int, tail: int) -> None:
+        self.head: list[str] = []
+        self.tail: deque[str] = deque(maxlen=tail)
+        self.head_max: int = head
+        self.lines: int = 0
+
+    def add(self, line: str) -> None:
+        self.lines += 1
+        if len(self.head) < self.head_max:
+            self.head.append(line)
+        else:
+            self.tail.append(line)
+
+    def omitted(self) -> int:
+        return self.lines - len(self.head) - len(self.tail)
+
+
+class OutputCapture:
+    """
+    An output sink for `Jobber.job_runAsync` whose memory use is bounded no
+    matter how much a job writes. Only the first `head` and last `tail`
+    lines of each stream (each line cut to `line_max` characters) are kept;
+    everything is also spilled, complete, to gzip files next to the job
+    scripts under `Jobber.logHistoryPath_create()`, from where it can be
+    fetched by `log_id`.
+
+    Calling the capture only buffers a line for the spill; the writing is
+    done by `spill_flush` and `close`, which block and belong on the
+    executor.
+    """
+
+    def __init__(
+        self,
+        head: Optional[int] = None,
+        tail: Optional[int] = None,
+        line_max: Optional[int] = None,
+    ) -> None:
+        """
+        Constructor for the OutputCapture class.
+
+        Args:
+            head (Optional[int]): Lines kept from the start of each stream.
+            tail (Optional[int]): Lines kept from the end of each stream.
+            line_max (Optional[int]): Characters kept of each line in memory.
+        """
+        head = settings.appData.outputCaptureHead if head is None else head
+        tail = settings.appData.outputCaptureTail if tail is None else tail
+        self.line_max: int = line_max or settings.appData.outputCaptureLineMax
+        self.log_id: str = f"{datetime.today():%Y%m%d}-{uuid.uuid4().hex}"
+        self.streams: dict[str, StreamCapture] = {
+            name: StreamCapture(head, tail) for name in STREAMS
+        }
+        self.spills: dict[str, IO[str]] = {}
+        self.buffers: dict[str, list[str]] = {name: [] for name in STREAMS}
+
+    @staticmethod
+    def path_get(log_id: str, stream: str) -> Optional[Path]:
+        """
+        Return the spill file of a stream, or None for an invalid id.
+
+        Args:
+            log_id (str): The capture's log id.
+            stream (str): "stdout" or "stderr".
+
+        Returns:
+            Optional[Path]: The path (which may not exist).
+        """
+        match: Optional[re.Match] = LOG_ID_PATTERN.match(log_id)
+        if match is None or stream not in STREAMS:
+            return None
+        day: datetime = datetime.strptime(match.group(1), "%Y%m%d")
+        return Jobber.logHistoryPath_get(day) / f"{log_id}.{stream}.gz"
+
+    def __call__(self, stream: str, line: str) -> None:
+        self.buffers[stream].append(line + "\n")
+        self.streams[stream].add(
+            line
+            if len(line) <= self.line_max
+            else f"{line[: self.line_max]}... [{len(line) - self.line_max} chars cut]"
+        )
+
+    def spill_flush(self, stream: str) -> None:
+        """Write the buffered lines of a stream to its spill file; blocking"""
+        lines: list[str] = self.buffers[stream]
+        if not lines:
+            return
+        self.buffers[stream] = []
+        if stream not in self.spills:
+            self.spills[stream] = gzip.open(
+                Jobber.logHistoryPath_create() / f"{self.log_id}.{stream}.gz",
+                "wt",
+                encoding="utf-8",
+            )
+        self.spills[stream].writelines(lines)
+
+    def close(self) -> None:
+        """Flush and close the spill files; blocking"""
+        for stream in STREAMS:
+            self.spill_flush(stream)
+        for spill in self.spills.values():
+            spill.close()
+
+    def truncated(self) -> bool:
+        return any(capture.omitted() for capture in self.streams.values())
+
+    def text(self, stream: str) -> str:
+        """
+        Return the captured text of a stream: its head and tail, with a
+        marker where lines were left out.
+
+        Args:
+            stream (str): "stdout" or "stderr".
+
+        Returns:
+            str: The bounded text.
+        """
+        capture: StreamCapture = self.streams[stream]
+        lines: list[str] = list(capture.head)
+        if capture.omitted():
+            lines.append(
+                f"... [{capture.omitted()} lines omitted; full output: "
+                f"GET /api/v1/logs/{self.log_id}?stream={stream}] ..."
+            )
+        lines.extend(capture.tail)
+        return "".join(line + "\n" for line in lines)
+
+
+def log_read(log_id: str, stream: str) -> Optional[Iterator[bytes]]:
+    """
+    Return the full, decompressed output of a captured stream in chunks.
+
+    Args:
+        log_id (str): The capture's log id.
+        stream (str): "stdout" or "stderr".
+
+    Returns:
+        Optional[Iterator[bytes]]: The output, or None if there is none.
+    """
+    path: Optional[Path] = OutputCapture.path_get(log_id, stream)
+    if path is None or not path.is_file():
+        return None
+
+    def chunks() -> Iterator[bytes]:
+        with gzip.open(path, "rb") as f:
+            while chunk := f.read(65536):
+                yield chunk
+
+    return chunks()
@@ -0,0 +1,68 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.utils.executor import blockingExecutor
+
+# Bootstrap steps range from a cached lookup (ms) to bash bootstrap.sh (minutes)
+STEP_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.025,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    600.0,
+    float("inf"),
+)
+
+stepDuration: Histogram = Histogram(
+    "pf_build_step_duration_seconds",
+    "Duration of each bootstrap step",
+    ["step"],
+    buckets=STEP_BUCKETS,
+)
+stepTotal: Counter = Counter(
+    "pf_build_steps",
+    "Bootstrap steps by outcome (success, failure, skipped, resumed)",
+    ["step", "outcome"],
+)
+bootstrapTotal: Counter = Counter(
+    "pf_build_bootstraps", "Bootstrap runs by outcome", ["step", "outcome"]
+)
+bootstrapInflight: Gauge = Gauge(
+    "pf_build_bootstraps_inflight", "Bootstrap runs currently executing"
+)
+jobsQueued: Gauge = Gauge("pf_build_jobs_queued", "Jobs waiting for a worker")
+githubRequests: Counter = Counter(
+    "pf_build_github_requests",
+    "Requests sent to the GitHub API, by method and HTTP status",
+    ["method", "status"],
+)
+processSpawns: Counter = Counter(
+    "pf_build_process_spawns",
+    "Processes (git, bash, ...) started by bootstrap steps",
+    ["step"],
+)
+executorInflight: Gauge = Gauge(
+    "pf_build_executor_inflight", "Blocking calls running on the thread pool"
+)
+executorInflight.set_function(lambda: blockingExecutor.inflight)
+
+
+def step_observe(step: str, elapsed_ns: int, outcome: str) -> None:
+    """
+    Record one executed step.
+
+    Args:
+        step (str): The step field, e.g. "gitClone".
+        elapsed_ns (int): Its monotonic duration.
+        outcome (str): "success" or "failure".
+    """
+    stepDuration.labels(step).observe(elapsed_ns / 1e9)
+    stepTotal.labels(step, outcome).inc()
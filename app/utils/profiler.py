@@ -0,0 +1,191 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Optional, TypeVar
+
+from loguru import logger
+
+from app.config.settings import appData
+
+T = TypeVar("T")
+
+# The profiler of the job running in the current context, if it is profiled.
+# blocking_run() checks this to attribute executor threads to the job.
+profileTarget: ContextVar[Optional["JobProfiler"]] = ContextVar(
+    "profileTarget", default=None
+)
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def frames_fold(frame: Optional[FrameType]) -> list[str]:
+    """Return the labels of a thread's stack, outermost first"""
+    labels: list[str] = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def awaits_fold(coro: Any) -> list[str]:
+    """Return the labels of a suspended coroutine chain, outermost first"""
+    labels: list[str] = []
+    while coro is not None:
+        frame: Optional[FrameType] = getattr(coro, "cr_frame", None) or getattr(
+            coro, "gi_frame", None
+        )
+        if frame is None:
+            break
+        labels.append(frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return labels
+
+
+class JobProfiler:
+    """
+    A sampling profiler for one bootstrap. Every `interval` seconds a
+    background thread records the stacks of the job's work:
+
+    * the event loop thread, while the job's task or one of the tasks it
+      started for its steps (`task_add`) is the one running;
+    * executor threads, while they run a `blocking_run` call of the job
+      (PyGithub, GitPython, ...);
+    * otherwise, the chains of coroutines the job is suspended in, one per
+      unfinished step task, marked `[await]` (e.g. waiting for
+      `bash bootstrap.sh` to finish).
+
+    Samples are aggregated as folded stacks ("a;b;c count"), the input
+    format of flamegraph.pl, speedscope and similar tools. Nothing of this
+    runs unless a job is profiled.
+    """
+
+    def __init__(self, job_id: str, interval: Optional[float] = None) -> None:
+        """
+        Constructor for the JobProfiler class.
+
+        Args:
+            job_id (str): The profiled job.
+            interval (Optional[float]): Seconds between samples.
+        """
+        self.job_id: str = job_id
+        self.interval: float = interval or appData.profileInterval
+        self.samples: Counter[str] = Counter()
+        # Executor threads running a call of the job, by depth of nesting;
+        # changed by those threads and read by the sampler, under _lock
+        self.threads: Counter[int] = Counter()
+        self._lock: threading.Lock = threading.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self.tasks: list[asyncio.Task] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: int = 0
+        self.started: float = 0.0
+        self._stop: threading.Event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling the current task. Must be called on the event loop."""
+        self.task = asyncio.current_task()
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(
+            target=self.sampler_run, name=f"profile-{self.job_id}", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def task_add(self, task: asyncio.Task) -> None:
+        """Sample a task the job started, e.g. one of its steps"""
+        self.tasks.append(task)
+
+    def thread_wrap(self, call: Callable[[], T]) -> Callable[[], T]:
+        """
+        Wrap an executor call so that its thread is sampled while it runs.
+
+        Args:
+            call (Callable[[], T]): The call.
+
+        Returns:
+            Callable[[], T]: The wrapped call.
+        """
+
+        def traced() -> T:
+            ident: int = threading.get_ident()
+            with self._lock:
+                self.threads[ident] += 1
+            try:
+                return call()
+            finally:
+                with self._lock:
+                    self.threads[ident] -= 1
+                    if not self.threads[ident]:
+                        del self.threads[ident]
+
+        return traced
+
+    def sampler_run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:  # never let sampling break the job
+                logger.debug(f"Profiler sample of job {self.job_id} failed: {e}")
+
+    def sample(self) -> None:
+        frames: dict[int, FrameType] = sys._current_frames()
+        with self._lock:
+            threads: list[int] = list(self.threads)
+        busy: bool = False
+        for ident in threads:
+            if ident in frames:
+                busy = True
+                self.record(["[thread]", *frames_fold(frames[ident])])
+        if self.loop is None or self.task is None:
+            return
+        current: Optional[asyncio.Task] = asyncio.current_task(self.loop)
+        if current is not None and (current is self.task or current in self.tasks):
+            self.record(frames_fold(frames.get(self.loop_thread)))
+        elif not busy:
+            waiting: list[asyncio.Task] = [t for t in self.tasks if not t.done()]
+            for task in waiting or [self.task]:
+                if not task.done():
+                    self.record(["[await]", *awaits_fold(task.get_coro())])
+
+    def record(self, labels: list[str]) -> None:
+        if labels:
+            self.samples[";".join(labels)] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+    def save(self) -> Path:
+        """
+        Write the profile as folded stacks.
+
+        Returns:
+            Path: The profile file.
+        """
+        path: Path = profile_path(self.job_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.folded())
+        logger.info(
+            f"Profile of job {self.job_id}: {sum(self.samples.values())} samples "
+            f"over {time.perf_counter() - self.started:.1f}s in {path}"
+        )
+        return path
+
+
+def profile_path(job_id: str) -> Path:
+    return appData.profileRoot / f"{job_id}.folded"
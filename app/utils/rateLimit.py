@@ -0,0 +1,348 @@
+import asyncio
+import functools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, TypeVar
+
+from github import RateLimitExceededException
+from github.Requester import Requester
+from loguru import logger
+
+from app.config.settings import appData
+from app.models.jobModel import RateLimitState
+from app.utils.executor import blocking_run
+from app.utils.githubPool import githubPool, token_hash
+from app.utils.metrics import githubRequests
+
+T = TypeVar("T")
+
+# Set by github_run() for the executor thread it runs a call on: the caller
+# waits for the budget on the event loop, so the thread must not
+budgetDeferred: ContextVar[bool] = ContextVar("budgetDeferred", default=False)
+
+
+class RateLimitDeferred(RateLimitExceededException):
+    """
+    A request found its token's budget spent and was not sent; it may be
+    sent after `wait` seconds. Raised instead of waiting in the thread when
+    `budgetDeferred` is set.
+    """
+
+    def __init__(self, key: str, wait: float) -> None:
+        super().__init__(
+            429,
+            {
+                "message": f"GitHub request budget of token {key} spent; "
+                f"next request possible in {wait:.0f}s"
+            },
+            None,
+        )
+        self.wait: float = wait
+
+
+class TokenBudget:
+    """
+    The request budget of one GitHub token. It is updated from the
+    `X-RateLimit-*` and `Retry-After` headers of every response and is
+    consulted before every request, so that callers wait *before* the budget
+    runs out instead of being rejected half way through a bootstrap.
+    """
+
+    def __init__(self, key: str, concurrency: int) -> None:
+        """
+        Constructor for the TokenBudget class.
+
+        Args:
+            key (str): Identifies the token (a digest prefix, never the token).
+            concurrency (int): Maximum number of requests in flight.
+        """
+        self.key: str = key
+        self.concurrency: int = max(1, concurrency)
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.blocked_until: float = 0.0
+        self.inflight: int = 0
+        self.waiting: int = 0
+        self.throttled: int = 0
+        self.limited: int = 0
+        self._cond: threading.Condition = threading.Condition()
+
+    def delay(self, reserve: int) -> float:
+        """
+        Return how long a request must wait before it may be sent.
+
+        Args:
+            reserve (int): Calls to keep in hand; the budget counts as spent
+                           when no more than this many remain.
+
+        Returns:
+            float: Seconds to wait, 0 if the request may go now.
+        """
+        now: float = time.time()
+        wait: float = self.blocked_until - now
+        if (
+            self.remaining is not None
+            and self.reset is not None
+            and self.remaining <= reserve
+        ):
+            wait = max(wait, self.reset - now)
+        return max(wait, 0.0)
+
+    def acquire(self, reserve: int, max_wait: float) -> None:
+        """
+        Block until a request may be sent, then account for it. Waiting for
+        a free slot takes no longer than a request; waiting for the budget
+        may take minutes, and is left to the caller if `budgetDeferred` is
+        set.
+
+        Args:
+            reserve (int): See `delay`.
+            max_wait (float): Raise instead of waiting longer than this.
+
+        Raises:
+            RateLimitExceededException: If the wait would exceed `max_wait`.
+            RateLimitDeferred: If the budget is spent and `budgetDeferred`
+                               is set.
+        """
+        with self._cond:
+            waited: bool = False
+            self.waiting += 1
+            try:
+                while True:
+                    wait: float = self.delay(reserve)
+                    if wait <= 0 and self.inflight < self.concurrency:
+                        break
+                    if wait > max_wait:
+                        raise RateLimitExceededException(
+                            429,
+                            {
+                                "message": f"GitHub request budget of token {self.key} "
+                                f"exhausted; next request possible in {wait:.0f}s"
+                            },
+                            None,
+                        )
+                    if wait > 0 and budgetDeferred.get():
+                        self.throttled += 1
+                        raise RateLimitDeferred(self.key, wait)
+                    waited = True
+                    self._cond.wait(timeout=wait or None)
+            finally:
+                self.waiting -= 1
+            if waited:
+                self.throttled += 1
+            self.inflight += 1
+            if self.remaining is not None:
+                # Spend optimistically so concurrent callers see it at once
+                self.remaining -= 1
+
+    def release(self, status: int, headers: dict[str, Any]) -> bool:
+        """
+        Account for a finished request and learn from its response headers.
+
+        Args:
+            status (int): The HTTP status, 0 if the request failed.
+            headers (dict[str, Any]): The lower-cased response headers.
+
+        Returns:
+            bool: True if the response was a rate limit rejection.
+        """
+        with self._cond:
+            self.inflight -= 1
+            limited: bool = self.update(status, headers)
+            self._cond.notify_all()
+            return limited
+
+    def update(self, status: int, headers: dict[str, Any]) -> bool:
+        now: float = time.time()
+        try:
+            if "x-ratelimit-remaining" in headers:
+                self.remaining = int(headers["x-ratelimit-remaining"])
+            if "x-ratelimit-limit" in headers:
+                self.limit = int(headers["x-ratelimit-limit"])
+            if "x-ratelimit-reset" in headers:
+                self.reset = float(headers["x-ratelimit-reset"])
+            retry_after: Optional[float] = (
+                float(headers["retry-after"]) if "retry-after" in headers else None
+            )
+        except ValueError:
+            return False
+        if status not in (403, 429):
+            return False
+        if retry_after is not None:
+            until: float = now + retry_after
+        elif self.remaining == 0 and self.reset:
+            until = self.reset
+        elif status == 429:
+            # Secondary limit without a hint: GitHub asks for at least a minute
+            until = now + 60
+        else:
+            return False
+        self.blocked_until = max(self.blocked_until, until)
+        self.limited += 1
+        return True
+
+    def state(self) -> RateLimitState:
+        with self._cond:
+            return RateLimitState(
+                token=self.key,
+                limit=self.limit,
+                remaining=self.remaining,
+                reset=self.reset,
+                blocked_for=round(self.delay(appData.githubRateLimitReserve), 3),
+                inflight=self.inflight,
+                waiting=self.waiting,
+                throttled=self.throttled,
+                limited=self.limited,
+            )
+
+
+class RateLimiter:
+    """
+    Schedules every request PyGithub sends, per token. It is installed by
+    wrapping `Requester.__requestRaw`, the single method through which all
+    requests (including those of lazily completed objects and of requesters
+    PyGithub copies internally) are sent.
+    """
+
+    def __init__(self) -> None:
+        self.budgets: dict[str, TokenBudget] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._local: threading.local = threading.local()
+
+    def budget_get(self, token: Optional[str]) -> TokenBudget:
+        """
+        Return the budget of a token, creating it if needed.
+
+        Args:
+            token (Optional[str]): The GitHub token, or None for anonymous use.
+
+        Returns:
+            TokenBudget: The budget.
+        """
+        key: str = token_hash(token)[:12] if token else "anonymous"
+        with self._lock:
+            if key not in self.budgets:
+                self.budgets[key] = TokenBudget(
+                    key, appData.githubRateLimitConcurrency
+                )
+            return self.budgets[key]
+
+    def admission_delay(self, token: Optional[str]) -> float:
+        """
+        Return how long a new bootstrap using `token` should wait before it
+        starts, so that it does not run out of budget half way through.
+
+        Args:
+            token (Optional[str]): The GitHub token.
+
+        Returns:
+            float: Seconds to wait, 0 if the bootstrap may start now.
+        """
+        return self.budget_get(token).delay(appData.githubRateLimitAdmitMin)
+
+    def states(self) -> list[RateLimitState]:
+        with self._lock:
+            budgets: list[TokenBudget] = list(self.budgets.values())
+        return [budget.state() for budget in budgets]
+
+    def requestRaw_wrap(self, requestRaw: Callable[..., Any]) -> Callable[..., Any]:
+        limiter: RateLimiter = self
+
+        @functools.wraps(requestRaw)
+        def requestRaw_scheduled(
+            requester: Requester,
+            cnx: Any,
+            verb: str,
+            url: str,
+            requestHeaders: dict[str, str],
+            input: Any,
+            stream: bool = False,
+            follow_302_redirect: bool = False,
+        ) -> tuple[int, dict[str, Any], Any]:
+            args: tuple = (cnx, verb, url, requestHeaders, input, stream)
+            # PyGithub re-enters for redirects and 202s; those are already scheduled
+            if getattr(limiter._local, "active", False):
+                return requestRaw(requester, *args, follow_302_redirect)
+            token: Optional[str] = getattr(requester.auth, "token", None)
+            budget: TokenBudget = limiter.budget_get(token)
+            retries: int = (
+                appData.githubRateLimitRetries
+                if isinstance(input, (str, bytes, type(None)))
+                else 0
+            )
+            for attempt in range(retries + 1):
+                budget.acquire(
+                    appData.githubRateLimitReserve, appData.githubRateLimitMaxWait
+                )
+                status: int = 0
+                headers: dict[str, Any] = {}
+                limiter._local.active = True
+                try:
+                    status, headers, output = requestRaw(
+                        requester, *args, follow_302_redirect
+                    )
+                finally:
+                    limiter._local.active = False
+                    limited: bool = budget.release(status, headers)
+                    githubRequests.labels(verb, str(status or "error")).inc()
+                if status == 401 and token:
+                    # Bad credentials: later requests get a fresh session
+                    githubPool.invalidate(token)
+                if not limited or attempt == retries:
+                    return status, headers, output
+                logger.warning(
+                    f"GitHub rate limited {verb} {url} (token {budget.key}); "
+                    f"retrying in {budget.delay(0):.1f}s"
+                )
+            return status, headers, output
+
+        requestRaw_scheduled.rateLimited = True  # type: ignore[attr-defined]
+        return requestRaw_scheduled
+
+    def install(self) -> None:
+        """Wrap the PyGithub requester; repeated calls are no-ops"""
+        requestRaw: Callable[..., Any] = Requester._Requester__requestRaw  # type: ignore[attr-defined]
+        if not getattr(requestRaw, "rateLimited", False):
+            Requester._Requester__requestRaw = self.requestRaw_wrap(requestRaw)  # type: ignore[attr-defined]
+
+
+rateLimiter: RateLimiter = RateLimiter()
+rateLimiter.install()
+
+
+async def github_run(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable that sends GitHub requests on the shared
+    executor, without holding an executor thread while the token's budget
+    is spent: the request that finds it spent is not sent, the callable
+    fails with `RateLimitDeferred`, and it is run again once the budget
+    allows, after waiting on the event loop. The callable must be safe to
+    run again.
+
+    Args:
+        func (Callable): The blocking callable.
+        *args: Positional arguments for the callable.
+        **kwargs: Keyword arguments for the callable.
+
+    Returns:
+        T: The return value of the callable.
+
+    Raises:
+        RateLimitExceededException: If the waits would add up to more than
+                                    `appData.githubRateLimitMaxWait`.
+    """
+    waited: float = 0.0
+    deferred = budgetDeferred.set(True)
+    try:
+        while True:
+            try:
+                return await blocking_run(func, *args, **kwargs)
+            except RateLimitDeferred as e:
+                if waited + e.wait > appData.githubRateLimitMaxWait:
+                    raise
+                waited += e.wait
+                await asyncio.sleep(e.wait)
+    finally:
+        budgetDeferred.reset(deferred)
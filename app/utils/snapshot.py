@@ -0,0 +1,171 @@
+import hashlib
+import os
+import stat
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+import git
+from git.index.typ import BaseIndexEntry, IndexEntry
+from gitdb import IStream
+from gitdb.db.loose import LooseObjectDB
+
+from app.utils.spawns import CountedRepo
+
+# Index modes of the files a working tree can hold
+MODE_FILE: int = 0o100644
+MODE_EXECUTABLE: int = 0o100755
+MODE_SYMLINK: int = 0o120000
+MODE_GITLINK: int = 0o160000
+
+
+class LooseObjectStore(git.GitCmdObjectDB):
+    """
+    git's default object database, but new objects are written in-process
+    as loose objects instead of through one `git hash-object` each. Objects
+    are still read through `git cat-file`.
+    """
+
+    def store(self, istream: IStream) -> IStream:
+        return LooseObjectDB.store(self, istream)
+
+
+def repo_open(repo_path: Path) -> git.Repo:
+    """Open a checkout whose new objects are written in-process"""
+    return CountedRepo(repo_path, odbt=LooseObjectStore)
+
+
+def head_commit(repo: git.Repo) -> git.Commit:
+    """
+    Return the commit HEAD points to, found from the refs alone: unlike
+    `repo.head.commit`, nothing is read until its data is used.
+    """
+    sha: str = git.SymbolicReference.dereference_recursive(repo, "HEAD")
+    return git.Commit(repo, bytes.fromhex(sha))
+
+
+def branch_set(repo: git.Repo, branch: str, commit: git.Commit) -> None:
+    """Point a branch at a commit, without reading it for a reflog entry"""
+    git.SymbolicReference(repo, f"refs/heads/{branch}").set_object(commit)
+
+
+def worktree_mode(st: os.stat_result) -> int:
+    if stat.S_ISLNK(st.st_mode):
+        return MODE_SYMLINK
+    return MODE_EXECUTABLE if st.st_mode & stat.S_IXUSR else MODE_FILE
+
+
+def worktree_read(path: Path, mode: int) -> bytes:
+    return os.readlink(path).encode() if mode == MODE_SYMLINK else path.read_bytes()
+
+
+def worktree_stat(path: Path) -> Optional[os.stat_result]:
+    """
+    Return the status of a working tree file, or None if there is no file
+    to store as a blob: it is gone, or it is a directory (e.g. a nested
+    repository, which `git ls-files --others` lists as one).
+    """
+    try:
+        st: os.stat_result = path.lstat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return st if stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode) else None
+
+
+def blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def untracked_list(repo: git.Repo) -> list[str]:
+    """
+    Return the untracked files of a checkout that are not ignored. This is
+    the one git process of a snapshot: .gitignore rules are git's to apply.
+    """
+    out: str = repo.git.ls_files("--others", "--exclude-standard", "-z")
+    return [path for path in out.split("\0") if path]
+
+
+def worktree_stage(repo: git.Repo) -> git.IndexFile:
+    """
+    Stage a checkout's working tree like `git add -A`, in-process: files
+    whose size and mtime still match their index entry (and were not
+    modified after the index was written, git's "racy" case) are taken as
+    they are, the others are hashed and, if changed, stored as blobs. The
+    index is updated in memory only; write it to keep the result. The
+    process working directory is never changed. Untracked nested
+    repositories are left out, and so is a file that disappears while it
+    is being staged.
+
+    Args:
+        repo (git.Repo): The checkout.
+
+    Returns:
+        git.IndexFile: The updated index.
+    """
+    index: git.IndexFile = repo.index
+    root: Path = Path(repo.working_tree_dir)
+    paths: list[str] = untracked_list(repo)
+    index_file: Path = Path(index.path)
+    written_ns: int = index_file.stat().st_mtime_ns if index_file.exists() else 0
+    for (path, stage), entry in list(index.entries.items()):
+        if entry.mode == MODE_GITLINK:
+            continue
+        st: Optional[os.stat_result] = worktree_stat(root / path)
+        if st is None:  # removed, or replaced by a directory of new files
+            del index.entries[(path, stage)]
+            continue
+        mode: int = worktree_mode(st)
+        if (
+            stage == 0
+            and mode == entry.mode
+            and st.st_size == entry.size
+            and st.st_mtime_ns == entry.mtime[0] * 1_000_000_000 + entry.mtime[1]
+            and st.st_mtime_ns < written_ns
+        ):
+            continue
+        paths.append(path)
+
+    for path in paths:
+        full: Path = root / path
+        st = worktree_stat(full)
+        if st is None:
+            continue
+        mode = worktree_mode(st)
+        try:
+            data: bytes = worktree_read(full, mode)
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            # Removed or replaced since it was listed: staged as gone
+            for stage in (0, 1, 2, 3):
+                index.entries.pop((path, stage), None)
+            continue
+        current: IndexEntry | None = index.entries.get((path, 0))
+        if (
+            current is not None
+            and current.mode == mode
+            and current.hexsha == blob_sha(data)
+        ):
+            continue
+        blob: IStream = repo.odb.store(
+            IStream(git.Blob.type, len(data), BytesIO(data))
+        )
+        for stage in (1, 2, 3):  # a staged file resolves a conflict
+            index.entries.pop((path, stage), None)
+        index.entries[(path, 0)] = IndexEntry.from_base(
+            BaseIndexEntry((mode, blob.binsha, 0, path))
+        )
+    return index
+
+
+def snapshot_digest(repo_path: Path) -> str:
+    """
+    Return the tree a commit of everything in a checkout would have,
+    without writing the index. Unlike `git status`, it does not matter
+    what is staged and what is committed.
+
+    Args:
+        repo_path (Path): The checkout.
+
+    Returns:
+        str: The tree sha.
+    """
+    return worktree_stage(repo_open(repo_path)).write_tree().hexsha
@@ -0,0 +1,59 @@
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+import git
+
+from app.utils.metrics import processSpawns
+
+# The spawn count of the job running in the current context, and the step
+# (or preparation) it is in. Both reach executor threads through
+# blocking_run(), which copies the context.
+spawnTarget: ContextVar[Optional["SpawnCount"]] = ContextVar(
+    "spawnTarget", default=None
+)
+spawnStep: ContextVar[str] = ContextVar("spawnStep", default="")
+
+
+class SpawnCount:
+    """The processes one bootstrap started, by step"""
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self.counts: Counter[str] = Counter()
+
+    def add(self, step: str) -> None:
+        with self._lock:
+            self.counts[step] += 1
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+def spawn_count() -> None:
+    """
+    Count a process about to be started. Called where processes are
+    launched: `Jobber.job_runAsync` and `CountedGit.execute`.
+    """
+    target: Optional[SpawnCount] = spawnTarget.get()
+    if target is None:
+        return  # not started by a bootstrap, e.g. the template mirror refresh
+    step: str = spawnStep.get() or "job"
+    processSpawns.labels(step).inc()
+    target.add(step)
+
+
+class CountedGit(git.Git):
+    """GitPython's git command wrapper, counting every git process it starts"""
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        spawn_count()
+        return super().execute(*args, **kwargs)
+
+
+class CountedRepo(git.Repo):
+    """A repository whose git commands are counted"""
+
+    GitCommandWrapperType = CountedGit
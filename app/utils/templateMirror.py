@@ -0,0 +1,162 @@
+import asyncio
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import git
+from loguru import logger
+
+from app.config.settings import appData
+from app.utils.executor import blocking_run
+from app.utils.forge import forge_cloneURL, forge_path
+from app.utils.github import repo_cloneFrom
+from app.utils.spawns import CountedRepo
+
+
+class TemplateMirror:
+    """
+    A service-managed bare mirror of a plugin template repository.
+
+    Repositories generated from the template share almost all of their
+    objects with it, so clones of a freshly generated repository borrow
+    objects from the mirror (`--reference-if-able`, i.e. git alternates)
+    and only the few objects unique to the new repository cross the network.
+    """
+
+    def __init__(self, org_name: str, template_repo: str, root: Path) -> None:
+        """
+        Constructor for the TemplateMirror class.
+
+        Args:
+            org_name (str): The organization owning the template.
+            template_repo (str): The template repository name.
+            root (Path): Directory under which mirrors are kept.
+
+        Raises:
+            ValueError: If a name is invalid or the mirror would not be
+                        under `root`.
+        """
+        self.org_name: str = org_name
+        self.template_repo: str = template_repo
+        self.path: Path = forge_path(root, org_name, template_repo)
+        self.url: str = forge_cloneURL(template_repo, org_name)
+        self.refreshed: float = 0.0
+        self.failures: int = 0  # refreshes failed in a row
+        self._lock: threading.Lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def available(self) -> bool:
+        """
+        Check whether the mirror has been created.
+
+        Returns:
+            bool: True if the mirror can be used as a clone reference.
+        """
+        return (self.path / "objects").is_dir()
+
+    def refresh_schedule(self) -> None:
+        """
+        Start a refresh on the executor without waiting for it, unless one
+        is already running.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(blocking_run(self.refresh))
+
+    def refresh(self) -> bool:
+        """
+        Create the mirror, or bring it up to date with an incremental fetch.
+        This is blocking; concurrent callers are serialized.
+
+        Returns:
+            bool: True if the mirror is available after the refresh.
+        """
+        with self._lock:
+            start: float = time.perf_counter()
+            try:
+                if self.available():
+                    CountedRepo(self.path).git.fetch(
+                        "--prune", "origin", kill_after_timeout=appData.gitCmdTimeout
+                    )
+                else:
+                    # Clone next to the final location, then move it into
+                    # place so that a half-written mirror is never referenced
+                    staging: Path = self.path.with_name(f"{self.path.name}.tmp")
+                    shutil.rmtree(staging, ignore_errors=True)
+                    staging.parent.mkdir(parents=True, exist_ok=True)
+                    mirror: git.Repo = repo_cloneFrom(self.url, staging, mirror=True)
+                    # Clones keep pointing at these objects; never prune them
+                    with mirror.config_writer() as config:
+                        config.set_value("gc", "pruneExpire", "never")
+                        config.set_value("gc", "auto", "0")
+                    staging.rename(self.path)
+                self.refreshed = time.time()
+                self.failures = 0
+                logger.info(
+                    f"Template mirror {self.path} refreshed in "
+                    f"{time.perf_counter() - start:.2f}s"
+                )
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Template mirror refresh of {self.url} failed: {str(e)}")
+            return self.available()
+
+
+# The mirrors in use, least recently used first; at most
+# `appData.templateMirrorMax` of them are kept and refreshed
+templateMirrors: OrderedDict[tuple[str, str], TemplateMirror] = OrderedDict()
+
+
+def templateMirror_get(
+    org_name: str, template_repo: Optional[str] = None
+) -> TemplateMirror:
+    """
+    Return the (possibly not yet created) mirror of an organization's
+    template. Beyond `appData.templateMirrorMax` mirrors, the least recently
+    used one is no longer refreshed; its files stay for when it is used
+    again.
+
+    Args:
+        org_name (str): The organization owning the template.
+        template_repo (Optional[str]): The template name; defaults to `appData.appTemplateRepo`.
+
+    Returns:
+        TemplateMirror: The mirror.
+
+    Raises:
+        ValueError: If a name is invalid.
+    """
+    template_repo = template_repo or appData.appTemplateRepo
+    key: tuple[str, str] = (org_name.lower(), template_repo.lower())
+    if key not in templateMirrors:
+        templateMirrors[key] = TemplateMirror(
+            org_name, template_repo, appData.templateMirrorRoot
+        )
+        while len(templateMirrors) > max(1, appData.templateMirrorMax):
+            templateMirrors.popitem(last=False)
+    templateMirrors.move_to_end(key)
+    return templateMirrors[key]
+
+
+async def templateMirror_refreshLoop(interval: int) -> None:
+    """
+    Periodically refresh every known template mirror. The mirror of the
+    default organization's template is always included; any other is
+    dropped once `appData.templateMirrorFailMax` refreshes in a row failed.
+
+    Args:
+        interval (int): Seconds between refreshes.
+    """
+    while True:
+        default: TemplateMirror = templateMirror_get(appData.appOrganization)
+        for key, mirror in list(templateMirrors.items()):
+            await blocking_run(mirror.refresh)
+            if (
+                mirror is not default
+                and mirror.failures >= appData.templateMirrorFailMax
+            ):
+                logger.warning(f"Dropping template mirror {mirror.path}")
+                templateMirrors.pop(key, None)
+        await asyncio.sleep(interval)
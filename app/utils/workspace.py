@@ -0,0 +1,195 @@
+import asyncio
+import os
+import shutil
+import threading
+import time
+import uuid
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from app.config.settings import appData
+from app.utils.executor import blocking_run
+
+
+class WorkspaceRetention(str, Enum):
+    KEEP = "keep"
+    DELETE = "delete"
+    KEEP_ON_FAILURE = "keepOnFailure"
+
+
+class Workspace:
+    """
+    A directory that holds the local checkout(s) of one bootstrap job.
+
+    Complete (`step=all`) bootstraps each get a private workspace under
+    `appData.appWorkspaceRoot/<job_id>` so that concurrent jobs never share
+    a checkout. Single-step calls, which rely on the result of earlier calls,
+    use the shared, persistent `appData.appRepoLocalPath` workspace.
+
+    All subprocess and GitPython calls are given an explicit path inside the
+    workspace; the process working directory is never changed.
+
+    Job workspaces are in use from `for_job` until `cleanup`, and are never
+    pruned meanwhile.
+    """
+
+    # Roots of the job workspaces in use; guarded by _activeLock, which
+    # pruning also holds while it removes a workspace
+    _active: set[Path] = set()
+    _activeLock: threading.Lock = threading.Lock()
+
+    def __init__(self, root: Path, persistent: bool = False) -> None:
+        """
+        Constructor for the Workspace class.
+
+        Args:
+            root (Path): The workspace directory.
+            persistent (bool): If True, the workspace is never cleaned up.
+        """
+        self.root: Path = root
+        self.persistent: bool = persistent
+
+    @classmethod
+    def for_job(cls, job_id: Optional[str] = None) -> "Workspace":
+        """
+        Create a private workspace for a job.
+
+        Args:
+            job_id (Optional[str]): The job id. A new one is generated if None.
+
+        Returns:
+            Workspace: The job workspace.
+        """
+        workspace: Workspace = cls(
+            appData.appWorkspaceRoot / (job_id or uuid.uuid4().hex)
+        )
+        with cls._activeLock:
+            cls._active.add(workspace.root)
+        return workspace
+
+    @classmethod
+    def shared(cls) -> "Workspace":
+        """
+        Return the shared workspace used by single-step calls.
+
+        Returns:
+            Workspace: The shared, persistent workspace.
+        """
+        return cls(appData.appRepoLocalPath, persistent=True)
+
+    def create(self) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return self.root
+
+    def repo_path(self, repo_name: str) -> Path:
+        """
+        Return the checkout path of a repository within this workspace.
+
+        Args:
+            repo_name (str): Name of the repository.
+
+        Returns:
+            Path: The checkout path.
+        """
+        return self.root / repo_name
+
+    def env(self, repo_name: Optional[str] = None) -> dict[str, str]:
+        """
+        Return the environment for subprocesses run in this workspace.
+
+        Args:
+            repo_name (Optional[str]): If given, PWD is set to its checkout.
+
+        Returns:
+            dict[str, str]: The environment.
+        """
+        env: dict[str, str] = os.environ.copy()
+        env["PWD"] = str(self.repo_path(repo_name) if repo_name else self.root)
+        return env
+
+    def cleanup(self, success: bool) -> bool:
+        """
+        Remove the workspace according to `appData.workspaceRetention`.
+
+        Args:
+            success (bool): Whether the job that used the workspace succeeded.
+
+        Returns:
+            bool: True if the workspace was removed.
+        """
+        with Workspace._activeLock:
+            Workspace._active.discard(self.root)
+        if self.persistent or not self.root.exists():
+            return False
+        retention: WorkspaceRetention = WorkspaceRetention(appData.workspaceRetention)
+        if retention == WorkspaceRetention.KEEP or (
+            retention == WorkspaceRetention.KEEP_ON_FAILURE and not success
+        ):
+            return False
+        try:
+            shutil.rmtree(self.root)
+            return True
+        except Exception as e:
+            logger.error(f"Could not remove workspace {self.root}: {str(e)}")
+            return False
+
+
+def workspaces_prune() -> int:
+    """
+    Remove kept job workspaces that were last changed more than
+    `appData.workspaceMaxAge` seconds ago, and the oldest of those beyond
+    the `appData.workspaceMaxKept` newest; 0 disables either limit.
+    Workspaces of jobs still running are left alone. This is blocking.
+
+    Returns:
+        int: The number of workspaces removed.
+    """
+    root: Path = appData.appWorkspaceRoot
+    if not root.is_dir():
+        return 0
+    kept: list[tuple[float, Path]] = []
+    for path in root.iterdir():
+        try:
+            if path.is_dir() and not path.is_symlink():
+                kept.append((path.lstat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    kept.sort(reverse=True)
+    max_age: float = appData.workspaceMaxAge
+    max_kept: int = appData.workspaceMaxKept
+    expired: float = time.time() - max_age
+    removed: int = 0
+    for rank, (mtime, path) in enumerate(kept):
+        too_old: bool = bool(max_age) and mtime < expired
+        too_many: bool = bool(max_kept) and rank >= max_kept
+        if not (too_old or too_many):
+            continue
+        with Workspace._activeLock:
+            if path in Workspace._active or path == appData.appRepoLocalPath:
+                continue
+            try:
+                shutil.rmtree(path)
+                removed += 1
+            except Exception as e:
+                logger.error(f"Could not remove workspace {path}: {str(e)}")
+    if removed:
+        logger.info(f"Pruned {removed} kept workspaces from {root}")
+    return removed
+
+
+async def workspaces_pruneLoop(interval: int) -> None:
+    """
+    Prune kept workspaces at startup and then periodically.
+
+    Args:
+        interval (int): Seconds between prunings.
+    """
+    while True:
+        try:
+            await blocking_run(workspaces_prune)
+        except Exception as e:
+            logger.error(f"Workspace pruning failed: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Batch benchmark: a batch of bootstraps against running them one at a time.
+
+Starts benchmarks.fakegithub like benchmarks.e2e and runs `--jobs` complete
+bootstraps through `bootstrap_batch`, first with concurrency 1 (the serial
+baseline) and then with each `--concurrency`. Every run creates its own
+repositories. Reports the wall time of each run, throughput and the speedup
+over the serial run.
+
+Usage:
+    python -m benchmarks.batch --jobs 8 --concurrency 2 4 8
+    python -m benchmarks.batch --api-ms 50 --script-ms 500
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from app.config.settings import appData
+from benchmarks.e2e import TOKEN, environment_configure, values_make
+from benchmarks.fakegithub import FakeGithub
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    from app.core.controllers.bootstrapController import bootstrap_batch
+    from app.models.bootstrapModel import BatchResponse
+    from app.utils.templateMirror import templateMirror_get
+
+    with tempfile.TemporaryDirectory(prefix="pf_build-bench-") as tmp:
+        root: Path = Path(tmp)
+        fake: FakeGithub = FakeGithub(root / "github", api_ms=args.api_ms)
+        fake.template_create(
+            appData.appOrganization,
+            appData.appTemplateRepo,
+            files=args.template_files,
+            script_ms=args.script_ms,
+        )
+        fake.start()
+        environment_configure(root, fake, args)
+        if not args.no_mirror:
+            templateMirror_get(appData.appOrganization).refresh()
+
+        print(
+            f"{'concurrency':>11} {'wall(s)':>9} {'jobs/s':>8} "
+            f"{'speedup':>8} {'failed':>7}"
+        )
+        serial: float | None = None
+        failed: int = 0
+        for concurrency in [1, *[c for c in args.concurrency if c != 1]]:
+            run: str = f"b{concurrency}-{int(time.time())}"
+            result: BatchResponse = await bootstrap_batch(
+                [values_make(run, index) for index in range(args.jobs)],
+                concurrency,
+                TOKEN,
+            )
+            wall: float = result.wall_seconds
+            serial = serial or wall
+            failures: int = sum(1 for item in result.items if not item.state.status)
+            failed += failures
+            print(
+                f"{concurrency:>11} {wall:9.3f} {args.jobs / wall:8.2f} "
+                f"{serial / wall:8.2f} {failures:>7}"
+            )
+        fake.stop()
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", type=int, default=8, help="bootstraps per batch")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[2, 4, 8],
+        help="batch concurrencies compared with the serial run",
+    )
+    parser.add_argument("--api-ms", type=float, default=20.0, help="fake API latency")
+    parser.add_argument(
+        "--script-ms", type=float, default=200.0, help="time bootstrap.sh 'installs'"
+    )
+    parser.add_argument("--template-files", type=int, default=50)
+    parser.add_argument("--no-mirror", action="store_true", help="clone without mirror")
+    args = parser.parse_args()
+    # The rest of the server configuration as benchmarks.e2e defaults it
+    args.render_ahead = False
+    args.commit_backend = "git"
+    args.forge = "github"
+    args.github_spacing = 0.0
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    # Importing the controllers re-installs their log sink; silence it again
+    import app.core.controllers.bootstrapController  # noqa: F401
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
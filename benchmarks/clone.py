@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Clone benchmark: template mirror vs. plain clone.
+
+Clones a repository that was generated from a template twice, once plainly
+and once borrowing objects from a bare mirror of the template (as
+GithubRepoUtil.repo_clone does when a TemplateMirror is available: a
+blob-less partial clone whose checkout reads blobs through alternates), and
+reports wall time and bytes received for each.
+
+Without --url a local fixture is built: a template repository with some
+content and a "generated" repository whose single commit has the same tree,
+which is what GitHub's /generate endpoint produces.
+
+Usage:
+    python -m benchmarks.clone
+    python -m benchmarks.clone \\
+        --template-url https://github.com/FNNDSC/python-chrisapp-template.git \\
+        --url https://github.com/FNNDSC/pl-surfaceCurv.git
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils.github import GithubRepoUtil
+from app.utils.templateMirror import TemplateMirror
+
+IDENTITY: dict[str, str] = {
+    "GIT_AUTHOR_NAME": "bench",
+    "GIT_AUTHOR_EMAIL": "bench@localhost",
+    "GIT_COMMITTER_NAME": "bench",
+    "GIT_COMMITTER_EMAIL": "bench@localhost",
+}
+
+
+def git(*args: str, cwd: Path | None = None) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        env={**os.environ, **IDENTITY},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def fixture_build(root: Path, files: int, size: int) -> tuple[str, str]:
+    """Create a template and a repo generated from it; return their URLs"""
+    work: Path = root / "template-work"
+    git("init", "-q", "-b", "main", str(work))
+    for i in range(files):
+        (work / f"file{i:04d}.txt").write_bytes(os.urandom(size))
+    git("add", ".", cwd=work)
+    git("commit", "-qm", "template", cwd=work)
+    template: Path = root / "template.git"
+    git("clone", "-q", "--bare", str(work), str(template))
+
+    # GitHub's /generate makes one new root commit with the template's tree
+    tree: str = git("rev-parse", "HEAD^{tree}", cwd=work)
+    commit: str = git("commit-tree", tree, "-m", "Initial commit", cwd=work)
+    generated: Path = root / "generated.git"
+    git("init", "-q", "--bare", "-b", "main", str(generated))
+    git("config", "uploadpack.allowFilter", "true", cwd=generated)
+    git("push", "-q", str(generated), f"{commit}:refs/heads/main", cwd=work)
+    return f"file://{template}", f"file://{generated}"
+
+
+def clone_measure(url: str, dest: Path, reference: Path | None) -> tuple[float, int]:
+    args: list[str] = ["clone", "-q", "--no-local"]
+    if reference:
+        args += [f"--reference-if-able={reference}", "--filter=blob:none"]
+    start: float = time.perf_counter()
+    git(*args, url, str(dest))
+    return time.perf_counter() - start, GithubRepoUtil.objects_size(dest)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--template-url", help="URL of the template repository")
+    parser.add_argument("--url", help="URL of a repository generated from it")
+    parser.add_argument("--files", type=int, default=200, help="fixture file count")
+    parser.add_argument("--size", type=int, default=16384, help="fixture file size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root: Path = Path(tmp)
+        template_url, url = (
+            (args.template_url, args.url)
+            if args.url
+            else fixture_build(root, args.files, args.size)
+        )
+        mirror: TemplateMirror = TemplateMirror("bench", "template", root / "mirrors")
+        mirror.url = template_url
+        mirror.refresh()
+
+        plain_s, plain_b = clone_measure(url, root / "plain", None)
+        ref_s, ref_b = clone_measure(url, root / "mirrored", mirror.path)
+
+    print(f"{'mode':>10} {'clone(s)':>9} {'received(bytes)':>16}")
+    print(f"{'plain':>10} {plain_s:9.3f} {plain_b:16d}")
+    print(f"{'mirror':>10} {ref_s:9.3f} {ref_b:16d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Executor sizing benchmark: complete bootstraps against a local fake GitHub.
+
+Starts benchmarks.fakegithub like benchmarks.e2e and runs `--jobs` complete
+bootstraps at once through `bootstrap_exec` (clone, bootstrap.sh and push
+included), once for each `--workers` size of the shared BlockingExecutor.
+Reports wall time, throughput and the p95 of a bootstrap for each size,
+with the speedup over the first size.
+
+Usage:
+    python -m benchmarks.concurrency --jobs 16 --workers 1 2 4 8 16
+    python -m benchmarks.concurrency --api-ms 50 --script-ms 500
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from app.config.settings import appData
+from benchmarks.e2e import environment_configure, scenario_run
+from benchmarks.fakegithub import FakeGithub
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    from app.utils.executor import blockingExecutor
+    from app.utils.templateMirror import templateMirror_get
+
+    with tempfile.TemporaryDirectory(prefix="pf_build-bench-") as tmp:
+        root: Path = Path(tmp)
+        fake: FakeGithub = FakeGithub(root / "github", api_ms=args.api_ms)
+        fake.template_create(
+            appData.appOrganization,
+            appData.appTemplateRepo,
+            files=args.template_files,
+            script_ms=args.script_ms,
+        )
+        fake.start()
+        environment_configure(root, fake, args)
+        if not args.no_mirror:
+            templateMirror_get(appData.appOrganization).refresh()
+
+        print(
+            f"{'workers':>8} {'wall(s)':>9} {'jobs/s':>8} "
+            f"{'p95(ms)':>9} {'speedup':>8} {'failed':>7}"
+        )
+        first: float | None = None
+        failed: int = 0
+        for workers in args.workers:
+            blockingExecutor.size_set(workers)
+            result = await scenario_run(
+                "direct", args.jobs, args.jobs, f"w{workers}-{int(time.time())}"
+            )
+            wall: float = result["wall_seconds"]
+            first = first or wall
+            failed += result["failures"]
+            print(
+                f"{workers:>8} {wall:9.3f} {args.jobs / wall:8.2f} "
+                f"{result['total']['p95']:9.1f} {first / wall:8.2f} "
+                f"{result['failures']:>7}"
+            )
+        fake.stop()
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", type=int, default=16, help="concurrent bootstraps")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="pool sizes"
+    )
+    parser.add_argument("--api-ms", type=float, default=20.0, help="fake API latency")
+    parser.add_argument(
+        "--script-ms", type=float, default=200.0, help="time bootstrap.sh 'installs'"
+    )
+    parser.add_argument("--template-files", type=int, default=50)
+    parser.add_argument("--no-mirror", action="store_true", help="clone without mirror")
+    args = parser.parse_args()
+    # The rest of the server configuration as benchmarks.e2e defaults it
+    args.render_ahead = False
+    args.commit_backend = "git"
+    args.forge = "github"
+    args.github_spacing = 0.0
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    # Importing the controllers re-installs their log sink; silence it again
+    import app.core.controllers.bootstrapController  # noqa: F401
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
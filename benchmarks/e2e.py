@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+"""
+End-to-end benchmark of complete bootstraps against a local fake GitHub.
+
+Starts benchmarks.fakegithub (the REST endpoints GithubRepoUtil uses, backed
+by bare repositories in a temporary directory), points the server settings
+at it, and runs `--jobs` complete bootstraps at each `--concurrency`, either
+by calling `bootstrap_exec` directly or through the HTTP API (in process,
+over ASGI; needs httpx). Reports p50/p95/p99 latency per step and overall,
+and throughput.
+
+Results are compared with the stored baseline (benchmarks/baselines/e2e.json);
+`--save` replaces it. With `--tolerance`, the run fails if any p95 is slower
+than the baseline by more than that fraction.
+
+Usage:
+    python -m benchmarks.e2e
+    python -m benchmarks.e2e --jobs 32 --concurrency 1 8 --mode direct http
+    python -m benchmarks.e2e --api-ms 50 --script-ms 500 --save
+    python -m benchmarks.e2e --forge local --concurrency 1 8
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from app.config.settings import appData
+from benchmarks.fakegithub import FakeGithub
+
+BASELINE: Path = Path(__file__).parent / "baselines" / "e2e.json"
+STEPS: tuple[str, ...] = (
+    "repoExists",
+    "repoCreateInitial",
+    "gitClone",
+    "shellEdit",
+    "shellExec",
+    "gitCommit",
+)
+TOKEN: str = "bench-token"
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linearly interpolated percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered: list[float] = sorted(values)
+    rank: float = (len(ordered) - 1) * q / 100
+    low: int = int(rank)
+    high: int = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    return {
+        f"p{q}": round(percentile(samples, q) * 1000, 1) for q in (50, 95, 99)
+    }
+
+
+def environment_configure(root: Path, fake: FakeGithub, args: argparse.Namespace) -> None:
+    appData.githubApiURL = fake.url
+    appData.githubCloneURL = fake.clone_url
+    appData.appConfigDir = root / "config"
+    appData.appWorkspaceRoot = root / "workspaces"
+    appData.appRepoLocalPath = root / "repositories"
+    appData.templateMirrorRoot = root / "mirrors"
+    appData.templateMirrorEnable = not args.no_mirror
+    appData.renderAhead = args.render_ahead
+    appData.commitBackend = args.commit_backend
+    appData.forgeBackend = args.forge
+    appData.forgeLocalRoot = fake.root
+    appData.workspaceRetention = "delete"
+    appData.githubSecondsBetweenRequests = args.github_spacing
+    appData.githubSecondsBetweenWrites = args.github_spacing
+    appData.githubToken = ""
+
+
+def values_make(run: str, index: int) -> Any:
+    from app.models.bootstrapModel import BootstrapModel
+
+    return BootstrapModel(
+        plugin_title=f"pl-bench-{run}-{index}",
+        scriptname=f"bench{index}",
+        description="Benchmark plugin",
+        organization=appData.appOrganization,
+        email="bench@example.org",
+    )
+
+
+async def runner_direct() -> Callable[[Any], Awaitable[dict]]:
+    from app.core.controllers import bootstrapController
+    from app.models.bootstrapModel import BootstrapStep
+
+    async def run(values: Any) -> dict:
+        state = await bootstrapController.bootstrap_exec(
+            values, BootstrapStep.ALL, TOKEN, job_id=f"bench-{values.plugin_title}"
+        )
+        return state.model_dump(mode="json")
+
+    return run
+
+
+async def runner_http() -> Callable[[Any], Awaitable[dict]]:
+    import httpx
+
+    from app.main import app
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None
+    )
+
+    async def run(values: Any) -> dict:
+        response = await client.post(
+            "/api/vi/boostrap/",
+            params={"step": "all", "token": TOKEN},
+            json=values.model_dump(mode="json"),
+        )
+        return response.json()
+
+    return run
+
+
+async def scenario_run(
+    mode: str, concurrency: int, jobs: int, run_id: str
+) -> dict[str, Any]:
+    run: Callable[[Any], Awaitable[dict]] = await (
+        runner_direct() if mode == "direct" else runner_http()
+    )
+    gate: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+    per_step: dict[str, list[float]] = {step: [] for step in STEPS}
+    totals: list[float] = []
+    failures: list[str] = []
+    spawns: Counter[str] = Counter()
+
+    async def one(index: int) -> None:
+        async with gate:
+            start: float = time.perf_counter()
+            state: dict = await run(values_make(run_id, index))
+            totals.append(time.perf_counter() - start)
+            if not state.get("status"):
+                failures.append(state.get("message", "unknown failure"))
+            for step in STEPS:
+                if state.get(step) and state[step].get("elapsed_ns"):
+                    per_step[step].append(state[step]["elapsed_ns"] / 1e9)
+            spawns.update(state.get("spawns") or {})
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(jobs)))
+    wall: float = time.perf_counter() - start
+    return {
+        "jobs": jobs,
+        "failures": len(failures),
+        "failure_sample": failures[:3],
+        "wall_seconds": round(wall, 3),
+        "throughput_per_min": round(jobs / wall * 60, 2),
+        "steps": {step: summarize(per_step[step]) for step in STEPS},
+        "total": summarize(totals),
+        "spawns_per_job": {
+            name: round(count / jobs, 2) for name, count in sorted(spawns.items())
+        },
+    }
+
+
+def report(key: str, result: dict[str, Any], baseline: dict[str, Any] | None) -> list[str]:
+    """Print one scenario; return the p95 regressions against the baseline"""
+    print(
+        f"\n== {key}: {result['jobs']} jobs, {result['failures']} failed, "
+        f"{result['wall_seconds']:.2f}s, {result['throughput_per_min']:.1f} jobs/min"
+    )
+    for failure in result["failure_sample"]:
+        print(f"   failure: {failure[:160]}")
+    print(f"{'step':>18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'p95 vs base':>12}")
+    regressions: list[tuple[str, float]] = []
+    rows: list[tuple[str, dict, dict | None]] = [
+        (step, result["steps"][step], (baseline or {}).get("steps", {}).get(step))
+        for step in STEPS
+    ] + [("total", result["total"], (baseline or {}).get("total"))]
+    for name, stats, base in rows:
+        delta: str = ""
+        if base and base.get("p95"):
+            change: float = stats["p95"] / base["p95"] - 1
+            delta = f"{change:+.0%}"
+            regressions.append((f"{key}/{name}", change))
+        print(
+            f"{name:>18} {stats['p50']:9.1f} {stats['p95']:9.1f} "
+            f"{stats['p99']:9.1f} {delta:>12}"
+        )
+    spawns: dict[str, float] = result.get("spawns_per_job", {})
+    print(
+        f"{'processes/job':>18} {sum(spawns.values()):.1f} "
+        f"({', '.join(f'{name} {count:g}' for name, count in spawns.items())})"
+    )
+    if baseline:
+        print(
+            f"{'throughput':>18} {result['throughput_per_min']:.1f}/min "
+            f"(baseline {baseline['throughput_per_min']:.1f}/min)"
+        )
+    return regressions
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    baselines: dict[str, Any] = (
+        json.loads(BASELINE.read_text()) if BASELINE.is_file() else {}
+    )
+    results: dict[str, Any] = {}
+    regressions: list[tuple[str, float]] = []
+    with tempfile.TemporaryDirectory(prefix="pf_build-bench-") as tmp:
+        root: Path = Path(tmp)
+        fake: FakeGithub = FakeGithub(
+            root / "github", api_ms=args.api_ms, available_after_ms=args.available_after_ms
+        )
+        fake.template_create(
+            appData.appOrganization,
+            appData.appTemplateRepo,
+            files=args.template_files,
+            script_ms=args.script_ms,
+        )
+        fake.start()
+        environment_configure(root, fake, args)
+
+        from app.utils.templateMirror import templateMirror_get
+
+        if not args.no_mirror:
+            templateMirror_get(appData.appOrganization).refresh()
+
+        for mode in args.mode:
+            for concurrency in args.concurrency:
+                key: str = f"{mode}/c{concurrency}"
+                result = await scenario_run(
+                    mode, concurrency, args.jobs, f"{mode}{concurrency}-{int(time.time())}"
+                )
+                results[key] = result
+                regressions += report(key, result, baselines.get("scenarios", {}).get(key))
+        print(f"\nfake GitHub calls: {dict(fake.hits)}")
+        fake.stop()
+
+    if args.save:
+        BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE.write_text(
+            json.dumps(
+                {
+                    "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "options": {
+                        k: v for k, v in vars(args).items() if k not in ("save", "tolerance")
+                    },
+                    "scenarios": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"Baseline saved to {BASELINE}")
+    if args.tolerance is not None:
+        worse: list[tuple[str, float]] = [
+            (name, change) for name, change in regressions if change > args.tolerance
+        ]
+        for name, change in worse:
+            print(f"REGRESSION {name}: p95 {change:+.0%}")
+        return 1 if worse else 0
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", type=int, default=16, help="bootstraps per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument(
+        "--mode", nargs="+", choices=["direct", "http"], default=["direct", "http"]
+    )
+    parser.add_argument("--api-ms", type=float, default=20.0, help="fake API latency")
+    parser.add_argument(
+        "--available-after-ms",
+        type=float,
+        default=0.0,
+        help="delay before a generated repository can be read",
+    )
+    parser.add_argument(
+        "--script-ms", type=float, default=200.0, help="time bootstrap.sh 'installs'"
+    )
+    parser.add_argument("--template-files", type=int, default=50)
+    parser.add_argument(
+        "--github-spacing",
+        type=float,
+        default=0.0,
+        help="PyGithub seconds between requests (the server default is 0.25)",
+    )
+    parser.add_argument("--no-mirror", action="store_true", help="clone without mirror")
+    parser.add_argument(
+        "--commit-backend", choices=["git", "api"], default="git", help="see COMMITBACKEND"
+    )
+    parser.add_argument(
+        "--render-ahead",
+        action="store_true",
+        help="render from the template while the repository is created",
+    )
+    parser.add_argument(
+        "--forge",
+        choices=["github", "local"],
+        default="github",
+        help="see FORGEBACKEND; local uses the fake's repositories without its API",
+    )
+    parser.add_argument("--save", action="store_true", help="store results as baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help="fail if any p95 exceeds the baseline by this fraction, e.g. 0.25",
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    # Importing the controllers re-installs their log sink; silence it again
+    import app.core.controllers.bootstrapController  # noqa: F401
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+A local stand-in for the parts of the GitHub REST API that pf_build uses,
+backed by bare git repositories on disk.
+
+Endpoints:
+    GET  /user                              the token's user
+    GET  /orgs/{org}                        an organization (any name exists)
+    GET  /repos/{org}/{repo}                a repository, 404 if not created
+    POST /repos/{org}/{template}/generate   create a repository from a template
+    GET  /repos/{org}/{repo}/git/ref/heads/{branch}     a branch
+    GET  /repos/{org}/{repo}/git/commits/{sha}          a commit
+    POST /repos/{org}/{repo}/git/blobs                  store a blob
+    POST /repos/{org}/{repo}/git/trees                  build a tree
+    POST /repos/{org}/{repo}/git/commits                create a commit
+    PATCH /repos/{org}/{repo}/git/refs/heads/{branch}   move a branch
+
+Repositories live at `<root>/{org}/{repo}.git` and are advertised with
+`file://` clone URLs, so clones and pushes need no network. As on GitHub, a
+generated repository has a single new root commit with the template's tree.
+
+    server = FakeGithub(root, api_ms=20)
+    server.template_create("FNNDSC", "python-chrisapp-template")
+    server.start()
+    ... appData.githubApiURL = server.url
+    ... appData.githubCloneURL = server.clone_url
+"""
+
+import base64
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+
+IDENTITY: dict[str, str] = {
+    "GIT_AUTHOR_NAME": "fakegithub",
+    "GIT_AUTHOR_EMAIL": "fakegithub@localhost",
+    "GIT_COMMITTER_NAME": "fakegithub",
+    "GIT_COMMITTER_EMAIL": "fakegithub@localhost",
+}
+
+# Behaves like the template's bootstrap.sh (configure, commit itself, rename
+# app.py, remove itself) without creating a venv or calling pip.
+BOOTSTRAP_SH: str = """#!/bin/bash -e
+PLUGIN_TITLE='pl-appname'
+SCRIPT_NAME='app'
+DESCRIPTION='A ChRIS plugin to do something awesome'
+ORGANIZATION='FNNDSC'
+EMAIL='dev@babyMRI.org'
+#READY=yes
+
+if [ "$READY" != 'yes' ]; then
+  echo "Please edit the variables at the top of $0 first" >&2
+  exit 1
+fi
+set -x
+git commit -m "Configure python-chrisapp-template/bootstrap.sh" -- "$0"
+git mv app.py "$SCRIPT_NAME.py"
+sed -i "s/pl-appname/$PLUGIN_TITLE/" setup.py
+{sleep}
+rm -v "$0"
+"""
+
+
+def git(
+    *args: str,
+    cwd: Optional[Path] = None,
+    stdin: Optional[bytes] = None,
+    env: Optional[dict[str, str]] = None,
+) -> str:
+    return (
+        subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            env={**os.environ, **IDENTITY, **(env or {})},
+            input=stdin,
+            check=True,
+            capture_output=True,
+        )
+        .stdout.decode()
+        .strip()
+    )
+
+
+class FakeGithub:
+    """A threaded HTTP server imitating the GitHub API over local bare repos"""
+
+    def __init__(
+        self,
+        root: Path,
+        api_ms: float = 0.0,
+        available_after_ms: float = 0.0,
+        login: str = "benchuser",
+    ) -> None:
+        """
+        Constructor for the FakeGithub class.
+
+        Args:
+            root (Path): Directory holding the bare repositories.
+            api_ms (float): Latency added to every API response.
+            available_after_ms (float): How long a generated repository answers
+                                        404, like GitHub's eventual consistency.
+            login (str): Login of the authenticated user.
+        """
+        self.root: Path = root
+        self.api_ms: float = api_ms
+        self.available_after_ms: float = available_after_ms
+        self.login: str = login
+        self.created: dict[str, float] = {}
+        self.hits: Counter[str] = Counter()
+        self._lock: threading.Lock = threading.Lock()
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer(
+            ("127.0.0.1", 0), self.handler_make()
+        )
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    @property
+    def clone_url(self) -> str:
+        return f"file://{self.root}"
+
+    def start(self) -> None:
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def repo_path(self, org: str, repo: str) -> Path:
+        return self.root / org / f"{repo}.git"
+
+    def repo_json(self, org: str, repo: str) -> dict[str, Any]:
+        api: str = f"{self.url}/repos/{org}/{repo}"
+        return {
+            "id": abs(hash((org.lower(), repo.lower()))),
+            "name": repo,
+            "full_name": f"{org}/{repo}",
+            "owner": {"login": org, "type": "Organization"},
+            "private": False,
+            "url": api,
+            "html_url": api,
+            "clone_url": f"file://{self.repo_path(org, repo)}",
+            "default_branch": "main",
+        }
+
+    def template_create(
+        self, org: str, name: str, files: int = 20, size: int = 4096, script_ms: float = 0
+    ) -> Path:
+        """
+        Create a template repository: the bootstrap.sh stand-in, app.py,
+        setup.py and `files` files of random content.
+
+        Args:
+            org (str): Owner of the template.
+            name (str): Name of the template.
+            files (int): Number of filler files.
+            size (int): Size of each filler file in bytes.
+            script_ms (float): Time bootstrap.sh spends "installing".
+
+        Returns:
+            Path: The bare template repository.
+        """
+        work: Path = self.root / "_work" / name
+        git("init", "-q", "-b", "main", str(work))
+        sleep: str = f"sleep {script_ms / 1000:.3f}" if script_ms else ""
+        (work / "bootstrap.sh").write_text(BOOTSTRAP_SH.replace("{sleep}", sleep))
+        (work / "app.py").write_text("def main():\n    print('hello')\n")
+        (work / "setup.py").write_text("from setuptools import setup\nsetup(name='pl-appname')\n")
+        (work / ".gitignore").write_text("venv/\n*.egg-info\n")
+        for i in range(files):
+            (work / f"data{i:04d}.bin").write_bytes(os.urandom(size))
+        git("add", ".", cwd=work)
+        git("commit", "-qm", "template", cwd=work)
+        bare: Path = self.repo_path(org, name)
+        git("clone", "-q", "--bare", str(work), str(bare))
+        git("config", "uploadpack.allowFilter", "true", cwd=bare)
+        self.created[f"{org}/{name}".lower()] = 0.0
+        return bare
+
+    def generate(self, org: str, template: str, owner: str, name: str) -> int:
+        template_path: Path = self.repo_path(org, template)
+        target: Path = self.repo_path(owner, name)
+        key: str = f"{owner}/{name}".lower()
+        with self._lock:
+            if not template_path.is_dir():
+                return 404
+            if key in self.created or target.exists():
+                return 422
+            self.created[key] = float("inf")  # reserved, not yet available
+        tree: str = git("rev-parse", "HEAD^{tree}", cwd=template_path)
+        commit: str = git("commit-tree", tree, "-m", "Initial commit", cwd=template_path)
+        git("init", "-q", "--bare", "-b", "main", str(target))
+        git("config", "uploadpack.allowFilter", "true", cwd=target)
+        git("push", "-q", str(target), f"{commit}:refs/heads/main", cwd=template_path)
+        self.created[key] = time.monotonic() + self.available_after_ms / 1000
+        return 201
+
+    def available(self, org: str, repo: str) -> bool:
+        ready: Optional[float] = self.created.get(f"{org}/{repo}".lower())
+        return ready is not None and time.monotonic() >= ready
+
+    def ref_get(self, org: str, repo: str, branch: str) -> Optional[str]:
+        try:
+            return git("rev-parse", f"refs/heads/{branch}", cwd=self.repo_path(org, repo))
+        except subprocess.CalledProcessError:
+            return None
+
+    def commit_json(self, org: str, repo: str, sha: str) -> dict[str, Any]:
+        bare: Path = self.repo_path(org, repo)
+        tree, *parents = git("show", "-s", "--format=%T %P", sha, cwd=bare).split()
+        return {
+            "sha": sha,
+            "tree": {"sha": tree},
+            "parents": [{"sha": parent} for parent in parents],
+        }
+
+    def tree_create(
+        self, org: str, repo: str, base_tree: Optional[str], entries: list[dict]
+    ) -> str:
+        """Build a tree like POST /git/trees: `entries` override `base_tree`"""
+        bare: Path = self.repo_path(org, repo)
+        index: Path = bare / f"index-{threading.get_ident()}"
+        env: dict[str, str] = {"GIT_INDEX_FILE": str(index)}
+        try:
+            if base_tree:
+                git("read-tree", base_tree, cwd=bare, env=env)
+            else:
+                git("read-tree", "--empty", cwd=bare, env=env)
+            lines: list[str] = []
+            for entry in entries:
+                if "content" in entry:
+                    entry["sha"] = git(
+                        "hash-object",
+                        "-w",
+                        "--stdin",
+                        cwd=bare,
+                        stdin=entry["content"].encode(),
+                    )
+                if entry.get("sha") is None:  # mode 0 removes the path
+                    lines.append(f"0 {'0' * 40}\t{entry['path']}")
+                else:
+                    lines.append(f"{entry['mode']} {entry['sha']}\t{entry['path']}")
+            git(
+                "update-index",
+                "--index-info",
+                cwd=bare,
+                env=env,
+                stdin="".join(f"{line}\n" for line in lines).encode(),
+            )
+            return git("write-tree", cwd=bare, env=env)
+        finally:
+            index.unlink(missing_ok=True)
+
+    def commit_create(self, org: str, repo: str, body: dict) -> str:
+        author: dict = body.get("author") or {}
+        committer: dict = body.get("committer") or author
+        args: list[str] = ["commit-tree", body["tree"], "-m", body["message"]]
+        for parent in body.get("parents", []):
+            args += ["-p", parent]
+        return git(
+            *args,
+            cwd=self.repo_path(org, repo),
+            env={
+                "GIT_AUTHOR_NAME": author.get("name", self.login),
+                "GIT_AUTHOR_EMAIL": author.get("email", f"{self.login}@localhost"),
+                "GIT_COMMITTER_NAME": committer.get("name", self.login),
+                "GIT_COMMITTER_EMAIL": committer.get("email", f"{self.login}@localhost"),
+            },
+        )
+
+    def ref_update(self, org: str, repo: str, branch: str, sha: str, force: bool) -> int:
+        bare: Path = self.repo_path(org, repo)
+        current: Optional[str] = self.ref_get(org, repo, branch)
+        if current is None:
+            return 422
+        if not force:
+            try:
+                git("merge-base", "--is-ancestor", current, sha, cwd=bare)
+            except subprocess.CalledProcessError:
+                return 422  # "Update is not a fast forward"
+        git("update-ref", f"refs/heads/{branch}", sha, current, cwd=bare)
+        return 200
+
+    def handler_make(self) -> type:
+        fake: "FakeGithub" = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def reply(self, status: int, body: Any) -> None:
+                if fake.api_ms:
+                    time.sleep(fake.api_ms / 1000)
+                data: bytes = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-RateLimit-Limit", "5000")
+                self.send_header("X-RateLimit-Remaining", "4999")
+                self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                path: str = self.path.split("?")[0]
+                if path == "/user":
+                    fake.hits["GET /user"] += 1
+                    return self.reply(
+                        200,
+                        {
+                            "login": fake.login,
+                            "email": f"{fake.login}@localhost",
+                            "url": f"{fake.url}/user",
+                        },
+                    )
+                if match := re.fullmatch(r"/orgs/([^/]+)", path):
+                    fake.hits["GET /orgs"] += 1
+                    org: str = match.group(1)
+                    return self.reply(
+                        200, {"login": org, "url": f"{fake.url}/orgs/{org}"}
+                    )
+                if match := re.fullmatch(
+                    r"/repos/([^/]+)/([^/]+)/git/ref/heads/([^/]+)", path
+                ):
+                    fake.hits["GET /git/ref"] += 1
+                    org, repo, branch = match.groups()
+                    sha: Optional[str] = (
+                        fake.ref_get(org, repo, branch)
+                        if fake.available(org, repo)
+                        else None
+                    )
+                    if sha is None:
+                        return self.reply(404, {"message": "Not Found"})
+                    return self.reply(
+                        200,
+                        {
+                            "ref": f"refs/heads/{branch}",
+                            "object": {"sha": sha, "type": "commit"},
+                        },
+                    )
+                if match := re.fullmatch(
+                    r"/repos/([^/]+)/([^/]+)/git/commits/([0-9a-f]{40})", path
+                ):
+                    fake.hits["GET /git/commits"] += 1
+                    org, repo, sha = match.groups()
+                    try:
+                        return self.reply(200, fake.commit_json(org, repo, sha))
+                    except subprocess.CalledProcessError:
+                        return self.reply(404, {"message": "Not Found"})
+                if match := re.fullmatch(r"/repos/([^/]+)/([^/]+)", path):
+                    fake.hits["GET /repos"] += 1
+                    org, repo = match.groups()
+                    if fake.available(org, repo):
+                        return self.reply(200, fake.repo_json(org, repo))
+                    return self.reply(404, {"message": "Not Found"})
+                self.reply(404, {"message": "Not Found"})
+
+            def do_POST(self) -> None:
+                length: int = int(self.headers.get("Content-Length") or 0)
+                body: dict = json.loads(self.rfile.read(length) or b"{}")
+                path: str = self.path.split("?")[0]
+                if match := re.fullmatch(r"/repos/([^/]+)/([^/]+)/generate", path):
+                    fake.hits["POST /generate"] += 1
+                    org, template = match.groups()
+                    owner: str = body.get("owner") or org
+                    status: int = fake.generate(org, template, owner, body["name"])
+                    if status == 201:
+                        return self.reply(201, fake.repo_json(owner, body["name"]))
+                    return self.reply(status, {"message": "Generation failed"})
+                if match := re.fullmatch(
+                    r"/repos/([^/]+)/([^/]+)/git/(blobs|trees|commits)", path
+                ):
+                    org, repo, kind = match.groups()
+                    fake.hits[f"POST /git/{kind}"] += 1
+                    if not fake.available(org, repo):
+                        return self.reply(404, {"message": "Not Found"})
+                    bare: Path = fake.repo_path(org, repo)
+                    if kind == "blobs":
+                        data: bytes = (
+                            base64.b64decode(body["content"])
+                            if body.get("encoding") == "base64"
+                            else body["content"].encode()
+                        )
+                        sha: str = git("hash-object", "-w", "--stdin", cwd=bare, stdin=data)
+                    elif kind == "trees":
+                        sha = fake.tree_create(
+                            org, repo, body.get("base_tree"), body["tree"]
+                        )
+                    else:
+                        sha = fake.commit_create(org, repo, body)
+                    return self.reply(201, {"sha": sha})
+                self.reply(404, {"message": "Not Found"})
+
+            def do_PATCH(self) -> None:
+                length: int = int(self.headers.get("Content-Length") or 0)
+                body: dict = json.loads(self.rfile.read(length) or b"{}")
+                path: str = self.path.split("?")[0]
+                if match := re.fullmatch(
+                    r"/repos/([^/]+)/([^/]+)/git/refs/heads/([^/]+)", path
+                ):
+                    fake.hits["PATCH /git/refs"] += 1
+                    org, repo, branch = match.groups()
+                    status: int = fake.ref_update(
+                        org, repo, branch, body["sha"], bool(body.get("force"))
+                    )
+                    if status == 200:
+                        return self.reply(
+                            200,
+                            {
+                                "ref": f"refs/heads/{branch}",
+                                "object": {"sha": body["sha"], "type": "commit"},
+                            },
+                        )
+                    return self.reply(status, {"message": "Update is not a fast forward"})
+                self.reply(404, {"message": "Not Found"})
+
+        return Handler
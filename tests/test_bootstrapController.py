@@ -0,0 +1,42 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.core.controllers import bootstrapController
+from app.core.controllers.bootstrapController import step_run
+from app.models.bootstrapModel import (
+    BootstrapModel,
+    BootstrapState,
+    BootstrapStep,
+    GithubRepoExists,
+)
+
+VALUES: BootstrapModel = BootstrapModel(
+    plugin_title="pl-test",
+    scriptname="test",
+    description="Test plugin",
+    organization="FNNDSC",
+    email="test@example.org",
+)
+
+
+def test_step_checkpointFailure_keepsResult(monkeypatch: pytest.MonkeyPatch) -> None:
+    recorded: list[bool] = []
+
+    async def repoExists(values: BootstrapModel, ctx: Any) -> GithubRepoExists:
+        return GithubRepoExists(status=True, repo_name=values.plugin_title)
+
+    def checkpoint_record(*args: Any) -> None:
+        recorded.append(state.repoExists is not None)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(bootstrapController, "bootstrap_repoExists", repoExists)
+    monkeypatch.setattr(bootstrapController, "checkpoint_record", checkpoint_record)
+    state: BootstrapState = BootstrapState()
+    ctx = SimpleNamespace(render_ahead=False)
+    assert asyncio.run(step_run(VALUES, ctx, state, BootstrapStep.REPO_EXISTS, False))
+    assert recorded == [True]  # the step's result was recorded first
+    assert state.repoExists.status
+    assert "repoExists" not in state.checkpoints
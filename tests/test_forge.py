@@ -0,0 +1,78 @@
+import asyncio
+import subprocess
+from pathlib import Path
+
+import git
+import pytest
+
+from app.utils.forge import LocalForge
+
+TEMPLATE: str = "python-chrisapp-template"
+
+
+def git_run(path: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@localhost", *args],
+        cwd=path,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def forge(tmp_path: Path) -> LocalForge:
+    """A local forge holding a case-preserved template, FNNDSC/<template>.git"""
+    work: Path = tmp_path / "work"
+    work.mkdir()
+    (work / "app.py").write_text("print('hello')\n")
+    (work / "bootstrap.sh").write_text("#!/bin/bash\n")
+    git_run(work, "init", "-q", "-b", "main")
+    git_run(work, "add", "-A")
+    git_run(work, "commit", "-q", "-m", "Template")
+    root: Path = tmp_path / "forge"
+    (root / "FNNDSC").mkdir(parents=True)
+    bare: Path = root / "FNNDSC" / f"{TEMPLATE}.git"
+    git_run(tmp_path, "clone", "-q", "--bare", str(work), str(bare))
+    return LocalForge(root)
+
+
+def test_repoPath_findsExistingDirectoryInAnyCase(forge: LocalForge) -> None:
+    template: Path = forge.root.resolve() / "FNNDSC" / f"{TEMPLATE}.git"
+    assert forge.repo_path(TEMPLATE, "FNNDSC") == template
+    assert forge.repo_path(TEMPLATE.upper(), "fnndsc") == template
+    assert forge.repo_available(TEMPLATE, "fnndsc")
+    assert forge.repo_path("pl-New", "FNNDSC").name == "pl-New.git"
+
+
+def test_repoGenerate_fromCasePreservedTemplate(forge: LocalForge) -> None:
+    created = asyncio.run(
+        forge.repo_createFromTemplate("pl-New", "A plugin", TEMPLATE, "fnndsc")
+    )
+    assert created.status, created.message
+    path: Path = forge.root / "FNNDSC" / "pl-New.git"
+    repo: git.Repo = git.Repo(path)
+    assert sorted(blob.path for blob in repo.head.commit.tree.traverse()) == [
+        "app.py",
+        "bootstrap.sh",
+    ]
+    exists = asyncio.run(forge.repo_checkExists("PL-NEW", "FNNDSC"))
+    assert exists.exists
+
+
+@pytest.mark.parametrize(
+    "repo_name, org_name",
+    [("..", "FNNDSC"), ("pl-x", ".."), ("a/b", "FNNDSC"), ("pl-x", "a b"), (".", "x")],
+)
+def test_repoPath_rejectsInvalidNames(
+    forge: LocalForge, repo_name: str, org_name: str
+) -> None:
+    with pytest.raises(ValueError):
+        forge.repo_path(repo_name, org_name)
+
+
+def test_repoPath_staysUnderRoot(forge: LocalForge, tmp_path: Path) -> None:
+    (tmp_path / "outside").mkdir()
+    (forge.root / "escape").symlink_to(tmp_path / "outside")
+    with pytest.raises(ValueError):
+        forge.repo_path("pl-x", "escape")
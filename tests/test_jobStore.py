@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from app.db.mongo_client import JobStore, MemoryJobStore, record_doc
+from app.models.jobModel import JobRecord, JobStatus
+
+EPOCH: datetime = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def record_make(
+    job_id: str,
+    seconds: float,
+    organization: str = "FNNDSC",
+    status: JobStatus = JobStatus.SUCCEEDED,
+) -> JobRecord:
+    return JobRecord(
+        job_id=job_id,
+        organization=organization,
+        plugin_title=f"pl-{job_id}",
+        status=status,
+        created=EPOCH + timedelta(seconds=seconds),
+    )
+
+
+class FlakyJobStore(MemoryJobStore):
+    """A MemoryJobStore whose next `failures` writes fail"""
+
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures: int = failures
+
+    def docs_write(self, docs: list[dict[str, Any]]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database down")
+        super().docs_write(docs)
+
+
+def test_created_isStoredAsDatetime() -> None:
+    doc: dict[str, Any] = record_doc(record_make("a", 0.25))
+    assert doc["_id"] == "a"
+    assert doc["created"] == EPOCH + timedelta(seconds=0.25)
+
+
+def test_recordsFind_newestFirstWithinOneSecond() -> None:
+    store = MemoryJobStore()
+    for job_id, seconds in [("a", 0.1), ("c", 0.9), ("b", 0.5)]:
+        store.record_save(record_make(job_id, seconds))
+    store.record_save(JobRecord(job_id="undated"))
+    found: list[JobRecord] = asyncio.run(store.records_find())
+    assert [record.job_id for record in found] == ["c", "b", "a", "undated"]
+
+
+def test_recordsFind_filtersAndLimits() -> None:
+    store = MemoryJobStore()
+    store.record_save(record_make("a", 1, organization="FNNDSC"))
+    store.record_save(record_make("b", 2, organization="other"))
+    store.record_save(record_make("c", 3, status=JobStatus.FAILED))
+    store.record_save(record_make("d", 4))
+
+    async def find(**kwargs: Any) -> list[str]:
+        return [record.job_id for record in await store.records_find(**kwargs)]
+
+    assert asyncio.run(find(organization="other")) == ["b"]
+    assert asyncio.run(find(status=JobStatus.FAILED)) == ["c"]
+    assert asyncio.run(find(organization="FNNDSC", limit=2)) == ["d", "c"]
+    assert asyncio.run(find(plugin_title="pl-a")) == ["a"]
+
+
+def test_recordGet_seesPendingAndStoredRecords() -> None:
+    store = MemoryJobStore()
+    record: JobRecord = record_make("a", 0)
+    store.record_save(record)
+    assert asyncio.run(store.record_get("a")) is record
+    asyncio.run(store.flush())
+    assert store.pending == {}
+    stored: JobRecord | None = asyncio.run(store.record_get("a"))
+    assert stored is not None and stored.created == record.created
+    assert asyncio.run(store.record_get("missing")) is None
+
+
+def test_flush_retriesFailedRecords() -> None:
+    store = FlakyJobStore(failures=1)
+    store.record_save(record_make("a", 0))
+    store.record_save(record_make("b", 1))
+    with pytest.raises(ConnectionError):
+        asyncio.run(store.flush())
+    assert set(store.pending) == {"a", "b"}
+    assert store.docs == {}
+
+    asyncio.run(store.flush())
+    assert store.pending == {}
+    assert set(store.docs) == {"a", "b"}
+
+
+def test_flush_keepsNewerRecordSavedDuringFailedWrite() -> None:
+    store = FlakyJobStore(failures=1)
+    store.record_save(record_make("a", 0, status=JobStatus.RUNNING))
+    newer: JobRecord = record_make("a", 0, status=JobStatus.SUCCEEDED)
+
+    def docs_write(docs: list[dict[str, Any]]) -> None:
+        store.record_save(newer)  # the job changes while the write is failing
+        FlakyJobStore.docs_write(store, docs)
+
+    store.docs_write = docs_write  # type: ignore[method-assign]
+    with pytest.raises(ConnectionError):
+        asyncio.run(store.flush())
+    assert store.pending["a"] is newer
+
+
+def test_recordSave_fromManyThreadsWhileFlushing() -> None:
+    store = MemoryJobStore()
+    threads: list[threading.Thread] = [
+        threading.Thread(
+            target=lambda n=n: [
+                store.record_save(record_make(f"{n}-{i}", i)) for i in range(200)
+            ]
+        )
+        for n in range(8)
+    ]
+
+    async def run() -> None:
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            await store.flush()
+            await asyncio.sleep(0)
+        for thread in threads:
+            thread.join()
+        await store.flush()
+
+    asyncio.run(run())
+    assert len(store.docs) == 8 * 200
+
+
+class RecordingJobStore(MemoryJobStore):
+    """A MemoryJobStore whose writes take a while, and that logs them"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: list[tuple[str, str]] = []
+
+    def docs_write(self, docs: list[dict[str, Any]]) -> None:
+        for doc in docs:
+            self.writes.append(("start", doc["status"]))
+        time.sleep(0.05)
+        super().docs_write(docs)
+        for doc in docs:
+            self.writes.append(("end", doc["status"]))
+
+
+def test_flush_oneAtATime() -> None:
+    store = RecordingJobStore()
+
+    async def run() -> None:
+        store.record_save(record_make("a", 0, status=JobStatus.RUNNING))
+        first: asyncio.Task = asyncio.create_task(store.flush())
+        await asyncio.sleep(0.01)  # the first write is under way
+        store.record_save(record_make("a", 0, status=JobStatus.SUCCEEDED))
+        await asyncio.gather(first, store.records_find())
+
+    asyncio.run(run())
+    assert store.writes == [
+        ("start", "running"),
+        ("end", "running"),
+        ("start", "succeeded"),
+        ("end", "succeeded"),
+    ]
+    assert store.docs["a"]["status"] == "succeeded"
+
+
+def test_jobStore_isAbstract() -> None:
+    with pytest.raises(TypeError):
+        JobStore()  # type: ignore[abstract]
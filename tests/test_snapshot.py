@@ -0,0 +1,137 @@
+import os
+import subprocess
+import warnings
+from pathlib import Path
+
+import pytest
+
+from app.utils import snapshot
+from app.utils.snapshot import head_commit, repo_open, snapshot_digest, worktree_stage
+
+
+def git(path: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@localhost", *args],
+        cwd=path,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def addAll_tree(path: Path) -> str:
+    """The tree `git add -A` stages"""
+    git(path, "add", "-A")
+    return git(path, "write-tree")
+
+
+@pytest.fixture
+def checkout(tmp_path: Path) -> Path:
+    git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    (tmp_path / "app.py").write_text("print('hello')\n")
+    (tmp_path / "bootstrap.sh").write_text("#!/bin/bash\necho bootstrap\n")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "README.md").write_text("# docs\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "Initial commit")
+    return tmp_path
+
+
+def test_unchanged(checkout: Path) -> None:
+    assert snapshot_digest(checkout) == git(checkout, "rev-parse", "HEAD^{tree}")
+
+
+def test_newFiles(checkout: Path) -> None:
+    (checkout / "setup.py").write_text("from setuptools import setup\n")
+    (checkout / "pkg" / "sub").mkdir(parents=True)
+    (checkout / "pkg" / "sub" / "__init__.py").write_text("")
+    (checkout / "build.log").write_text("ignored\n")
+    (checkout / "link").symlink_to("app.py")
+    assert snapshot_digest(checkout) == addAll_tree(checkout)
+
+
+def test_deletedFiles(checkout: Path) -> None:
+    (checkout / "app.py").unlink()
+    (checkout / "docs" / "README.md").unlink()
+    assert snapshot_digest(checkout) == addAll_tree(checkout)
+
+
+def test_modifiedAndRenamedFiles(checkout: Path) -> None:
+    (checkout / "app.py").write_text("print('hello, world')\n")
+    (checkout / "docs" / "README.md").rename(checkout / "docs" / "index.md")
+    assert snapshot_digest(checkout) == addAll_tree(checkout)
+
+
+def test_modeChange(checkout: Path) -> None:
+    (checkout / "bootstrap.sh").chmod(0o755)
+    assert snapshot_digest(checkout) == addAll_tree(checkout)
+    (checkout / "bootstrap.sh").chmod(0o644)
+    assert snapshot_digest(checkout) == addAll_tree(checkout)
+
+
+def test_racyTimestamp(checkout: Path) -> None:
+    # A same-size change with the mtime of the index entry, made no earlier
+    # than the index was written: only the contents can tell
+    path: Path = checkout / "app.py"
+    st: os.stat_result = path.stat()
+    path.write_text("print('HELLO')\n")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.utime(checkout / ".git" / "index", ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert path.stat().st_size == st.st_size
+    assert snapshot_digest(checkout) == addAll_tree(checkout)
+    assert snapshot_digest(checkout) != git(checkout, "rev-parse", "HEAD^{tree}")
+
+
+def test_stage_leavesIndexFileAlone(checkout: Path) -> None:
+    (checkout / "setup.py").write_text("from setuptools import setup\n")
+    index: bytes = (checkout / ".git" / "index").read_bytes()
+    worktree_stage(repo_open(checkout))
+    assert (checkout / ".git" / "index").read_bytes() == index
+    assert git(checkout, "status", "--porcelain") == "?? setup.py"
+
+
+def test_stage_storesLooseObjects(checkout: Path) -> None:
+    (checkout / "setup.py").write_text("from setuptools import setup\n")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        repo = repo_open(checkout)
+        blob: str = worktree_stage(repo).entries[("setup.py", 0)].hexsha
+    assert git(checkout, "cat-file", "-p", blob) == "from setuptools import setup"
+    assert (checkout / ".git" / "objects" / blob[:2] / blob[2:]).is_file()
+    assert head_commit(repo).hexsha == git(checkout, "rev-parse", "HEAD")
+
+
+def test_stage_skipsNestedRepository(checkout: Path) -> None:
+    nested: Path = checkout / "vendor"
+    nested.mkdir()
+    git(nested, "init", "-q")
+    (nested / "lib.py").write_text("x = 1\n")
+    (checkout / "setup.py").write_text("from setuptools import setup\n")
+    paths: set[str] = {path for path, _ in worktree_stage(repo_open(checkout)).entries}
+    assert "setup.py" in paths
+    assert not any(path.startswith("vendor") for path in paths)
+
+
+def test_stage_fileReplacedByDirectory(checkout: Path) -> None:
+    (checkout / "app.py").unlink()
+    (checkout / "app.py").mkdir()
+    (checkout / "app.py" / "main.py").write_text("print('hello')\n")
+    assert snapshot_digest(checkout) == addAll_tree(checkout)
+
+
+def test_stage_fileRemovedWhileStaging(
+    checkout: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (checkout / "setup.py").write_text("from setuptools import setup\n")
+    read = snapshot.worktree_read
+
+    def racing_read(path: Path, mode: int) -> bytes:
+        if path.name == "setup.py":
+            path.unlink()
+        return read(path, mode)
+
+    monkeypatch.setattr(snapshot, "worktree_read", racing_read)
+    paths: set[str] = {path for path, _ in worktree_stage(repo_open(checkout)).entries}
+    assert "setup.py" not in paths
+    assert "app.py" in paths
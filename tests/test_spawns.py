@@ -0,0 +1,41 @@
+import asyncio
+import subprocess
+from pathlib import Path
+
+from app.utils.jobController import Jobber, JobResult
+from app.utils.spawns import CountedRepo, SpawnCount, spawnStep, spawnTarget
+
+
+def counted(step: str, run) -> dict[str, int]:
+    spawns: SpawnCount = SpawnCount()
+    target_token = spawnTarget.set(spawns)
+    step_token = spawnStep.set(step)
+    try:
+        run()
+    finally:
+        spawnStep.reset(step_token)
+        spawnTarget.reset(target_token)
+    return spawns.as_dict()
+
+
+def test_gitCommands_areCounted(tmp_path: Path) -> None:
+    def run() -> None:
+        repo = CountedRepo.init(tmp_path, initial_branch="main")
+        repo.git.status()
+        repo.git.status()
+
+    assert counted("gitClone", run) == {"gitClone": 3}
+
+
+def test_job_isCounted(tmp_path: Path) -> None:
+    results: list[JobResult] = []
+
+    def run() -> None:
+        results.append(asyncio.run(Jobber({}).job_runAsync("true", cwd=tmp_path)))
+
+    assert counted("shellExec", run) == {"shellExec": 1}
+    assert results[0].returncode == 0
+
+
+def test_otherProcesses_areNotCounted(tmp_path: Path) -> None:
+    assert counted("shellExec", lambda: subprocess.run(["true"], check=True)) == {}
@@ -0,0 +1,62 @@
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+from app.config.settings import appData
+from app.utils import templateMirror
+from app.utils.templateMirror import TemplateMirror, templateMirror_get
+
+
+@pytest.fixture(autouse=True)
+def mirrors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(appData, "templateMirrorRoot", tmp_path / "mirrors")
+    monkeypatch.setattr(appData, "templateMirrorMax", 2)
+    monkeypatch.setattr(templateMirror, "templateMirrors", OrderedDict())
+
+
+@pytest.mark.parametrize("org_name", ["..", "a/../..", "a b", "."])
+def test_mirror_rejectsInvalidOrganization(org_name: str) -> None:
+    with pytest.raises(ValueError):
+        templateMirror_get(org_name)
+
+
+def test_mirror_isUnderRoot() -> None:
+    mirror: TemplateMirror = templateMirror_get("FNNDSC")
+    root: Path = appData.templateMirrorRoot.resolve()
+    assert mirror.path == root / "FNNDSC" / f"{appData.appTemplateRepo}.git"
+
+
+def test_registry_keepsMostRecentlyUsed() -> None:
+    first: TemplateMirror = templateMirror_get("one")
+    templateMirror_get("two")
+    assert templateMirror_get("ONE") is first
+    templateMirror_get("three")
+    assert list(templateMirror.templateMirrors) == [
+        ("one", appData.appTemplateRepo.lower()),
+        ("three", appData.appTemplateRepo.lower()),
+    ]
+
+
+def test_refreshLoop_dropsFailingMirrorsButTheDefault(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(appData, "githubCloneURL", (tmp_path / "nowhere").as_uri())
+    monkeypatch.setattr(appData, "forgeBackend", "github")
+    monkeypatch.setattr(appData, "templateMirrorFailMax", 2)
+    templateMirror_get("other")
+    rounds: list[int] = []
+
+    async def sleep(seconds: float) -> None:
+        rounds.append(len(templateMirror.templateMirrors))
+        if len(rounds) == 3:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(templateMirror.asyncio, "sleep", sleep)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(templateMirror.templateMirror_refreshLoop(0))
+    assert rounds == [2, 1, 1]
+    assert list(templateMirror.templateMirrors) == [
+        (appData.appOrganization.lower(), appData.appTemplateRepo.lower())
+    ]